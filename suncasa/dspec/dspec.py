@@ -1,7 +1,6 @@
 __all__ = ['Dspec']
 
 import os
-import struct
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -26,6 +25,7 @@ from matplotlib.dates import AutoDateFormatter, AutoDateLocator, num2date
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 
 from .sources.lwa import rebin1d, rebin2d
+from . import h5store
 
 stokestype = [
     'Undefined',
@@ -146,6 +146,146 @@ def calc_bkg_dspec(spec, tim, bkgtim, interp_method='linear'):
 
     return spec_bkg
 
+
+def _masked_median_bl(spec):
+    """
+    Median of the amplitudes over the baseline axis (axis 2) of a (npol, nfreq, nbl, ntime) block,
+    ignoring zero (flagged or missing) and NaN values.
+    """
+    spec = np.abs(spec)
+    spec_masked = np.ma.masked_array(spec, mask=np.logical_or(spec < 1e-9, ~np.isfinite(spec)))
+    return np.ma.filled(np.ma.median(spec_masked, axis=2), fill_value=0.)
+
+
+def extract_dspec(msfile, bl='', uvrange='', field='', scan='', spw='', timeran='', datacolumn='data',
+                  domedian=False, applyflag=True, fillnan=None, maxmemmb=1024, verbose=False):
+    """
+    Extracts the dynamic spectrum from a measurement set without splitting the selection into a new ms.
+
+    The selection is resolved once per data description with `ms.msselect`, which gives the time grid, the
+    selected baselines, and the channel frequencies from the scalar columns only. The DATA (or CORRECTED_DATA)
+    and FLAG columns are then read in time chunks with `ms.iterinit` and scattered into a preallocated output.
+    If domedian is True, the median over the baselines is done chunk by chunk, so that only one chunk of all
+    the baselines is held in memory.
+
+    Parameters
+    ----------
+    msfile : str
+        Name of the measurement set.
+    bl, uvrange, field, scan, spw, timeran : str, optional
+        Selection of the data, in the CASA msselection syntax.
+    datacolumn : str, optional
+        'data' or 'corrected'.
+    domedian : bool, optional
+        If True, returns the median of the amplitudes over the selected baselines.
+    applyflag : bool, optional
+        If True, flagged data are set to fillnan (or 0).
+    fillnan : float or int, optional
+        Value to fill in for flagged data.
+    maxmemmb : float, optional
+        Approximate size in MB of the data held in memory for each chunk.
+    verbose : bool, optional
+
+    Returns
+    -------
+    specamp : numpy.ndarray
+        Complex visibilities in the shape of (npol, nfreq, nbl, ntime), or the median amplitudes in the shape of
+        (npol, nfreq, 1, ntime) if domedian is True.
+    tim : numpy.ndarray
+        Time axis in MJD seconds.
+    freq : numpy.ndarray
+        Frequency axis in Hz.
+    """
+    if datacolumn.lower() == 'corrected':
+        datacol = 'corrected_data'
+    else:
+        datacol = 'data'
+    staql = {'baseline': bl, 'uvdist': uvrange, 'field': field, 'scan': scan, 'spw': spw, 'time': timeran}
+    staql = {k: v for k, v in staql.items() if v}
+
+    ms.open(msfile)
+    nddid = len(ms.getspectralwindowinfo())
+
+    def select(ddid):
+        ms.reset()
+        ms.selectinit(datadescid=ddid)
+        if not staql:
+            return True
+        try:
+            return ms.msselect(staql)
+        except Exception:
+            return False
+
+    ## resolve the selection: time grid, baselines, and channels of each data description
+    ddids = []
+    freq = []
+    times = []
+    blkeys = []
+    for ddid in range(nddid):
+        if not select(ddid):
+            continue
+        meta = ms.getdata(['antenna1', 'antenna2', 'time', 'axis_info'])
+        if len(meta['time']) == 0:
+            continue
+        ddids.append(ddid)
+        npol = len(meta['axis_info']['corr_axis'])
+        freq.append(meta['axis_info']['freq_axis']['chan_freq'][:, 0])
+        times.append(np.unique(meta['time']))
+        blkeys.append(np.unique(meta['antenna1'] * 10000 + meta['antenna2']))
+    if not ddids:
+        ms.close()
+        raise ValueError('No data selected in {}.'.format(msfile))
+    tim = np.unique(np.hstack(times))
+    blkey = np.unique(np.hstack(blkeys))
+    nchans = [len(f) for f in freq]
+    fptrs = np.hstack([0, np.cumsum(nchans)])
+    freq = np.hstack(freq)
+    nt, nbl, nf = len(tim), len(blkey), len(freq)
+    if verbose:
+        print('npol, nf, nt, nbl:', npol, nf, nt, nbl)
+
+    if domedian:
+        specamp = np.zeros((npol, nf, 1, nt), float)
+    else:
+        specamp = np.zeros((npol, nf, nbl, nt), complex)
+    if nt > 1:
+        dt = np.median(np.diff(tim))
+    else:
+        dt = 1.0
+    for n, ddid in enumerate(ddids):
+        f1, f2 = fptrs[n], fptrs[n + 1]
+        ## number of times per chunk for about maxmemmb of data and flags of all the baselines
+        ntchunk = max(1, int(maxmemmb * 1024. ** 2 / (npol * nchans[n] * nbl * 17.)))
+        select(ddid)
+        ms.iterinit(columns=['TIME'], interval=ntchunk * dt, adddefaultsortcolumns=False)
+        more = ms.iterorigin()
+        while more:
+            rec = ms.getdata([datacol, 'flag', 'antenna1', 'antenna2', 'time'])
+            if len(rec['time']) > 0:
+                data = rec[datacol]
+                if applyflag:
+                    if type(fillnan) in [int, float]:
+                        data[rec['flag']] = float(fillnan)
+                    else:
+                        data[rec['flag']] = 0.0
+                tidx = np.searchsorted(tim, rec['time'])
+                bidx = np.searchsorted(blkey, rec['antenna1'] * 10000 + rec['antenna2'])
+                if domedian:
+                    t0, t1 = tidx.min(), tidx.max() + 1
+                    chunk = np.zeros((npol, nchans[n], nbl, t1 - t0), complex)
+                    chunk[:, :, bidx, tidx - t0] = data
+                    specamp[:, f1:f2, 0, t0:t1] = _masked_median_bl(chunk)
+                else:
+                    specamp[:, f1:f2, bidx, tidx] = data
+            more = ms.iternext()
+        ms.iterend()
+        if verbose:
+            print('Filled up ddid #{0:d} chn:{1:d}--{2:d}'.format(ddid, f1, f2))
+    ms.reset()
+    ms.close()
+    return specamp, tim, freq
+
+
 class Dspec:
     """
     A class to handle dynamic spectra from radio observations.
@@ -192,6 +332,9 @@ class Dspec:
     wrt_dspec(specfile=None, specdat=None):
         Writes the dynamic spectrum data to a binary file.
 
+    rd_dspec_dat(specdat, nf, npl=1, nbl=1):
+        Reads (memory-maps) a binary file written by wrt_dspec.
+
     rd_dspec(specdata, **kwargs):
         Reads dynamic spectrum data from a numpy file.
 
@@ -254,7 +397,8 @@ class Dspec:
               verbose : bool, optional
                   If True, prints detailed information during operation.
               usetbtool : bool, optional
-                  If True, uses CASA table tools for data extraction.
+                  Kept for compatibility. The selected data are read directly from the measurement set unless
+                  timebin or regridfreq is set, in which case the selection is split into a temporary ms first.
               ds_normalised : bool, optional
                   If True, normalizes the dynamic spectrum by the median value.
 
@@ -278,118 +422,74 @@ class Dspec:
         """
         Reads dynamic spectrum data from a file.
 
+        The reader is looked up in the registry of `suncasa.dspec.sources`. If source is not given, it is found from
+        the file content (falling back to the file extension). Reader modules are only imported when needed.
+
         Parameters
         ----------
         fname : str or list of str
             The file name to read the dynamic spectrum data from.
         source : str, optional
-            Specifies the data source ('fits', 'suncasa', or 'lwa') to determine the appropriate reader.
+            Specifies the data source ('suncasa', 'suncasa_h5', 'eovsa', 'lwa', 'ecallisto', or 'general')
+            to determine the appropriate reader.
+        timerange : list or `astropy.time.Time`, optional
+            Start and end time to read. Readers that support partial reads only read this time range from disk.
+        freqrange : list, optional
+            Start and end frequency to read in Hz.
+        lazy : bool, optional
+            If True, the data are returned as an array-like proxy (dynamic spectrum stores) or a memory-mapped
+            array (FITS) where the reader supports it. Defaults to True for dynamic spectrum stores (.h5)
+            and False otherwise.
 
         Additional parameters are passed to the specific reader function based on the source.
 
         """
-        ##TODO The existing implementation of the mapping between extensions and instruments requires refinement and sophistication.
-        # Explore potential optimization strategies to improve this process.
-        from astropy.io import fits
+        from . import sources
 
-        if type(fname) is str:
-            _known_extensions = {
-                ('npz'): 'suncasa',
-            }
-            for extension, readername in _known_extensions.items():
-                if fname.lower().endswith(extension):
-                    source = readername
-            if source is None and (not fname.lower().startswith('eovsa')):
-                raise ValueError(f"The filetype provided ({os.path.basename(fname)}) is not supported")
-
-            if source.lower() == 'eovsa' or fname.lower().startswith('eovsa'):
-                if fname.endswith('.fts') or fname.endswith('.fits'):
-                    from .sources import eovsa
-                    s = eovsa.get_dspec(fname, doplot=False)
-                    self.data = s['spectrogram']
-                    self.time_axis = Time(s['time_axis'], format='mjd')
-                    self.freq_axis = s['spectrum_axis'] * 1e9
-                    self.spec_unit = 'sfu'
-                    self.telescope = 'EOVSA'
-                    self.observatory = 'OVRO'
-
-
-            if source.lower() == 'suncasa':
-                spec, tim, freq, bl, pol, spec_unit = self.rd_dspec(fname, spectype='amp', spec_unit='jy')
-                self.data = spec
-                self.time_axis = Time(tim / 24 / 3600, format='mjd')
-                self.freq_axis = freq
-                self.bl = bl
-                self.pol = pol
-                self.spec_unit = spec_unit
-                self.telescope = ''
-                self.observatory = ''
-
-            if source.lower() == 'lwa':
-                if fname.endswith('.fits'):
-                    hdu = fits.open(fname) 
-                    self.data = hdu[0].data
-                    tim = hdu[2].data
-                    tmjd = np.array(tim['mjd']) + np.array(tim['time']) / 24. / 3600 / 1000
-                    self.time_axis = Time(tmjd, format='mjd')
-                    self.freq_axis = hdu[1].data['sfreq'] * 1e9
-                    self.pol = [hdu[0].header['POLARIZA']]
-                    self.spec_unit = 'sfu'
-                    self.telescope = 'LWA'
-                    self.observatory = 'OVRO'
-                else:
-                    from .sources import lwa
-                    spec, tim, freq, pol, calfac_x, calfac_y, bkg_flux = lwa.read_data(fname, **kwargs)
-                    self.data = spec
-                    self.time_axis = Time(tim, format='mjd')
-                    self.freq_axis = freq
-                    self.pol = pol
-                    self.calfac_x = calfac_x # correction factor for X pol, same shape as freq
-                    self.calfac_y = calfac_y # correction factor for Y pol, same shape as freq
-                    self.bkg_flux = bkg_flux
-                    self.spec_unit = 'sfu'
-                    self.telescope = 'LWA'
-                    self.observatory = 'OVRO'
-
-            if source.lower() =='general' and (fname.endswith('.fits') or fname.endswith('.fts') or fname.endswith('.fit')):
-                hdu = fits.open(fname)
-                self.data = hdu[0].data
-                tim = hdu[2].data
-                tmjd = np.array(tim['mjd']) + np.array(tim['time']) / 24. / 3600 / 1000
-                self.time_axis = Time(tmjd, format='mjd')
-                self.freq_axis = hdu[1].data['sfreq'] * 1e9
-                self.pol = [hdu[0].header['POLARIZA']]
-                if 'BUNIT' in hdu[0].header:
-                    self.spec_unit = hdu[0].header['BUNIT']
-                if 'BNAME' in hdu[0].header:
-                    self.spec_name = hdu[0].header['BNAME']
-                self.telescope = hdu[0].header['TELESCOP']
-                self.observatory = ''
-
-        elif source.lower() == 'lwa' and type(fname) is list:
-            from .sources import lwa
-            spec, tim, freq, pol, calfac_x, calfac_y, bkg_flux = lwa.read_data(fname, **kwargs)
-            self.data = spec
-            self.time_axis = Time(tim, format='mjd')
-            self.freq_axis = freq
-            self.pol = pol
-            self.calfac_x = calfac_x # correction factor for X pol, same shape as freq
-            self.calfac_y = calfac_y # correction factor for Y pol, same shape as freq
-            self.bkg_flux = bkg_flux
-            self.spec_unit = 'sfu'
-            self.telescope = 'LWA'
-            self.observatory = 'OVRO'
-        elif source.lower()=='ecallisto':
-            from .sources import ecallisto
-            s = ecallisto.get_dspec(fname, doplot=False)
-            self.data = s['spectrogram']
-            self.time_axis = Time(s['time_axis'], format='mjd')
-            self.freq_axis = s['spectrum_axis'] * 1e6
-            self.spec_unit = 'sfu'
-            self.telescope = 'e-callisto'
-            self.observatory = 'e-callisto'
+        timerange = kwargs.pop('timerange', None)
+        freqrange = kwargs.pop('freqrange', None)
+        lazy = kwargs.pop('lazy', None)
+        if timerange is not None and len(timerange) > 0:
+            timerange = Time(timerange)
         else:
-            raise ValueError(f"Unsupported data source or type provided: {source}")
+            timerange = None
+        if freqrange is not None and len(freqrange) == 0:
+            freqrange = None
+
+        if source is None:
+            source = sources.sniff_source(fname)
+            if source is None:
+                fname0 = fname[0] if isinstance(fname, (list, tuple)) else fname
+                raise ValueError(f"The filetype provided ({os.path.basename(str(fname0))}) is not supported")
+        source = source.lower()
+        ## keep the source names used before the reader registry
+        is_fits = isinstance(fname, str) and fname.lower().endswith(('.fits', '.fts', '.fit'))
+        lwa_fits = source == 'lwa' and is_fits
+        if isinstance(fname, str) and os.path.basename(fname).lower().startswith('eovsa') and is_fits:
+            source = 'eovsa'
+        elif lwa_fits:
+            source = 'general'
+        elif source == 'suncasa' and h5store.is_h5(fname):
+            source = 'suncasa_h5'
+        ## only the LWA beamforming and e-Callisto readers take extra keywords
+        if source not in ['lwa', 'ecallisto']:
+            kwargs = {}
+        if lazy is None:
+            lazy = source == 'suncasa_h5'
+
+        entry, reader = sources.get_reader(source)
+        s = reader.read_dspec(fname, timerange=timerange, freqrange=freqrange, lazy=lazy, **kwargs)
+        if not entry['partial'] and (timerange is not None or freqrange is not None):
+            tsel, fsel = sources.time_freq_slices(s['time_axis'], s['freq_axis'], timerange, freqrange)
+            s['data'] = s['data'][..., fsel, tsel]
+            s['time_axis'] = s['time_axis'][tsel]
+            s['freq_axis'] = s['freq_axis'][fsel]
+        if lwa_fits:
+            s.update({'spec_unit': 'sfu', 'telescope': 'LWA', 'observatory': 'OVRO'})
+        for k, v in s.items():
+            if k == 'time_axis':
+                v = Time(v, format='mjd')
+            setattr(self, k, v)
 
     def tofits(self, fitsfile=None, specdata=None, spectype='amp', spec_unit='jy',
                telescope='EOVSA', observatory='Owens Valley Radio Observatory', observer='EOVSA Team'):
@@ -449,7 +549,7 @@ class Dspec:
             except:
                 print('Something is wrong with the input specdata.')
 
-        hdu = fits.PrimaryHDU(spec)
+        hdu = fits.PrimaryHDU(np.asarray(spec))
         # Set up the extensions: sfreq, ut
         col1 = fits.Column(name='sfreq', format='E', array=freqghz)
         cols1 = fits.ColDefs([col1])
@@ -535,19 +635,12 @@ class Dspec:
             bl = ''
         else:
             uvrange = ''
-        # Open the ms and plot dynamic spectrum
-        if verbose:
-            print('Splitting selected data...')
-
-        if usetbtool:
-            if datacolumn.lower() == 'data':
-                datacol = 'DATA'
-                print('Using DATA column')
-            if datacolumn.lower() == 'corrected':
-                datacol = 'CORRECTED_DATA'
-                print('Using CORRECTED_DATA column')
+        medianed = False
+        if timebin in ['0s', '', 0, None] and not regridfreq:
+            ## read the selected rows directly into the output; split is only needed for time averaging or
+            ## regridding. usetbtool is kept for compatibility.
             if verbose:
-                print('using table tool to extract the data')
+                print('reading the selected data in chunks')
             try:
                 tb.open(fname + '/POLARIZATION')
                 corrtype = tb.getcell('CORR_TYPE', 0)
@@ -559,200 +652,11 @@ class Dspec:
             if hanning:
                 hanningsmooth(vis=fname, datacolumn='data', field=field, outputvis=fname + '.tmpms')
                 fname = fname + '.tmpms'
-            tb.open(fname)
-            spwtb = tbtool()
-            spwtb.open(fname + '/SPECTRAL_WINDOW')
-            ptb = tbtool()
-            ptb.open(fname + '/POLARIZATION')
-            npol = ptb.getcol('NUM_CORR', 0, 1)[0]
-            ptb.close()
-
-            ms.open(fname)
-            # ms.selectinit(datadescid=0)
-            spwlist = []
-            mdata = ms.metadata()
-            # determine how many unique spws
-            # now it ignores the spw parameter and use all of them
-            spws_flds = mdata.spwsforfields()
-            spws_ = []
-            for k in spws_flds.keys():
-                spws_.append(spws_flds[k])
-            spws_unq = np.unique(spws_)
-            nspw = len(spws_unq)
-            nbaselines = mdata.nbaselines()
-            nantennas = mdata.nantennas()
-            scannumbers = mdata.scannumbers()
-            spw_nfrq = []  # List of number of frequencies in each spw
-            for i in spws_unq:
-                spw_nfrq.append(mdata.nchan(i))
-            spw_nfrq = np.array(spw_nfrq)
-            nf = np.sum(spw_nfrq)
-            smry = mdata.summary()
-
-            scanids = sorted(smry['observationID=0']['arrayID=0'].keys())
-            ## todo find a way to determine the target fieldID if multi-fields exist
-            smryscan0 = smry['observationID=0']['arrayID=0'][scanids[0]]
-            fieldid = ''
-            for k in smryscan0.keys():
-                if k.startswith('fieldID='):
-                    fieldid = k
-                    break
-            nbl = int(smryscan0[fieldid]['0']['nrows'] / nspw)
-            if nbl == nbaselines + nantennas:
-                hasautocorr = True
-            elif nbl == nbaselines:
-                hasautocorr = False
-            else:
-                raise (ValueError('The baseline number is not correct.'))
-
-            antmask = []
-            if uvrange != '' or bl != '':
-                ms.open(fname)
-                ms.selectinit(datadescid=0, reset=True)
-                mdata = ms.metadata()
-                antlist = mdata.antennaids()
-                smry = mdata.summary()
-                mdata.done()
-                staql = {'uvdist': uvrange, 'baseline': bl, 'spw': spw, 'field': field, 'scan': scan,
-                         'timerange': timeran}
-                ### todo the selection only works for uvrange and bl. To make the selection of other items works,
-                a = ms.msselect(staql)
-                mdata = ms.metadata()
-                baselines = mdata.baselines()
-                if hasautocorr:
-                    for lidx, l in enumerate(antlist):
-                        antmask.append(baselines[l][antlist[lidx:]])
-                else:
-                    for lidx, l in enumerate(antlist):
-                        antmask.append(baselines[l][antlist[lidx + 1:]])
-                antmask = np.hstack(antmask)
-                mdata.done()
-                ms.close()
-                ms.open(fname)
-
-            scan_ntimes = []  # List of number of times in each scan
-            nrows = []
-            for s, scanid in enumerate(scanids):
-                smryscan = smry['observationID=0']['arrayID=0'][scanid]
-                nrow = next(v for k, v in smryscan.items() if 'fieldID=' in k)['nrows']
-                nrows.append(nrow)
-                scan_ntimes.append(nrow / nspw / nbl)
-            scan_ntimes = np.array(scan_ntimes)
-            scan_ntimes_integer = scan_ntimes.astype(int)
-            if len(np.where(scan_ntimes % scan_ntimes_integer != 0)[0]) != 0:
-                # if True:
-                scan_ntimes = []  # List of number of times in each scan
-                for s, scanid in enumerate(scanids):
-                    nrows_scan = []  ## get the nrows for each time. They are not always the SAME!
-                    smryscan = smry['observationID=0']['arrayID=0'][scanid]
-                    # for k, v in smryscan['fieldID=0'].items():
-                    #     if isinstance(v,dict):
-                    #         nrows_scan.append(v['nrows'])
-                    nrows_scan.append(next(v for k, v in smryscan.items() if 'fieldID=' in k)['nrows'])
-                    scan_ntimes.append(nrows[s] / max(set(nrows_scan)))
-                    # scan_ntimes.append(
-                    #     len(smry['observationID=0']['arrayID=0'][scanids[scannumber]]['fieldID=0'].keys()) - 6)
-                scan_ntimes = np.array(scan_ntimes).astype(int)
-            else:
-                scan_ntimes = scan_ntimes_integer
-
-            nt = np.sum(scan_ntimes)
-            times = tb.getcol('TIME')
-            if times[nbl] - times[0] != 0:
-                # This is frequency/scan sort order
-                order = 'f'
-            elif times[nbl * nspw - 1] - times[0] != 0:
-                # This is time sort order
-                order = 't'
-            else:
-                order = 'f'
-
-            freq = np.zeros(nf, float)
-            times = np.zeros(nt, float)
-            if verbose:
-                print("npol, nf, nt, nbl:", npol, nf, nt, nbl)
-            if order == 't':
-                specamp = np.zeros((npol, nf, nbl, nt), complex)
-                flagf = np.zeros((npol, nf, nbl, nt), int)
-                for j in range(nt):
-                    fptr = 0
-                    # Loop over spw
-                    for i, sp in enumerate(spws_unq):
-                        # Get channel frequencies for this spw (annoyingly comes out as shape (nf, 1)
-                        cfrq = spwtb.getcol('CHAN_FREQ', sp, 1)[:, 0]
-                        if j == 0:
-                            # Only need this the first time through
-                            spwlist += [i] * len(cfrq)
-                        if i == 0:
-                            times[j] = tb.getcol('TIME', nbl * (i + nspw * j), 1)  # Get the time
-                        spec_ = tb.getcol(datacol, nbl * (i + nspw * j), nbl)  # Get complex data for this spw
-                        flag = tb.getcol('FLAG', nbl * (i + nspw * j), nbl)  # Get flags for this spw
-                        nfrq = len(cfrq)
-                        # Apply flags
-                        if applyflag:
-                            if type(fillnan) in [int, float]:
-                                spec_[flag] = float(fillnan)
-                            else:
-                                spec_[flag] = 0.0
-                        # Insert data for this spw into larger array
-                        specamp[:, fptr:fptr + nfrq, :, j] = spec_
-                        flagf[:, fptr:fptr + nfrq, :, j] = flag
-                        freq[fptr:fptr + nfrq] = cfrq
-                        fptr += nfrq
-            else:
-                specf = np.zeros((npol, nf, nt, nbl), complex)  # Array indexes are swapped
-                # flagf = np.zeros((npol, nf, nt, nbl), int)  # Array indexes are swapped
-                # ant1 = np.zeros((nt, nbl), int)  # Array indexes are swapped
-                # ant2 = np.zeros((nt, nbl), int)  # Array indexes are swapped
-                iptr = 0
-                for j, scanid in enumerate(scanids):
-                    # Loop over scans
-                    s = scan_ntimes[j]
-                    s1 = np.sum(scan_ntimes[:j])  # Start time index
-                    s2 = np.sum(scan_ntimes[:j + 1])  # End time index
-                    if verbose:
-                        print('=======Filling up scan #{0:d} frm:{1:d}-{2:d}======='.format(j, s1, s2))
-                    for i, sp in enumerate(spws_unq):
-                        # Loop over spectral windows
-                        f = spw_nfrq[i]
-                        f1 = np.sum(spw_nfrq[:i])  # Start freq index
-                        f2 = np.sum(spw_nfrq[:i + 1])  # End freq index
-                        if verbose:
-                            print('Filling up spw #{0:d} chn:{1:d}--{2:d}'.format(i, f1, f2))
-                        spec_ = tb.getcol(datacol, iptr, nbl * s)
-                        flag = tb.getcol('FLAG', iptr, nbl * s)
-                        if j == 0:
-                            cfrq = spwtb.getcol('CHAN_FREQ', sp, 1)[:, 0]
-                            freq[f1:f2] = cfrq
-                            spwlist += [i] * len(cfrq)
-                        times[s1:s2] = tb.getcol('TIME', iptr, nbl * s).reshape(s, nbl)[:, 0]  # Get the times
-                        # Apply flags
-                        if applyflag:
-                            if type(fillnan) in [int, float]:
-                                spec_[flag] = float(fillnan)
-                            else:
-                                spec_[flag] = 0.0
-                        # Insert data for this spw into larger array
-                        specf[:, f1:f2, s1:s2] = spec_.reshape(npol, f, s, nbl)
-                        # flagf[:, f1:f2, s1:s2] = flag.reshape(npol, f, s, nbl)
-                        # if i==0:
-                        #     ant1[s1:s2] = ant1_.reshape(s, nbl)
-                        #     ant2[s1:s2] = ant2_.reshape(s, nbl)
-                        # Swap the array indexes back to the desired order
-                        # except:
-                        #     print('error processing spw {}'.format(i))
-                        iptr += nbl * s
-                specamp = np.swapaxes(specf, 2, 3)
-                # flagf = np.swapaxes(flagf, 2, 3)
-            # if applyflag:
-            #     specamp = np.ma.masked_array(specamp, flagf)
-            tb.close()
-            spwtb.close()
-            ms.close()
-            if len(antmask) > 0:
-                specamp = specamp[:, :, np.where(antmask)[0], :]
+            medianed = domedian and not ds_normalised
+            specamp, tim, freq = extract_dspec(fname, bl=bl, uvrange=uvrange, field=field, scan=scan, spw=spw,
+                                               timeran=timeran, datacolumn=datacolumn, domedian=medianed,
+                                               applyflag=applyflag, fillnan=fillnan, verbose=verbose)
             (npol, nfreq, nbl, ntim) = specamp.shape
-            tim = times
             if hanning:
                 os.system('rm -rf {}'.format(fname))
         else:
@@ -852,7 +756,9 @@ class Dspec:
             print('npol, nfreq, nbl, ntime:', (npol, nfreq, nbl, ntim))
         spec = np.swapaxes(specamp, 2, 1)
 
-        if domedian:
+        if medianed:
+            ospec = spec
+        elif domedian:
             if verbose:
                 print('doing median of all the baselines')
             # mask zero values before median
@@ -884,15 +790,33 @@ class Dspec:
             specfile = msfile + '.dspec.npz'
         if os.path.exists(specfile):
             os.system('rm -rf ' + specfile)
-        np.savez(specfile, spec=ospec, tim=tim, freq=freq,
-                 timeran=timeran, spw=spw, bl=bl, uvrange=uvrange, pol=pol)
+        if h5store.is_h5(specfile):
+            h5store.write_h5(specfile, ospec, tim, freq, timeran=timeran, spw=spw, bl=bl, uvrange=uvrange, pol=pol)
+        else:
+            np.savez(specfile, spec=ospec, tim=tim, freq=freq,
+                     timeran=timeran, spw=spw, bl=bl, uvrange=uvrange, pol=pol)
         if verbose:
             print('Median dynamic spectrum saved as: ' + specfile)
 
         self.read(specfile)
         return specfile
 
-    def wrt_dspec(self, specfile=None, specdat=None):
+    def wrt_dspec(self, specfile=None, specdat=None, maxchunkmb=256):
+        """
+        Writes the dynamic spectrum of a ``.dspec.npz`` file (or a dynamic spectrum store) to a flat binary file
+        for IDL. The file contains the frequencies (nf float32), the times (nt float64), and the spectrum
+        (float32) in the order of (nf, nt, npl, nbl), all in the native byte order. A complex spectrum is written
+        as its amplitude.
+
+        Parameters
+        ----------
+        specfile : str
+            Name of the input dynamic spectrum file.
+        specdat : str, optional
+            Name of the output binary file. Defaults to specfile with 'npz' replaced by 'dat'.
+        maxchunkmb : float, optional
+            Approximate size in MB of each block of the spectrum converted and written at a time.
+        """
         try:
             specfile
         except NameError:
@@ -900,27 +824,70 @@ class Dspec:
         if not specdat:
             print('Output file name is not specified, use the default convention')
             specdat = specfile.replace('npz', 'dat')
-        specdata = np.load(specfile)
-        spec = np.copy(specdata['spec'][:, :, :, :])
+        if h5store.is_h5(specfile):
+            spec, tim, freq, _, _, _ = h5store.read_h5(specfile, spectype='amp', spec_unit='sfu')
+        else:
+            specdata = np.load(specfile)
+            spec = specdata['spec']
+            tim = specdata['tim']
+            freq = specdata['freq']
         npl, nbl, nf, nt = spec.shape
         print('Dimension of the data cube -- # of pol, # of baseline, # of frequency, # of time:')
         print(npl, nbl, nf, nt)
-        nele = npl * nbl * nf * nt
-        # need to transpose to nf, nt, npl, nbl
-        spec = np.transpose(spec, (2, 3, 0, 1))
-        # Turn fmx into a 1d array for writing
-        spec = spec.flatten()
-        # Pack the data into a byte buffer.  Note the asterisks in the next three lines!
-        # If your data includes integers or other data types, use 'i' or other instead of 'f'
-        buf = struct.pack(str(nf) + 'f', *specdata['freq'])
-        buf += struct.pack(str(nt) + 'd', *specdata['tim'])
-        buf += struct.pack(str(nele) + 'f', *spec)
+        ## the spectrum is written in blocks of frequency rows, transposed to (nf, nt, npl, nbl)
+        nfchunk = max(1, int(maxchunkmb * 1024. ** 2 / (4. * nt * npl * nbl)))
         with open(specdat, 'wb') as f:
-            f.write(buf)
-        f.close()
+            np.asarray(freq, dtype=np.float32).ravel().tofile(f)
+            np.asarray(tim, dtype=np.float64).ravel().tofile(f)
+            for f0 in range(0, nf, nfchunk):
+                f1 = min(f0 + nfchunk, nf)
+                block = np.transpose(np.asarray(spec[:, :, f0:f1, :]), (2, 3, 0, 1))
+                if np.iscomplexobj(block):
+                    ## complex spectrum from get_dspec(domedian=False): write the amplitude, as read_h5 does
+                    block = np.abs(block)
+                np.ascontiguousarray(block, dtype=np.float32).tofile(f)
+
+    @staticmethod
+    def rd_dspec_dat(specdat, nf, npl=1, nbl=1, mmap=True):
+        """
+        Reads a binary file written by `wrt_dspec`.
+
+        Parameters
+        ----------
+        specdat : str
+            Name of the binary file.
+        nf : int
+            Number of frequencies.
+        npl, nbl : int, optional
+            Number of polarizations and baselines. The number of times is derived from the file size.
+        mmap : bool, optional
+            If True, the spectrum is returned as a read-only `numpy.memmap` and is only read on access.
+
+        Returns
+        -------
+        spec : numpy.ndarray
+            Spectrum in the shape of (nf, nt, npl, nbl).
+        tim : numpy.ndarray
+        freq : numpy.ndarray
+        """
+        nbytes = os.path.getsize(specdat)
+        nt = (nbytes - 4 * nf) // (8 + 4 * nf * npl * nbl)
+        if 4 * nf + nt * (8 + 4 * nf * npl * nbl) != nbytes:
+            raise ValueError('The size of {} does not match nf={}, npl={}, nbl={}.'.format(specdat, nf, npl, nbl))
+        freq = np.fromfile(specdat, dtype=np.float32, count=nf)
+        tim = np.fromfile(specdat, dtype=np.float64, count=nt, offset=4 * nf)
+        offset = 4 * nf + 8 * nt
+        if mmap:
+            spec = np.memmap(specdat, dtype=np.float32, mode='r', offset=offset, shape=(nf, nt, npl, nbl))
+        else:
+            spec = np.fromfile(specdat, dtype=np.float32, offset=offset).reshape((nf, nt, npl, nbl))
+        return spec, tim, freq
 
     def rd_dspec(self, specdata, spectype='amp', spec_unit='jy'):
         spectype = spectype.lower()
+        if h5store.is_h5(specdata):
+            # on-disk store: the spectrum is read lazily, chunk by chunk
+            return h5store.read_h5(specdata, spectype=spectype, spec_unit=spec_unit)
         if type(specdata) is str:
             try:
                 specdata = np.load(specdata)
@@ -971,39 +938,71 @@ class Dspec:
         '''
         concatenate a list of specfiles in time axis
         :param specfiles: a list of specfile to concatenate
-        :return: concatenated specdata
+        :param outfile: name of the output specfile. If outfile is a dynamic spectrum store (.h5) that already
+                        exists, the specfiles are appended to it without rewriting the data already on disk
+        :return: concatenated specdata. If outfile is a dynamic spectrum store, the name of the store is returned
         '''
         from tqdm import tqdm
         if isinstance(specfiles, list):
             if len(specfiles) > 1:
                 specfiles = sorted(specfiles)
-            else:
+            elif not (outfile and h5store.is_h5(outfile) and os.path.exists(outfile)):
                 print('Abort. Only one specfile is provided.')
                 return -1
         else:
             print('Please provide a list of specfiles')
             return -1
 
-        specdata = {}
-
-        specdata_ = np.load(specfiles[0])
-        for k, v in specdata_.iteritems():
-            specdata[k] = v
-
+        if outfile and h5store.is_h5(outfile):
+            if not os.path.exists(outfile):
+                specdata_ = self._load_specdata(specfiles[0])
+                h5store.write_h5(outfile, specdata_['spec'], specdata_['tim'], specdata_['freq'],
+                                 bl=specdata_.get('bl', ''), pol=specdata_.get('pol', []),
+                                 timeran=specdata_.get('timeran', ''), spw=specdata_.get('spw', ''),
+                                 uvrange=specdata_.get('uvrange', ''))
+                specfiles = specfiles[1:]
+            for spfile in tqdm(specfiles):
+                specdata_ = self._load_specdata(spfile)
+                h5store.append_h5(outfile, specdata_['spec'], specdata_['tim'])
+            return outfile
+
+        specdata = self._load_specdata(specfiles[0])
+        spec = [specdata['spec']]
+        tim = [specdata['tim']]
         for spfile in tqdm(specfiles[1:]):
-            specdata_ = np.load(spfile)
-            specdata['spec'] = np.concatenate((specdata['spec'], specdata_['spec']), axis=-1)
-            specdata['tim'] = np.hstack((specdata['tim'], specdata_['tim']))
+            specdata_ = self._load_specdata(spfile)
+            spec.append(specdata_['spec'])
+            tim.append(specdata_['tim'])
+        specdata['spec'] = np.concatenate(spec, axis=-1)
+        specdata['tim'] = np.hstack(tim)
 
         if savespec:
-            if not outfile:
+            specfile = outfile
+            if not specfile:
                 specfile = 'dspec.npz'
             if os.path.exists(specfile):
                 os.system('rm -rf ' + specfile)
             np.savez(specfile, **specdata)
         return specdata
 
-
+    @staticmethod
+    def _load_specdata(specfile):
+        '''
+        load the raw content of a specfile (.npz file or dynamic spectrum store) into a dictionary
+        '''
+        specdata = {}
+        if h5store.is_h5(specfile):
+            import h5py
+            with h5py.File(specfile, 'r') as f:
+                for k in ['spec', 'tim', 'freq']:
+                    specdata[k] = f[k][()]
+                for k, v in f.attrs.items():
+                    specdata[k] = v
+        else:
+            specdata_ = np.load(specfile)
+            for k, v in specdata_.items():
+                specdata[k] = v
+        return specdata
 
     def peek(self, *args, **kwargs):
         """
@@ -1099,6 +1098,25 @@ class Dspec:
             return 0
 
         spec = self.data
+        time_axis = self.time_axis
+        freq_axis = self.freq_axis
+        if isinstance(spec, h5store.DspecH5Array):
+            # only read the chunks of the on-disk store within timerange and freqrange
+            tsel = slice(None)
+            fsel = slice(None)
+            if timerange:
+                trange_ = Time(timerange) if isinstance(timerange[0], str) else timerange
+                tidx_ = np.where((time_axis >= trange_[0]) & (time_axis <= trange_[1]))[0]
+                if len(tidx_) > 0:
+                    tsel = slice(tidx_[0], tidx_[-1] + 1)
+            if freqrange:
+                funit = {'ghz': 1e9, 'mhz': 1e6, 'khz': 1e3}.get(freq_unit.lower(), 1.0)
+                fidx_ = np.where((freq_axis >= freqrange[0] * funit) & (freq_axis <= freqrange[1] * funit))[0]
+                if len(fidx_) > 0:
+                    fsel = slice(fidx_[0], fidx_[-1] + 1)
+            spec = spec[..., fsel, tsel]
+            time_axis = time_axis[tsel]
+            freq_axis = freq_axis[fsel]
 
         try:
             cmap = copy(plt.get_cmap(cmap))
@@ -1116,14 +1134,14 @@ class Dspec:
             norm = colors.LogNorm(vmax=vmax, vmin=vmin)
 
         bl = self.bl
-        freq = self.freq_axis
+        freq = freq_axis
         if spec_unit is None:
             spec_unit = self.spec_unit
         elif spec_unit.lower() != self.spec_unit.lower():
             if spec_unit.lower() == 'sfu' and self.spec_unit.lower() == 'jy':
-                spec = np.copy(self.data) / 1e4
+                spec = np.copy(spec) / 1e4
             elif spec_unit.lower() == 'jy' and self.spec_unit.lower() == 'sfu':
-                spec = np.copy(self.data) * 1e4
+                spec = np.copy(spec) * 1e4
             else:
                 print('Spectrum unit conversion from {0:s} to {1:s} not supported'.format(self.spec_unit, spec_unit))
                 print('Use the original one.')
@@ -1141,7 +1159,7 @@ class Dspec:
             spec_name = 'Intensity'
 
         if spec.ndim == 2:
-            nfreq, ntim = len(self.freq_axis), len(self.time_axis)
+            nfreq, ntim = len(freq_axis), len(time_axis)
             npol = 1
             nbl = 1
             polnames = self.pol
@@ -1152,7 +1170,7 @@ class Dspec:
                 print('The polarization dimension in the data {0:d} does not match the names {1:d}. Abort.'.format(npol,
                                                                                                                    len(polnames)))
 
-        tim_ = self.time_axis
+        tim_ = time_axis
         tim_plt = tim_.plot_date
 
         if timerange:
@@ -0,0 +1,190 @@
+"""
+Chunked on-disk store for dynamic spectra.
+
+The dynamic spectrum is kept in an HDF5 file with the same layout as the ``.dspec.npz`` files written by
+`Dspec.get_dspec`: a ``spec`` dataset of shape (npol, nbl, nfreq, ntime), a ``tim`` dataset (MJD seconds), and a
+``freq`` dataset (Hz). ``spec`` and ``tim`` are chunked over frequency and time and are resizable along the time
+axis, so that a spectrogram can be written incrementally and later extended (e.g., day by day) without rewriting
+the data already on disk. Reading is lazy: `DspecH5Array` only reads the chunks covered by a slice.
+"""
+
+import os
+
+import h5py
+import numpy as np
+
+__all__ = ['DspecH5Array', 'write_h5', 'append_h5', 'read_h5', 'is_h5']
+
+_h5_extensions = ('.h5', '.hdf5')
+
+
+def is_h5(specfile):
+    """
+    Returns True if specfile is a dynamic spectrum store (by extension, or an existing HDF5 file).
+    """
+    if not isinstance(specfile, str):
+        return False
+    if specfile.lower().endswith(_h5_extensions):
+        return True
+    return os.path.isfile(specfile) and h5py.is_hdf5(specfile)
+
+
+def _chunks(shape, tchunk=1024, fchunk=256):
+    npol, nbl, nfreq, ntim = shape
+    return (1, 1, max(1, min(nfreq, fchunk)), max(1, min(ntim, tchunk)))
+
+
+def write_h5(specfile, spec, tim, freq, bl='', pol=[], timeran='', spw='', uvrange='', tchunk=1024, fchunk=256):
+    """
+    Creates a dynamic spectrum store and writes the first block of data into it.
+
+    Parameters
+    ----------
+    specfile : str
+        Name of the output HDF5 file. An existing file is overwritten.
+    spec : numpy.ndarray
+        Dynamic spectrum in the shape of (npol, nbl, nfreq, ntime). ntime may be 0 to create an empty store
+        to be filled with `append_h5`.
+    tim : numpy.ndarray
+        Time axis in MJD seconds.
+    freq : numpy.ndarray
+        Frequency axis in Hz.
+    bl, pol, timeran, spw, uvrange : optional
+        Selection metadata, stored in the same way as in the ``.dspec.npz`` files.
+    tchunk, fchunk : int, optional
+        Chunk size along the time and frequency axes.
+
+    Returns
+    -------
+    specfile : str
+    """
+    if os.path.exists(specfile):
+        os.system('rm -rf ' + specfile)
+    spec = np.asarray(spec)
+    npol, nbl, nfreq, ntim = spec.shape
+    with h5py.File(specfile, 'w') as f:
+        f.create_dataset('spec', data=spec, maxshape=(npol, nbl, nfreq, None),
+                         chunks=_chunks(spec.shape, tchunk, fchunk))
+        f.create_dataset('tim', data=np.asarray(tim, dtype=float), maxshape=(None,),
+                         chunks=(max(1, min(ntim, tchunk)),))
+        f.create_dataset('freq', data=np.asarray(freq, dtype=float).ravel())
+        f.attrs['bl'] = str(bl)
+        f.attrs['pol'] = [str(p) for p in pol]
+        f.attrs['timeran'] = str(timeran)
+        f.attrs['spw'] = str(spw)
+        f.attrs['uvrange'] = str(uvrange)
+    return specfile
+
+
+def append_h5(specfile, spec, tim):
+    """
+    Appends a block of data along the time axis of an existing dynamic spectrum store.
+    Data already on disk are not rewritten.
+
+    Parameters
+    ----------
+    specfile : str
+        Name of the HDF5 file created by `write_h5`.
+    spec : numpy.ndarray
+        Dynamic spectrum in the shape of (npol, nbl, nfreq, ntime) with the same npol, nbl, and nfreq as the store.
+    tim : numpy.ndarray
+        Time axis of the block in MJD seconds.
+    """
+    spec = np.asarray(spec)
+    with h5py.File(specfile, 'a') as f:
+        dspec = f['spec']
+        dtim = f['tim']
+        if spec.shape[:3] != dspec.shape[:3]:
+            raise ValueError('The shape of the data to append {} does not match the store {}.'.format(
+                spec.shape[:3], dspec.shape[:3]))
+        nt0 = dspec.shape[-1]
+        nt1 = nt0 + spec.shape[-1]
+        dspec.resize(nt1, axis=3)
+        dtim.resize((nt1,))
+        dspec[:, :, :, nt0:nt1] = spec
+        dtim[nt0:nt1] = tim
+
+
+class DspecH5Array:
+    """
+    Array-like, read-only view of the ``spec`` dataset of a dynamic spectrum store.
+
+    Slicing reads only the chunks covered by the slice and converts the data on the fly in the same way as
+    `Dspec.rd_dspec` (amplitude or phase of complex data, and the Jy scaling). ``numpy.asarray`` reads the
+    entire dataset.
+    """
+
+    def __init__(self, specfile, spectype='amp', scale=1.0):
+        self.specfile = specfile
+        self.spectype = spectype
+        self.scale = scale
+        with h5py.File(specfile, 'r') as f:
+            self.shape = f['spec'].shape
+            self._dtype = f['spec'].dtype
+        if np.issubdtype(self._dtype, np.complexfloating):
+            self.dtype = np.dtype(float)
+        else:
+            self.dtype = self._dtype
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _convert(self, data):
+        if np.iscomplexobj(data):
+            if self.spectype == 'pha':
+                return np.angle(data)
+            data = np.abs(data)
+        if self.scale != 1.0:
+            data = data * self.scale
+        return data
+
+    def __getitem__(self, key):
+        with h5py.File(self.specfile, 'r') as f:
+            data = f['spec'][key]
+        return self._convert(data)
+
+    def __array__(self, dtype=None, copy=None):
+        data = self[...]
+        if dtype is not None:
+            data = data.astype(dtype)
+        return data
+
+    def __repr__(self):
+        return '<DspecH5Array {} shape={} dtype={}>'.format(self.specfile, self.shape, self.dtype)
+
+
+def read_h5(specfile, spectype='amp', spec_unit='jy'):
+    """
+    Opens a dynamic spectrum store lazily.
+
+    Returns the same items as `Dspec.rd_dspec`, with the spectrum returned as a `DspecH5Array`.
+
+    Returns
+    -------
+    spec, tim, freq, bl, pol, spec_unit
+    """
+    spectype = spectype.lower()
+    if spectype not in ['amp', 'pha']:
+        raise ValueError('spectype must be amp or phase!')
+    if spec_unit.lower() == 'jy':
+        scale = 1.e-4
+    elif spec_unit.lower() == 'sfu' or spec_unit.lower() == 'k':
+        scale = 1.0
+    else:
+        raise ValueError("Input spec_unit is {}. "
+                         "If spectype = 'amp', spec_unit must be 'jy', 'sfu', or 'k'".format(spec_unit))
+    spec = DspecH5Array(specfile, spectype=spectype, scale=scale)
+    with h5py.File(specfile, 'r') as f:
+        tim = f['tim'][:]
+        freq = f['freq'][:]
+        bl = f.attrs.get('bl', '')
+        pol = list(f.attrs.get('pol', []))
+    return spec, tim, freq, bl, pol, spec_unit
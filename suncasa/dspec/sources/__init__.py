@@ -0,0 +1,138 @@
+"""
+Registry of the dynamic spectrum readers used by `suncasa.dspec.Dspec.read`.
+
+Each reader is registered with the module that implements it, the file signature (magic bytes) it can handle,
+and whether it supports partial and lazy reads. A reader module is only imported when a file is sniffed as a
+possible match or when the reader is requested by name. A reader module provides
+
+- ``sniff(fname)``: returns True if fname (a file name or a list of file names) can be read by the module.
+  Only the header/metadata should be inspected.
+- ``read_dspec(fname, timerange=None, freqrange=None, lazy=False, **kwargs)``: returns a dictionary with the keys
+  ``data``, ``time_axis`` (MJD), ``freq_axis`` (Hz), and optionally ``pol``, ``bl``, ``spec_unit``, ``telescope``,
+  ``observatory``, ``spec_name``, ``calfac_x``, ``calfac_y``, ``bkg_flux``. timerange is a `astropy.time.Time`
+  of two elements and freqrange is a list of two frequencies in Hz.
+"""
+
+import importlib
+
+import numpy as np
+
+_magic = {
+    'fits': b'SIMPLE  ',
+    'hdf5': b'\x89HDF\r\n\x1a\n',
+    'npz': b'PK\x03\x04',
+}
+
+_readers = {}
+
+
+def register_reader(name, module, magic=None, extensions=(), partial=False, lazy=False):
+    """
+    Registers a dynamic spectrum reader.
+
+    Parameters
+    ----------
+    name : str
+        Name of the source, used as ``Dspec.read(fname, source=name)``.
+    module : str
+        Full name of the module that implements ``sniff`` and ``read_dspec``.
+    magic : str, optional
+        File signature the reader can handle, one of 'fits', 'hdf5', or 'npz'.
+    extensions : tuple of str, optional
+        File extensions used as a fallback when the content can not be sniffed.
+    partial : bool, optional
+        True if the reader only reads the requested timerange and freqrange from disk.
+    lazy : bool, optional
+        True if the reader can return the data as an array-like proxy that is read on access.
+    """
+    _readers[name] = {'module': module, 'magic': magic, 'extensions': tuple(extensions), 'partial': partial,
+                      'lazy': lazy}
+
+
+def readers():
+    """
+    Returns the names of the registered readers with their capabilities.
+    """
+    return {k: {'partial': v['partial'], 'lazy': v['lazy']} for k, v in _readers.items()}
+
+
+def get_reader(name):
+    """
+    Returns the registry entry and the module of the reader registered as name. The module is imported here.
+    """
+    if name not in _readers:
+        raise ValueError(f"Unsupported data source or type provided: {name}")
+    entry = _readers[name]
+    return entry, importlib.import_module(entry['module'])
+
+
+def file_magic(fname):
+    """
+    Returns the type of the file signature of fname ('fits', 'hdf5', 'npz') or None.
+    """
+    if isinstance(fname, (list, tuple)):
+        fname = fname[0]
+    try:
+        with open(fname, 'rb') as f:
+            head = f.read(8)
+    except (IOError, OSError, TypeError):
+        return None
+    for k, v in _magic.items():
+        if head.startswith(v):
+            return k
+    return None
+
+
+def sniff_source(fname):
+    """
+    Finds the reader for fname from the file content, falling back to the file extension.
+    Returns the name of the reader or None.
+    """
+    magic = file_magic(fname)
+    if magic is not None:
+        for name, entry in _readers.items():
+            if entry['magic'] != magic:
+                continue
+            try:
+                if importlib.import_module(entry['module']).sniff(fname):
+                    return name
+            except ImportError:
+                continue
+    fname0 = fname[0] if isinstance(fname, (list, tuple)) else fname
+    for name, entry in _readers.items():
+        if entry['extensions'] and str(fname0).lower().endswith(entry['extensions']):
+            return name
+    return None
+
+
+def time_freq_slices(tmjd, freqhz, timerange=None, freqrange=None):
+    """
+    Returns the slices of the time and frequency axes covered by timerange (`astropy.time.Time` of two elements)
+    and freqrange (list of two frequencies in Hz).
+    """
+    tsel = slice(None)
+    fsel = slice(None)
+    if timerange is not None:
+        tidx, = np.where((tmjd >= timerange[0].mjd) & (tmjd <= timerange[1].mjd))
+        if len(tidx) > 0:
+            tsel = slice(tidx[0], tidx[-1] + 1)
+        else:
+            tsel = slice(0, 0)
+    if freqrange is not None:
+        fidx, = np.where((freqhz >= freqrange[0]) & (freqhz <= freqrange[1]))
+        if len(fidx) > 0:
+            fsel = slice(fidx[0], fidx[-1] + 1)
+        else:
+            fsel = slice(0, 0)
+    return tsel, fsel
+
+
+register_reader('suncasa', 'suncasa.dspec.sources.suncasa', magic='npz', extensions=('.npz',), partial=False,
+                lazy=False)
+register_reader('suncasa_h5', 'suncasa.dspec.sources.suncasa', magic='hdf5', extensions=('.h5', '.hdf5'),
+                partial=True, lazy=True)
+register_reader('lwa', 'suncasa.dspec.sources.lwa', magic='hdf5', partial=True, lazy=False)
+register_reader('eovsa', 'suncasa.dspec.sources.eovsa', magic='fits', partial=True, lazy=True)
+register_reader('ecallisto', 'suncasa.dspec.sources.ecallisto', magic='fits', partial=False, lazy=False)
+register_reader('general', 'suncasa.dspec.sources.general', magic='fits', extensions=('.fits', '.fts', '.fit'),
+                partial=True, lazy=True)
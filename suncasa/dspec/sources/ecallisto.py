@@ -6,11 +6,71 @@ from matplotlib.dates import DateFormatter
 import numpy as np
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 
-def get_dspec(filenames, doplot=False, vmax=None, vmin=None, norm=None, cmap='viridis'):
+def read_axes(filename):
+    """
+    Read the time (MJD) and frequency (MHz) axes of an e-Callisto FITS file without reading the spectrogram.
+    """
+    with fits.open(filename) as hdulist:
+        header = hdulist[0].header
+        info = hdulist[1].data[0]
+        time_sec = np.array(info['TIME'])  # seconds of the day
+        freqs = np.array(info['FREQUENCY'])  # in MHz
+    # Convert to MJD using DATE-OBS + TIME-OBS in header
+    date_obs_str = header.get('DATE-OBS', '').replace('/', '-') + 'T' + header.get('TIME-OBS', '00:00:00.000')
+    t0 = Time(date_obs_str, format='isot', scale='utc')
+    tmjd = t0.mjd + time_sec / 86400.0
+    return tmjd, freqs
+
+
+def common_freqs(freqs_files, atol=1e-3):
+    """
+    Common frequency axis (MHz) of the e-Callisto files with the frequency axes freqs_files. If all the files have
+    the same axis, it is returned as is. Otherwise the union of the axes is returned, with the channels closer than
+    atol (MHz) merged, in the order (ascending or descending) of the first axis.
+    """
+    freqs = np.asarray(freqs_files[0])
+    if all(len(f) == len(freqs) and np.allclose(f, freqs, atol=atol) for f in freqs_files[1:]):
+        return freqs
+    fall = np.sort(np.concatenate([np.asarray(f, dtype=float) for f in freqs_files]))
+    fall = fall[np.concatenate([[True], np.diff(fall) > atol])]
+    if len(freqs) > 1 and freqs[0] > freqs[-1]:
+        fall = fall[::-1]
+    return fall
+
+
+def read_block(args):
+    """
+    Read the spectrogram of an e-Callisto FITS file and regrid it onto the frequency axis freqs (MHz) if needed.
+    args is a tuple of (filename, freqs).
+    """
+    filename, freqs = args
+    with fits.open(filename) as hdulist:
+        spec = np.array(hdulist[0].data, dtype=np.float32)  # shape: (nfreq, ntimes)
+        freqs_file = np.array(hdulist[1].data[0]['FREQUENCY'])
+    if len(freqs_file) == len(freqs) and np.allclose(freqs_file, freqs, atol=1e-3):
+        return spec
+    # regrid each time column onto the common frequency axis
+    order = np.argsort(freqs_file)
+    spec_new = np.empty((len(freqs), spec.shape[1]), dtype=np.float32)
+    for i in range(spec.shape[1]):
+        spec_new[:, i] = np.interp(freqs, freqs_file[order], spec[order, i], left=np.nan, right=np.nan)
+    return spec_new
+
+
+def get_dspec(filenames, doplot=False, vmax=None, vmin=None, norm=None, cmap='viridis', ncpu=1, freqs=None):
     """
     Read one or more e-Callisto spectrogram FITS files and return a combined spectrogram dictionary.
     Optionally display a quicklook plot.
 
+    The time and frequency axes of all the files are read first to resolve the common axes of the output.
+    The frequency axis is the union of the axes of all the files (see common_freqs), or freqs if given, and
+    each file is regridded onto it, with NaN outside of the band of the file. The time axis holds the time
+    samples of all the files in time order, so files that overlap in time (e.g., several stations on the
+    same day) are merged sample by sample. Where two files have a sample at the same time and frequency,
+    the one of the earlier file is kept. Where the time gap between two samples is more than twice
+    the time resolution, a column of NaN is inserted to flag the gap. The spectrograms are read in ncpu
+    parallel processes.
+
     Parameters
     ----------
     filenames : str or list of str
@@ -23,6 +83,10 @@ def get_dspec(filenames, doplot=False, vmax=None, vmin=None, norm=None, cmap='vi
         Custom normalization for the color scale.
     cmap : str or colormap
         Colormap name or object.
+    ncpu : int
+        Number of processes to read the files with.
+    freqs : array_like, optional
+        Frequency axis (MHz) of the output. Defaults to the union of the frequency axes of the files.
 
     Returns
     -------
@@ -36,37 +100,43 @@ def get_dspec(filenames, doplot=False, vmax=None, vmin=None, norm=None, cmap='vi
     if isinstance(filenames, str):
         filenames = [filenames]
 
-    all_specs = []
-    all_times = []
-    freqs = None
+    axes = [read_axes(filename) for filename in filenames]
+    order = np.argsort([tmjd[0] for tmjd, _ in axes])
+    filenames = [filenames[i] for i in order]
+    axes = [axes[i] for i in order]
+    if freqs is None:
+        freqs = common_freqs([freqs_file for _, freqs_file in axes])
+    freqs = np.asarray(freqs)
+    for filename, (_, freqs_file) in zip(filenames, axes):
+        if len(freqs_file) != len(freqs) or not np.allclose(freqs_file, freqs, atol=1e-3):
+            print(f"Warning: frequency axis mismatch in file {filename}. Regridding it onto the common axis.")
 
-    for i, filename in enumerate(filenames):
-        hdulist = fits.open(filename)
-        spec = hdulist[0].data  # shape: (nfreq, ntimes)
-        header = hdulist[0].header
-        info = hdulist[1].data[0]
-
-        time_sec = np.array(info['TIME'])  # seconds of the day
-        freqs_file = np.array(info['FREQUENCY'])  # in MHz
+    # layout of the output in time: the samples of all the files in time order, with a flagged (NaN) column
+    # in each gap
+    dts = [np.median(np.diff(tmjd)) for tmjd, _ in axes if len(tmjd) > 1]
+    dt = np.median(dts) if dts else 0.
+    time_combined = np.unique(np.concatenate([tmjd for tmjd, _ in axes]))
+    if dt > 0 and len(time_combined) > 1:
+        igap, = np.where(np.diff(time_combined) > 2 * dt)
+        time_combined = np.insert(time_combined, igap + 1, (time_combined[igap] + time_combined[igap + 1]) / 2.)
+    cols = [np.searchsorted(time_combined, tmjd) for tmjd, _ in axes]
+    spec_combined = np.full((len(freqs), len(time_combined)), np.nan, dtype=np.float32)
 
-        # Convert to MJD using DATE-OBS + TIME-OBS in header
-        date_obs_str = header.get('DATE-OBS', '').replace('/', '-') + 'T' + header.get('TIME-OBS', '00:00:00.000')
-        t0 = Time(date_obs_str, format='isot', scale='utc')
-        tmjd = t0.mjd + time_sec / 86400.0
-
-        if i == 0:
-            freqs = freqs_file
-        else:
-            if not np.allclose(freqs_file, freqs, atol=1e-3):
-                print(f"Warning: frequency axis mismatch in file {filename}")
-
-        all_specs.append(spec)
-        all_times.append(tmjd)
-        hdulist.close()
-
-    # Concatenate along time axis
-    spec_combined = np.concatenate(all_specs, axis=1)  # concatenate time axis
-    time_combined = np.concatenate(all_times)
+    args = [(filename, freqs) for filename in filenames]
+    if ncpu > 1 and len(filenames) > 1:
+        import multiprocessing as mprocs
+        pool = mprocs.Pool(min(ncpu, len(filenames)))
+        blocks = pool.imap(read_block, args)
+    else:
+        pool = None
+        blocks = map(read_block, args)
+    for icol, spec in zip(cols, blocks):
+        ## keep the samples already filled by an earlier file that overlaps in time
+        spec_old = spec_combined[:, icol]
+        spec_combined[:, icol] = np.where(np.isnan(spec_old), spec, spec_old)
+    if pool is not None:
+        pool.close()
+        pool.join()
 
     # Optional plot
     if doplot:
@@ -108,3 +178,33 @@ def get_dspec(filenames, doplot=False, vmax=None, vmin=None, norm=None, cmap='vi
         'spectrum_axis': freqs,
         'time_axis': time_combined
     }
+
+
+def sniff(filenames):
+    """
+    Returns True if the first of <filenames> is an e-Callisto spectrogram FITS file.
+    """
+    if isinstance(filenames, (list, tuple)):
+        filenames = filenames[0]
+    try:
+        with fits.open(filenames) as hdulist:
+            if len(hdulist) < 2 or not hasattr(hdulist[1], 'columns'):
+                return False
+            names = [n.upper() for n in hdulist[1].columns.names]
+    except (IOError, OSError):
+        return False
+    return 'TIME' in names and 'FREQUENCY' in names
+
+
+def read_dspec(filenames, timerange=None, freqrange=None, lazy=False, ncpu=1):
+    """
+    Read one or more e-Callisto spectrogram FITS files in the format used by `suncasa.dspec.Dspec.read`,
+    trimmed to timerange and freqrange (Hz).
+    """
+    from . import time_freq_slices
+    s = get_dspec(filenames, doplot=False, ncpu=ncpu)
+    freq = np.asarray(s['spectrum_axis']) * 1e6
+    tmjd = np.asarray(s['time_axis'])
+    tsel, fsel = time_freq_slices(tmjd, freq, timerange, freqrange)
+    return {'data': s['spectrogram'][fsel, tsel], 'time_axis': tmjd[tsel], 'freq_axis': freq[fsel],
+            'spec_unit': 'sfu', 'telescope': 'e-callisto', 'observatory': 'e-callisto'}
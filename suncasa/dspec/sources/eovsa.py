@@ -114,3 +114,46 @@ def get_dspec(filename, doplot=False, vmax=None, vmin=None, norm=None, cmap=None
         plt.show()
     hdulist.close()
     return {'spectrogram': spec, 'spectrum_axis': fghz, 'time_axis': tmjd}
+
+
+def sniff(filename):
+    """
+    Returns True if <filename> is an EOVSA dynamic spectrum FITS file.
+    """
+    import os
+    if isinstance(filename, (list, tuple)):
+        return False
+    if os.path.basename(filename).lower().startswith('eovsa'):
+        return True
+    try:
+        header = fits.getheader(filename)
+    except (IOError, OSError):
+        return False
+    return 'EOVSA' in str(header.get('TELESCOP', '')).upper()
+
+
+def read_dspec(filename, timerange=None, freqrange=None, lazy=False):
+    """
+    Read EOVSA Dynamic Spectrum FITS file <filename> in the format used by `suncasa.dspec.Dspec.read`.
+    The spectrogram is memory-mapped, so only the part within timerange and freqrange (Hz) is read from disk.
+    With lazy=True the memory-mapped spectrogram is returned without copying.
+    """
+    from . import time_freq_slices
+    hdulist = fits.open(filename, memmap=True)
+    try:
+        fghz = np.array(hdulist[1].data['sfreq'])
+    except KeyError:
+        fghz = np.array(hdulist[1].data['FGHZ'])
+    tim = hdulist[2].data
+    try:
+        tmjd = np.array(tim['mjd']) + np.array(tim['time']) / 24. / 3600 / 1000
+    except KeyError:
+        tmjd = Time(np.array(tim['TIME']), format='jd').mjd
+    freq = fghz * 1e9
+    tsel, fsel = time_freq_slices(tmjd, freq, timerange, freqrange)
+    spec = hdulist[0].data[..., fsel, tsel]
+    if not lazy:
+        spec = np.array(spec)
+        hdulist.close()
+    return {'data': spec, 'time_axis': tmjd[tsel], 'freq_axis': freq[fsel], 'spec_unit': 'sfu',
+            'telescope': 'EOVSA', 'observatory': 'OVRO'}
@@ -0,0 +1,54 @@
+"""
+Reader for dynamic spectrum FITS files in the format written by `suncasa.dspec.Dspec.tofits`: a primary HDU
+with the spectrogram, an SFREQ extension with the frequencies in GHz, and a UT extension with the times.
+"""
+import numpy as np
+from astropy.io import fits
+
+from . import time_freq_slices
+
+
+def sniff(filename):
+    """
+    Returns True if filename is a FITS file with the SFREQ and UT extensions.
+    """
+    if isinstance(filename, (list, tuple)):
+        return False
+    try:
+        with fits.open(filename) as hdulist:
+            names = [hdu.name for hdu in hdulist]
+    except (IOError, OSError):
+        return False
+    return 'SFREQ' in names and 'UT' in names
+
+
+def read_dspec(filename, timerange=None, freqrange=None, lazy=False):
+    """
+    Reads a dynamic spectrum FITS file. The primary HDU is memory-mapped, so only the part of the data within
+    timerange and freqrange is read from disk. With lazy=True the memory-mapped data are returned without copying.
+    """
+    hdulist = fits.open(filename, memmap=True)
+    header = hdulist[0].header
+    tim = hdulist[2].data
+    tmjd = np.array(tim['mjd']) + np.array(tim['time']) / 24. / 3600 / 1000
+    freq = np.array(hdulist[1].data['sfreq']) * 1e9
+    tsel, fsel = time_freq_slices(tmjd, freq, timerange, freqrange)
+    spec = hdulist[0].data[..., fsel, tsel]
+    if not lazy:
+        spec = np.array(spec)
+    s = {'data': spec, 'time_axis': tmjd[tsel], 'freq_axis': freq[fsel], 'pol': [header['POLARIZA']],
+         'telescope': header.get('TELESCOP', ''), 'observatory': ''}
+    if 'BUNIT' in header:
+        s['spec_unit'] = header['BUNIT']
+    if 'BNAME' in header:
+        s['spec_name'] = header['BNAME']
+    if s['telescope'] == 'LWA':
+        s['observatory'] = 'OVRO'
+        s['spec_unit'] = 'sfu'
+    if 'FREQ_CAL' in hdulist and hdulist['FREQ_CAL'].columns.names:
+        freqcal = hdulist['FREQ_CAL'].data
+        for k in ['calfac_x', 'calfac_y', 'bkg_flux']:
+            if k in freqcal.columns.names:
+                s[k] = np.array(freqcal[k])
+    hdulist.close()
+    return s
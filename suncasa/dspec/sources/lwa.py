@@ -29,9 +29,84 @@ def timestamp_to_mjd(times):
     return ts
 
 
+_ovro = None
+
+
+def ovro_location():
+    '''
+    Location of OVRO, resolved once. Falls back to the coordinates in the astropy site registry if the registry
+    can not be downloaded.
+    '''
+    global _ovro
+    if _ovro is None:
+        try:
+            _ovro = EarthLocation.of_site('ovro')
+        except Exception:
+            _ovro = EarthLocation.from_geodetic(lon=-118.283 * u.deg, lat=37.2339 * u.deg, height=1222. * u.m)
+    return _ovro
+
+
+def pb_factors(times_mjd, obs=None, tstep=5.):
+    '''
+    Analytical primary beam correction factors (sin(alt)**1.6 of the Sun) for the times in times_mjd.
+    The solar altitude is computed in one vectorized call on a grid of tstep minutes over the whole time range,
+    and interpolated to times_mjd. For durations shorter than tstep, the altitude at the middle is used.
+    '''
+    if obs is None:
+        obs = ovro_location()
+    t0 = np.min(times_mjd)
+    t1 = np.max(times_mjd)
+    if t1-t0 > tstep/1440.:
+        nstep = int((t1-t0)/(tstep/1440.)) + 1
+        ts_ref = np.linspace(t0, t1, nstep)
+        print('Duration of the data is {0:.1f} hours, interpolating from {1:d} steps.'.format((t1-t0)*24., nstep))
+    else:
+        print('Duration of the data is {0:.1f} minutes, no interpolation will be done.'.format((t1-t0)*24.*60.))
+        ts_ref = np.array([(t0+t1)/2.])
+    tref = Time(ts_ref, format='mjd')
+    sun_loc = get_body('sun', tref, location=obs)
+    alt = sun_loc.transform_to(AltAz(obstime=tref, location=obs)).alt.radian
+    if np.any(np.degrees(alt) <= 5.):
+        print('Warning! Calculated solar altitude is lower than 5 degrees. Something is wrong with the data (non-solar)?') 
+    pbfacs_ref = np.sin(np.maximum(alt, np.radians(5.)))**1.6
+    if len(ts_ref) == 1:
+        return np.full(len(times_mjd), pbfacs_ref[0])
+    return np.interp(times_mjd, ts_ref, pbfacs_ref)
+
+
+def read_stokes(tuning, stokes, tsl, fsl, calfac_x, calfac_y, bkg_flux, pbfacs=None):
+    '''
+    Reads the hyperslab [tsl, fsl] of the beamforming data in the group tuning and forms the requested stokes.
+    Returns the spectrum in the shape of (nt, nf) or (nt, nf, 2) for 'IV', in Jy.
+    :param pbfacs: primary beam correction factors for the times in tsl (applied to Stokes I only) or None
+    '''
+    calfac_x = calfac_x[None, fsl]
+    calfac_y = calfac_y[None, fsl]
+    calfac_xy = (calfac_x + calfac_y) / 2.
+    if stokes.upper() == 'XX':
+        return tuning['XX'][tsl, fsl] / calfac_x
+    if stokes.upper() == 'YY':
+        return tuning['YY'][tsl, fsl] / calfac_y
+    if stokes.upper() == 'I' or stokes.upper() == 'IV':
+        spec_I = (tuning['XX'][tsl, fsl] / calfac_x + tuning['YY'][tsl, fsl] / calfac_y) / 2. - \
+                 bkg_flux[None, fsl] / calfac_xy
+        if pbfacs is not None:
+            spec_I /= pbfacs[:, None]
+        if stokes.upper() == 'IV':
+            spec_V = tuning['XY_imag'][tsl, fsl] / calfac_xy
+            return np.stack((spec_I, spec_V), axis=2)
+        return spec_I
+    if stokes == 'V':
+        return tuning['XY_imag'][tsl, fsl] / calfac_xy
+    if stokes == 'Q':
+        return (tuning['XX'][tsl, fsl] / calfac_x - tuning['YY'][tsl, fsl] / calfac_y) / 2.
+    if stokes == 'U':
+        return tuning['XY_real'][tsl, fsl] / calfac_xy
+
+
 def read_data(filename, stokes='I', timerange=[], freqrange=[], timebin=1, freqbin=1, verbose=True, 
             flux_factor_file=None, bkg_file=None,  do_pb_correction=False, 
-            flux_factor_calfac_x = None, flux_factor_calfac_y = None, bkg_flux_arr = None):
+            flux_factor_calfac_x = None, flux_factor_calfac_y = None, bkg_flux_arr = None, tchunk=4096):
     '''
     :param filename: name of the OVRO-LWA hdf5 beamforming file; 
               This can be a string (single file) or a list of strings (multiple files)
@@ -49,12 +124,14 @@ def read_data(filename, stokes='I', timerange=[], freqrange=[], timebin=1, freqb
     :param flux_factor_calfac_x: user input correction factor for the X polarization
     :param flux_factor_calfac_y: user input correction factor for the Y polarization
     :param bkg_flux_arr: user input background flux in Jy
+    :param tchunk: number of time samples read from a file at a time (rounded to a multiple of timebin).
+            The files are first scanned for their time and frequency axes, the output is preallocated, and
+            the data are then read chunk by chunk and rebinned on read, so that the raw data are never held in memory.
     '''
     # Check the input filename
     if type(filename) == str:
         filename = [filename]
 
-    obs = EarthLocation.of_site('ovro')
     filelist = []
     for ll in filename:
         if not os.path.exists(ll):
@@ -67,16 +144,29 @@ def read_data(filename, stokes='I', timerange=[], freqrange=[], timebin=1, freqb
         return False
     else:
         filelist.sort()
-    
-    n0 = 0 # this is the index for the first file being read successfully
-    firstset_read = False 
+
+    # select stokes
+    stokes_valid = ['XX', 'YY', 'I', 'Q', 'U', 'V', 'IV']
+    if verbose:
+        print('Reading dynamic spectrum for stokes {0:s}'.format(stokes))
+    if stokes not in stokes_valid:
+        raise Exception("Provided Stokes {0:s} is not in 'XX, YY, RR, LL, I, Q, U, V'".format(stokes))
+    if stokes.upper() == 'IV':
+        stokes_out = ['I', 'V']
+    else:
+        stokes_out = [stokes.upper()]
+    npol = len(stokes_out)
+
+    # first pass: read the time and frequency axes of each file and work out the selection and the output size
+    plans = []
+    nfreq0 = None
     for n, file in enumerate(filelist):
         if verbose:
-            print('Processing {0:d} of {1:d} files'.format(n+1, len(filelist)))
+            print('Scanning {0:d} of {1:d} files'.format(n+1, len(filelist)))
         try:
-            data = h5py.File(file, 'r',swmr=True)
-            freqs = data['Observation1']['Tuning1']['freq'][:]
-            ts = data['Observation1']['time'][:]
+            with h5py.File(file, 'r', swmr=True) as data:
+                freqs = data['Observation1']['Tuning1']['freq'][:]
+                ts = data['Observation1']['time'][:]
             # The following line works the same way as timestamp_to_mjd(), but a bit too slow
             # times_mjd = np.array([(Time(t[0], format='unix') + TimeDelta(t[1], format='sec')).mjd for t in ts])
             times_mjd = timestamp_to_mjd(ts)
@@ -85,7 +175,7 @@ def read_data(filename, stokes='I', timerange=[], freqrange=[], timebin=1, freqb
         except:
             print('Cannot read {0:s}. Skip this file.'.format(file))
             continue
-        
+
         # read the flux factors file if provided
         if not (flux_factor_file is None): 
             try:
@@ -103,10 +193,6 @@ def read_data(filename, stokes='I', timerange=[], freqrange=[], timebin=1, freqb
             # user input correction factor
             calfac_x = calfac_x*flux_factor_calfac_x
             calfac_y = calfac_y*flux_factor_calfac_y
-        
-        if not (bkg_flux_arr is None):
-            # add the user input background flux
-            bkg_flux += bkg_flux_arr
 
         # read background flux file if provided
         if not (bkg_file is None): 
@@ -119,6 +205,11 @@ def read_data(filename, stokes='I', timerange=[], freqrange=[], timebin=1, freqb
         else:
             print('No background csv file provided. Setting background flux to zero.')
             bkg_flux = np.zeros_like(freqs)
+        bkg_flux = np.asarray(bkg_flux, dtype=float)
+
+        if not (bkg_flux_arr is None):
+            # add the user input background flux
+            bkg_flux = bkg_flux + bkg_flux_arr
 
         if verbose:
             print('Data time range is from {0:s} to {1:s}'.format(Time(times_mjd[idx0][0], format='mjd').isot, 
@@ -137,8 +228,6 @@ def read_data(filename, stokes='I', timerange=[], freqrange=[], timebin=1, freqb
                 ti1 = np.argmin(np.abs(times_mjd - t1)) 
                 if ti1 - ti0 < timebin:
                     print('Selected number of time samples {0:d} is less than the timebin {1:d}. Skip this file.'.format(ti1-ti0, timebin))
-                    if not firstset_read:
-                        n0 += 1
                     continue
                 if verbose:
                     print('Selected time range is from {0:s} to {1:s}'.format(Time(times_mjd[ti0], format='mjd').isot, 
@@ -151,12 +240,13 @@ def read_data(filename, stokes='I', timerange=[], freqrange=[], timebin=1, freqb
             ti0=0
             ti1=len(times_mjd)
 
-        firstset_read = True
         times_mjd = times_mjd[ti0:ti1] 
 
         # Select frequency range
+        fi0 = 0
+        fi1 = len(freqs)
         if len(freqrange) > 0:
-            if type(freqrange) == list:
+            if type(freqrange) in [list, tuple]:
                 try:
                     f0 = freqrange[0]
                     f1 = freqrange[1]
@@ -174,124 +264,109 @@ def read_data(filename, stokes='I', timerange=[], freqrange=[], timebin=1, freqb
                     print('freqrange not parsed correctly. Use the full range.')
                     fi0 = 0
                     fi1 = len(freqs) 
-        else:
-            fi0=0
-            fi1=len(freqs)
 
         freqs = freqs[fi0:fi1] 
 
-        # select stokes
-        stokes_valid = ['XX', 'YY', 'I', 'Q', 'U', 'V', 'IV']
-        if verbose:
-            print('Reading dynamic spectrum for stokes {0:s}'.format(stokes))
-
-        if stokes not in stokes_valid:
-            raise Exception("Provided Stokes {0:s} is not in 'XX, YY, RR, LL, I, Q, U, V'".format(stokes))
-        if stokes.upper() == 'XX':
-            spec = data['Observation1']['Tuning1']['XX'][ti0:ti1, fi0:fi1] / calfac_x[None, fi0:fi1]
-            stokes_out = ['XX']
-        if stokes.upper() == 'YY':
-            spec = data['Observation1']['Tuning1']['YY'][ti0:ti1, fi0:fi1] / calfac_y[None, fi0:fi1]
-            stokes_out = ['YY']
-        if stokes.upper() == 'I' or stokes.upper() == 'IV':
-            spec_I = (data['Observation1']['Tuning1']['XX'][ti0:ti1, fi0:fi1] / calfac_x[None, fi0:fi1] + \
-                   data['Observation1']['Tuning1']['YY'][ti0:ti1, fi0:fi1] / calfac_y[None, fi0:fi1]) / 2. - \
-                   bkg_flux[None, fi0:fi1] / ((calfac_x[None, fi0:fi1] + calfac_y[None, fi0:fi1]) / 2.) 
-            if verbose:
-                print('Median of the subtracted background flux (Jy)', np.median(bkg_flux[None, fi0:fi1] / ((calfac_x[None, fi0:fi1] + calfac_y[None, fi0:fi1]) / 2.)))
-                print('RMS of the subtracted background flux (Jy)', np.std(bkg_flux[None, fi0:fi1] / ((calfac_x[None, fi0:fi1] + calfac_y[None, fi0:fi1]) / 2.)))
-            if do_pb_correction:
-                pbfacs = np.ones_like(times_mjd)
-                t0 = times_mjd[0]
-                t1 = times_mjd[-1]
-                if t1-t0 > 5./1440.:
-                    nstep = int((t1-t0)/(5./1440.))
-                    ts_ref = np.linspace(t0, t1, nstep)
-                    pbfacs_ref = np.ones_like(ts_ref) 
-                    print('Duration of the file is {0:.1f} hours, interpolating into {1:d} steps.'.format((t1-t0)*24., nstep))
-                    for i, t_ref in enumerate(ts_ref):
-                        sun_loc = get_body('sun', Time(t_ref, format='mjd'), location=obs)
-                        alt = sun_loc.transform_to(AltAz(obstime=Time(t_ref, format='mjd'), location=obs)).alt.radian
-                        if np.degrees(alt) > 5.:
-                            pbfacs_ref[i]=np.sin(alt)**1.6
-                        else:
-                            print('Warning! Calculated solar altitude is lower than 5 degrees. Something is wrong with the data (non-solar)?') 
-                            pbfacs_ref[i]=np.sin(np.radians(5.))**1.6
-
-                    pbfacs = np.interp(times_mjd, ts_ref, pbfacs_ref)
-                else:
-                    print('Duration of the file is {0:.1f} minutes, no interpolation will be done.'.format((t1-t0)*24.*60.))
-                    t_ref = (t0+t1)/2.
-                    sun_loc = get_body('sun', Time(t_ref, format='mjd'), location=obs)
-                    alt = sun_loc.transform_to(AltAz(obstime=Time(t_ref, format='mjd'), location=obs)).alt.radian
-                    if np.degrees(alt) > 5.:
-                        pbfacs *= np.sin(alt)**1.6
-                    else:
-                        print('Warning! Calculated solar altitude is lower than 5 degrees. Something is wrong with the data (non-solar)?') 
-                        pbfacs *= np.sin(np.radians(5.))**1.6
-                spec_I /= pbfacs[:, None]
-
-            if stokes.upper() == 'IV':
-                spec_V = data['Observation1']['Tuning1']['XY_imag'][ti0:ti1, fi0:fi1] / ((calfac_x[None, fi0:fi1] + calfac_y[None, fi0:fi1]) / 2.)
-                spec = np.stack((spec_I, spec_V), axis=2)
-                stokes_out = ['I', 'V']
-            else:
-                spec = spec_I
-                stokes_out = ['I'] 
-        if stokes == 'V':
-            spec = data['Observation1']['Tuning1']['XY_imag'][ti0:ti1, fi0:fi1] / ((calfac_x[None, fi0:fi1] + calfac_y[None, fi0:fi1]) / 2.)
-            stokes_out = ['V'] 
-        if stokes == 'Q':
-            spec = (data['Observation1']['Tuning1']['XX'][ti0:ti1, fi0:fi1] / calfac_x[None, fi0:fi1] - \
-                    data['Observation1']['Tuning1']['YY'][ti0:ti1, fi0:fi1] / calfac_y[None, fi0:fi1]) / 2. 
-            stokes_out = ['Q'] 
-        if stokes == 'U':
-            spec = data['Observation1']['Tuning1']['XY_real'][ti0:ti1, fi0:fi1] / ((calfac_x[None, fi0:fi1] + calfac_y[None, fi0:fi1]) / 2.)
-            stokes_out = ['U'] 
-
-        idx, = np.where(times_mjd > 50000.) # filter out those prior to 1995 (obviously wrong for OVRO-LWA)
-        times_mjd = times_mjd[idx]
-        spec = spec[idx]
-
-        if spec.ndim == 2:
-            # TODO: for now I have just ignored the rest of the data that falls outside of the whole factor of timebin * nt_new or freqbin * nf_new 
-            nt, nf = spec.shape
-            npol = 1
-            nt_new, nf_new = (nt // timebin, nf // freqbin)
-            spec_new = rebin2d(spec[:nt_new*timebin, :nf_new*freqbin], (nt_new, nf_new))
-        if spec.ndim == 3:
-            nt, nf, npol = spec.shape
-            spec_new_ = [] 
-            for i in range(npol):
-                nt_new, nf_new = (nt // timebin, nf // freqbin)
-                spec_ = spec[:, :, i]
-                spec_new_.append(rebin2d(spec_[:nt_new*timebin, :nf_new*freqbin], (nt_new, nf_new)))
-            spec_new = np.stack(spec_new_, axis=2)
-            
-        spec_new = np.transpose(spec_new).reshape((npol, 1, nf_new, nt_new)) / 1e4
-        times_mjd_new = rebin1d(times_mjd[:nt_new * timebin], nt_new)
-        freqs_new = rebin1d(freqs[:nf_new * freqbin], nf_new)
-        if firstset_read:
-            if n == n0:
-                nfreq0 = len(freqs_new)
-                freqs_out = freqs_new
-                spec_out = spec_new
-                times_mjd_out = times_mjd_new
-            elif n > n0:
-                if len(freqs_new) != nfreq0:
-                    print('Something is wrong in concatenating {}'.format(file)) 
-                    print('Dimension of the output frequency {0:d} does not match that of the first file {1:d)'.format(len(freqs_new), nfreq0)) 
-                    continue
-                else:
-                    spec_out = np.concatenate((spec_out, spec_new), axis=3)
-                    times_mjd_out = np.concatenate((times_mjd_out, times_mjd_new))
-        else:
+        if stokes.upper() in ['I', 'IV'] and verbose:
+            bkg_sub = bkg_flux[None, fi0:fi1] / ((calfac_x[None, fi0:fi1] + calfac_y[None, fi0:fi1]) / 2.)
+            print('Median of the subtracted background flux (Jy)', np.median(bkg_sub))
+            print('RMS of the subtracted background flux (Jy)', np.std(bkg_sub))
+
+        # rows within the selection that are kept (filter out those prior to 1995)
+        idx, = np.where(times_mjd > 50000.)
+        # TODO: for now I have just ignored the rest of the data that falls outside of the whole factor of timebin * nt_new or freqbin * nf_new 
+        nt_new, nf_new = (len(idx) // timebin, len(freqs) // freqbin)
+        if nt_new == 0:
+            continue
+        if nfreq0 is None:
+            nfreq0 = nf_new
+            freqs_out = rebin1d(freqs[:nf_new * freqbin], nf_new)
+        elif nf_new != nfreq0:
+            print('Something is wrong in concatenating {}'.format(file)) 
+            print('Dimension of the output frequency {0:d} does not match that of the first file {1:d}'.format(nf_new, nfreq0)) 
             continue
+        plans.append({'file': file, 'ti0': ti0, 'fi0': fi0, 'fi1': fi1, 'rows': idx[:nt_new * timebin], 
+                      'times_mjd': times_mjd, 
+                      'nt_new': nt_new, 'nf_new': nf_new,
+                      'times_mjd_new': rebin1d(times_mjd[idx[:nt_new * timebin]], nt_new), 
+                      'calfac_x': calfac_x, 'calfac_y': calfac_y, 'bkg_flux': bkg_flux, 'pbfacs': None})
+
+    if not plans:
+        return False
 
-    if firstset_read:
+    if do_pb_correction and stokes.upper() in ['I', 'IV']:
+        # primary beam factors for all the selected times of all the files at once
+        ntims = [len(p['rows']) for p in plans]
+        pbfacs = pb_factors(np.hstack([p['times_mjd'][p['rows']] for p in plans]))
+        for p, pb in zip(plans, np.split(pbfacs, np.cumsum(ntims)[:-1])):
+            p['pbfacs'] = pb
+
+    # second pass: read each file in chunks of time, rebin, and fill up the preallocated output
+    ntot = np.sum([p['nt_new'] for p in plans])
+    spec_out = np.zeros((npol, 1, nfreq0, ntot))
+    times_mjd_out = np.hstack([p['times_mjd_new'] for p in plans])
+    nbin_chunk = max(1, tchunk // timebin)
+    tptr = 0
+    for n, p in enumerate(plans):
         if verbose:
-            print('Output time range is from {0:s} to {1:s}'.format(Time(times_mjd_out[0], format='mjd').isot, Time(times_mjd_out[-1], format='mjd').isot))
-            print('Output data has {0:d} time stamps and {1:d} frequency channels'.format(len(times_mjd_out), len(freqs_out)))
-        return spec_out, times_mjd_out, freqs_out, stokes_out, calfac_x, calfac_y, bkg_flux
-    else:
+            print('Processing {0:d} of {1:d} files'.format(n+1, len(plans)))
+        calfac_x, calfac_y, bkg_flux = p['calfac_x'], p['calfac_y'], p['bkg_flux']
+        fsl = slice(p['fi0'], p['fi1'])
+        nf_new = p['nf_new']
+        with h5py.File(p['file'], 'r', swmr=True) as data:
+            tuning = data['Observation1']['Tuning1']
+            for b0 in range(0, p['nt_new'], nbin_chunk):
+                b1 = min(b0 + nbin_chunk, p['nt_new'])
+                rows = p['rows'][b0 * timebin:b1 * timebin]
+                r0, r1 = rows[0], rows[-1] + 1
+                pbfacs = None
+                if p['pbfacs'] is not None:
+                    pbfacs = np.ones(r1 - r0)
+                    pbfacs[rows - r0] = p['pbfacs'][b0 * timebin:b1 * timebin]
+                spec = read_stokes(tuning, stokes, slice(p['ti0'] + r0, p['ti0'] + r1), fsl, calfac_x, calfac_y, 
+                                   bkg_flux, pbfacs)
+                spec = spec[rows - r0, :nf_new * freqbin]
+                if spec.ndim == 2:
+                    spec = spec[:, :, None]
+                for i in range(npol):
+                    spec_out[i, 0, :, tptr + b0:tptr + b1] = rebin2d(spec[:, :, i], (b1 - b0, nf_new)).T / 1e4
+        tptr += p['nt_new']
+
+    if verbose:
+        print('Output time range is from {0:s} to {1:s}'.format(Time(times_mjd_out[0], format='mjd').isot, Time(times_mjd_out[-1], format='mjd').isot))
+        print('Output data has {0:d} time stamps and {1:d} frequency channels'.format(len(times_mjd_out), len(freqs_out)))
+    return spec_out, times_mjd_out, freqs_out, stokes_out, calfac_x, calfac_y, bkg_flux
+
+
+def sniff(filename):
+    '''
+    Returns True if filename (or the first of a list of files) is an OVRO-LWA hdf5 beamforming file
+    '''
+    if isinstance(filename, (list, tuple)):
+        filename = filename[0]
+    try:
+        if not h5py.is_hdf5(filename):
+            return False
+        with h5py.File(filename, 'r') as f:
+            return 'Observation1' in f and 'Tuning1' in f['Observation1']
+    except (IOError, OSError):
         return False
+
+
+def read_dspec(filename, timerange=None, freqrange=None, lazy=False, **kwargs):
+    '''
+    Wrapper of read_data in the format used by suncasa.dspec.Dspec.read.
+    Only the samples within timerange (astropy.time.Time of two elements) and freqrange (list of two frequencies in Hz)
+    are read from the file. All the other keywords are passed to read_data.
+    '''
+    if timerange is not None:
+        kwargs['timerange'] = list(timerange.isot)
+    if freqrange is not None:
+        kwargs['freqrange'] = [float(freqrange[0]), float(freqrange[1])]
+    out = read_data(filename, **kwargs)
+    if out is False:
+        raise IOError('Cannot read any data from {}'.format(filename))
+    spec, tim, freq, pol, calfac_x, calfac_y, bkg_flux = out
+    return {'data': spec, 'time_axis': tim, 'freq_axis': freq, 'pol': pol, 'calfac_x': calfac_x,
+            'calfac_y': calfac_y, 'bkg_flux': bkg_flux, 'spec_unit': 'sfu', 'telescope': 'LWA',
+            'observatory': 'OVRO'}
@@ -0,0 +1,51 @@
+"""
+Reader for the dynamic spectra saved by `suncasa.dspec.Dspec.get_dspec`: ``.npz`` files and the chunked HDF5
+dynamic spectrum stores (see `suncasa.dspec.h5store`).
+"""
+import zipfile
+
+import h5py
+
+from .. import h5store
+from . import time_freq_slices
+
+
+def sniff(filename):
+    """
+    Returns True if filename is a ``.npz`` file or a dynamic spectrum store written by suncasa.
+    """
+    if isinstance(filename, (list, tuple)):
+        return False
+    try:
+        if h5py.is_hdf5(filename):
+            with h5py.File(filename, 'r') as f:
+                return 'spec' in f and 'tim' in f and 'freq' in f
+        if zipfile.is_zipfile(filename):
+            with zipfile.ZipFile(filename) as f:
+                names = f.namelist()
+            return 'spec.npy' in names and 'tim.npy' in names
+    except (IOError, OSError):
+        pass
+    return False
+
+
+def read_dspec(filename, timerange=None, freqrange=None, lazy=False, spectype='amp', spec_unit='jy'):
+    """
+    Reads a suncasa dynamic spectrum file. If filename is a dynamic spectrum store, only the chunks within
+    timerange and freqrange are read, and with lazy=True the data are returned as a
+    `suncasa.dspec.h5store.DspecH5Array` without reading any data.
+    """
+    if h5store.is_h5(filename):
+        spec, tim, freq, bl, pol, spec_unit = h5store.read_h5(filename, spectype=spectype, spec_unit=spec_unit)
+    else:
+        from ..dspec import Dspec
+        spec, tim, freq, bl, pol, spec_unit = Dspec().rd_dspec(filename, spectype=spectype, spec_unit=spec_unit)
+    tmjd = tim / 24. / 3600.
+    tsel, fsel = time_freq_slices(tmjd, freq, timerange, freqrange)
+    if isinstance(spec, h5store.DspecH5Array):
+        if (timerange is not None or freqrange is not None) or not lazy:
+            spec = spec[..., fsel, tsel]
+    else:
+        spec = spec[..., fsel, tsel]
+    return {'data': spec, 'time_axis': tmjd[tsel], 'freq_axis': freq[fsel], 'bl': bl, 'pol': pol,
+            'spec_unit': spec_unit, 'telescope': '', 'observatory': ''}
@@ -46,6 +46,138 @@ def bl_list2(nant=16):
     return bl2ord
 
 
+def bl_scaling_index(antlist, bl2ord):
+    ''' Returns the baseline index used to normalize the cross-correlations by the auto-correlations.
+        antlist is the list of antenna numbers (starting from 1) and bl2ord is returned by bl_list2.
+        Returns a tuple (blidx, ant1, ant2), where blidx are the ordinal numbers of the cross-correlation
+        baselines between all pairs of antennas in antlist, and ant1, ant2 are the antenna indexes
+        (antenna number - 1) of the two antennas of each baseline.
+    '''
+    ants = np.unique(antlist) - 1
+    i, j = np.triu_indices(len(ants), k=1)
+    ant1, ant2 = ants[i], ants[j]
+    return bl2ord[ant1, ant2], ant1, ant2
+
+
+def read_idb(filename, nrecchunk=8192):
+    ''' Read an IDB/UDB Miriad file in a single pass and return an in-memory IDB structure.
+        Records are streamed once into preallocated record buffers (starting with nrecchunk records and doubled
+        when full),
+        and the time slot of every record is found with a sorted lookup on the evenly-spaced time grid.
+        The returned dictionary can be passed to the MS writer (importeovsa_iter, creatms) in place of
+        the file name, so the file does not have to be read again.
+        Keys of the returned dictionary:
+        filename : name of the IDB file
+        times : evenly-spaced time grid in MJD seconds
+        timesjd : unique timestamps of the records in JD
+        inttime : integration time in minutes
+        antlist, nants, npol, npairs, bl2ord : antenna and baseline information
+        sfreq, sdf, chan_band : frequency and band information
+        ra, dec, source_id, reftime : source information and the reference time (JD) of the file
+        data : complex visibilities in the shape of (npol, nf, ntime, npairs)
+        flag : flags in the shape of (npol, nf, ntime, npairs)
+        uvw : uvw coordinates in meters in the shape of (3, ntime, npairs)
+    '''
+    uv = aipy.miriad.UV(filename)
+
+    if 'antlist' in uv.vartable:
+        ants = uv['antlist'].replace('\x00', '')
+        antlist = list(map(int, ants.split()))
+    else:
+        antlist = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16]
+
+    good_idx = np.where(uv['sfreq'] > 0)[0]
+
+    nf = len(good_idx)
+    npol = uv['npol']
+    nants = uv['nants']
+    source_id = uv['source'].replace('\x00', '')
+    sfreq = uv['sfreq'][good_idx]
+    sdf = uv['sdf'][good_idx]
+    ra, dec = uv['ra'], uv['dec']
+    reftime = uv['time']
+    nbl = int(nants * (nants - 1) / 2)
+    bl2ord = bl_list2(nants)
+    npairs = int(nbl + nants)
+
+    nalloc = nrecchunk
+    rec_t = np.zeros(nalloc, dtype=float)
+    rec_pol = np.zeros(nalloc, dtype=int)
+    rec_bl = np.zeros(nalloc, dtype=int)
+    rec_uvw = np.zeros((nalloc, 3), dtype=float)
+    rec_data = np.zeros((nalloc, nf), dtype=np.complex64)
+    rec_flag = np.ones((nalloc, nf), dtype=bool)
+
+    uv.rewind()
+    nrec = 0
+    for preamble, data in uv.all():
+        uvw, t, (i0, j0) = preamble
+        if nrec == nalloc:
+            nalloc *= 2
+            rec_t = np.resize(rec_t, nalloc)
+            rec_pol = np.resize(rec_pol, nalloc)
+            rec_bl = np.resize(rec_bl, nalloc)
+            rec_uvw = np.resize(rec_uvw, (nalloc, 3))
+            rec_data = np.resize(rec_data, (nalloc, nf))
+            rec_flag = np.resize(rec_flag, (nalloc, nf))
+        rec_t[nrec] = t
+        # Assumes uv['pol'] is one of -5, -6, -7, -8
+        rec_pol[nrec] = -5 - uv['pol']
+        rec_bl[nrec] = bl2ord[i0, j0]
+        rec_uvw[nrec] = uvw
+        rec_data[nrec] = np.ma.getdata(data)
+        rec_flag[nrec] = np.ma.getmaskarray(data)
+        nrec += 1
+    uv.select('clear', -1, -1, include=True)
+    del uv
+
+    rec_t = rec_t[:nrec]
+    rec_data = rec_data[:nrec]
+    rec_flag = rec_flag[:nrec]
+    rec_flag |= ~np.isfinite(rec_data)
+
+    timesjd = np.unique(rec_t)
+    times = jd2mjds(timesjd)
+    inttime = np.median((times - np.roll(times, 1))[1:]) / 60  ## time in minutes
+
+    time_steps = np.round((times[-1] - times[0]) / inttime / 60).astype(int) + 1
+    if len(times) != time_steps:
+        ### This is to solve the timestamp glitch in idb files.
+        ### The timestamps are supposed to be evenly spaced
+        ### However, some idb files may miss a few timestamps in the evenly-spaced time grid.
+        ### The step will map the the data to the evenly-spaced time grid.
+        timesnew = np.linspace(times[0], times[-1], time_steps)
+        timesnew[np.hstack([[0], np.cumsum(np.round(np.diff(times) / 60 / inttime))]).astype(int)] = times
+        times = timesnew
+
+    ## map the timestamp of every record to the nearest slot of the time grid
+    rec_times = jd2mjds(rec_t)
+    if time_steps > 1:
+        tidx = np.clip(np.searchsorted(times, rec_times), 1, time_steps - 1)
+        tidx -= (rec_times - times[tidx - 1]) < (times[tidx] - rec_times)
+    else:
+        tidx = np.zeros(nrec, dtype=int)
+
+    pidx = rec_pol[:nrec]
+    bidx = rec_bl[:nrec]
+    out = np.zeros((npol, nf, time_steps, npairs), dtype=np.complex64)
+    flag = np.ones((npol, nf, time_steps, npairs), dtype=bool)
+    out[pidx, :, tidx, bidx] = rec_data
+    flag[pidx, :, tidx, bidx] = rec_flag
+    del rec_data, rec_flag
+
+    uvwarray = np.zeros((3, time_steps, npairs), dtype=float)
+    sel = pidx == 3
+    uvwarray[:, tidx[sel], bidx[sel]] = -rec_uvw[:nrec][sel].T * constants.speed_of_light / 1e9
+
+    chan_band = get_band(sfreq=sfreq, sdf=sdf, date=Time(reftime, format='jd'))
+
+    return {'filename': filename, 'times': times, 'timesjd': timesjd, 'inttime': inttime, 'antlist': antlist,
+            'nants': nants, 'npol': npol, 'npairs': npairs, 'bl2ord': bl2ord, 'sfreq': sfreq, 'sdf': sdf,
+            'chan_band': chan_band, 'ra': ra, 'dec': dec, 'source_id': source_id, 'reftime': reftime,
+            'data': out, 'flag': flag, 'uvw': uvwarray}
+
+
 # def get_band_edge(nband=34):
 #     # Input the frequencies from UV, returen the indices frequency edges of all bands
 #     idx_start_freq = [0]
@@ -97,7 +229,10 @@ def get_band(sfreq=None, sdf=None, date=None):
 #     return uvs
 
 
-def creatms(idbfile, outpath, timebin=None, width=None):
+def creatms(idbfile, outpath, timebin=None, width=None, idb=None):
+    ''' Creates an empty measurement set for idbfile. If idb, the in-memory IDB structure returned by
+        read_idb, is provided, the timestamps are taken from it instead of reading through the records again.
+    '''
     uv = aipy.miriad.UV(idbfile)
     uv.rewind()
     # if idbfile.split('/')[-1][0:3] == 'UDB':
@@ -107,14 +242,17 @@ def creatms(idbfile, outpath, timebin=None, width=None):
 
     # uv.select('antennae', 0, 1, include=True)
     # uv.select('polarization', -5, -5, include=True)
-    times = []
-    uv.rewind()
-    for preamble, data in uv.all():
-        uvw, t, (i, j) = preamble
-        times.append(t)
-    times = np.unique(times)
-
-    uv.select('clear', -1, -1, include=True)
+    if idb is not None:
+        times = idb['timesjd']
+    else:
+        times = []
+        uv.rewind()
+        for preamble, data in uv.all():
+            uvw, t, (i, j) = preamble
+            times.append(t)
+        times = np.unique(times)
+
+        uv.select('clear', -1, -1, include=True)
     times = jd2mjds(np.asarray(times))
     inttime = np.median((times - np.roll(times, 1))[1:])
 
@@ -0,0 +1,196 @@
+"""
+Columnar table of the fit results of the pimfit and pmaxfit tasks.
+
+Each fitted component (one per image, channel, and polarization) is a row with the fixed set of columns in
+`columns`. The rows are appended to an HDF5 file as the fits finish, one resizable dataset per column, so that a
+long time series of fits is written with bounded memory and is read back directly into a `pandas.DataFrame`
+without converting the nested result dictionaries (cf. `suncasa.utils.DButil.transfitdict2DF`).
+"""
+
+import os
+
+import h5py
+import numpy as np
+
+__all__ = ['columns', 'fit_rows', 'FitTableWriter', 'read_fittable']
+
+ra2arcsec = 180. * 3600. / np.pi
+
+## name and type of the columns. Positions are in arcsec, frequencies in GHz, and sizes in the units of imfit
+columns = {
+    'timestamp': str,
+    'fits_local': str,
+    'pol': str,
+    'freq': float,
+    'converged': bool,
+    'peak': float,
+    'longitude': float,
+    'latitude': float,
+    'longitude_err': float,
+    'latitude_err': float,
+    'centroid_longitude': float,
+    'centroid_latitude': float,
+    'majoraxis': float,
+    'minoraxis': float,
+    'positionangle': float,
+    'beam_major': float,
+    'beam_minor': float,
+    'beam_positionangle': float,
+}
+
+_freq_to_ghz = {'hz': 1e-9, 'khz': 1e-6, 'mhz': 1e-3, 'ghz': 1.0}
+
+
+def _value(comp, *keys):
+    try:
+        for k in keys:
+            comp = comp[k]
+        return float(np.ravel(comp)[0])
+    except (KeyError, IndexError, TypeError, ValueError):
+        return np.nan
+
+
+def fit_rows(timstr, img, results, gaussfit=True):
+    """
+    Flattens the fit results of one image into rows of the table.
+
+    Parameters
+    ----------
+    timstr : str
+        Timestamp of the image (DATE-OBS).
+    img : str
+        Name of the image.
+    results : dict
+        Fit results of the image keyed by polarization, as returned by the workers of pimfit or pmaxfit.
+    gaussfit : bool, optional
+        True if the results are Gaussian fits from pimfit, False if they are from pmaxfit.
+
+    Returns
+    -------
+    rows : dict
+        Column arrays of the rows, keyed by the names in `columns`.
+    """
+    rows = {k: [] for k in columns}
+    fits_local = os.path.basename(img.rstrip('/'))
+    for pol, res in results.items():
+        if not res or 'results' not in res:
+            continue
+        comps = sorted([k for k in res['results'].keys() if k.startswith('component')], key=lambda k: int(k[9:]))
+        converged = np.ravel(res.get('converged', []))
+        for n, k in enumerate(comps):
+            comp = res['results'][k]
+            freq = comp.get('spectrum', {}).get('frequency', {}).get('m0', {})
+            rows['timestamp'].append(timstr)
+            rows['fits_local'].append(fits_local)
+            rows['pol'].append(pol)
+            rows['freq'].append(_value(freq, 'value') * _freq_to_ghz.get(str(freq.get('unit', 'GHz')).lower(), 1.0))
+            rows['converged'].append(bool(converged[n]) if n < len(converged) else bool(comp.get('converged', True)))
+            if gaussfit:
+                rows['peak'].append(_value(comp, 'peak', 'value'))
+            else:
+                rows['peak'].append(_value(comp, 'flux', 'value'))
+            rows['longitude'].append(_value(comp, 'shape', 'direction', 'm0', 'value') * ra2arcsec)
+            rows['latitude'].append(_value(comp, 'shape', 'direction', 'm1', 'value') * ra2arcsec)
+            rows['longitude_err'].append(_value(comp, 'shape', 'direction', 'error', 'longitude', 'value'))
+            rows['latitude_err'].append(_value(comp, 'shape', 'direction', 'error', 'latitude', 'value'))
+            rows['centroid_longitude'].append(_value(comp, 'centroid', 'direction', 'm0', 'value') * ra2arcsec)
+            rows['centroid_latitude'].append(_value(comp, 'centroid', 'direction', 'm1', 'value') * ra2arcsec)
+            for key in ['majoraxis', 'minoraxis', 'positionangle']:
+                rows[key].append(_value(comp, 'shape', key, 'value'))
+            rows['beam_major'].append(_value(comp, 'beam', 'beamarcsec', 'major', 'value'))
+            rows['beam_minor'].append(_value(comp, 'beam', 'beamarcsec', 'minor', 'value'))
+            rows['beam_positionangle'].append(_value(comp, 'beam', 'beamarcsec', 'positionangle', 'value'))
+    return {k: np.array(v, dtype=object if columns[k] is str else columns[k]) for k, v in rows.items()}
+
+
+class FitTableWriter:
+    """
+    Appends rows to a fit table. Rows are buffered in memory and written in blocks of at least bufsize rows.
+
+    Use as a context manager, or call `close` to write the remaining rows::
+
+        with FitTableWriter('fits.h5') as writer:
+            for timstr, img, results in ...:
+                writer.append(fit_rows(timstr, img, results))
+    """
+
+    def __init__(self, outfile, overwrite=True, bufsize=4096):
+        self.outfile = outfile
+        self.bufsize = bufsize
+        self._buffer = []
+        self._nbuf = 0
+        self._f = h5py.File(outfile, 'w' if overwrite else 'a')
+        for k, t in columns.items():
+            if k in self._f:
+                continue
+            if t is str:
+                dtype = h5py.string_dtype()
+            else:
+                dtype = np.dtype(t)
+            self._f.create_dataset(k, shape=(0,), maxshape=(None,), dtype=dtype, chunks=(bufsize,))
+
+    @property
+    def nrows(self):
+        return self._f['timestamp'].shape[0] + self._nbuf
+
+    def append(self, rows):
+        nrow = len(rows['timestamp'])
+        if nrow == 0:
+            return
+        self._buffer.append(rows)
+        self._nbuf += nrow
+        if self._nbuf >= self.bufsize:
+            self.flush()
+
+    def flush(self):
+        if self._nbuf == 0:
+            return
+        n0 = self._f['timestamp'].shape[0]
+        n1 = n0 + self._nbuf
+        for k in columns:
+            dset = self._f[k]
+            dset.resize((n1,))
+            dset[n0:n1] = np.concatenate([rows[k] for rows in self._buffer])
+        self._f.flush()
+        self._buffer = []
+        self._nbuf = 0
+
+    def close(self):
+        if self._f:
+            self.flush()
+            self._f.close()
+            self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_fittable(outfile, usecols=None, as_dataframe=True):
+    """
+    Reads a fit table.
+
+    Parameters
+    ----------
+    outfile : str
+        Name of the HDF5 file written by `FitTableWriter`.
+    usecols : list of str, optional
+        Columns to read. Default is all.
+    as_dataframe : bool, optional
+        If True (default), returns a `pandas.DataFrame`, otherwise a dictionary of column arrays.
+    """
+    with h5py.File(outfile, 'r') as f:
+        if usecols is None:
+            usecols = [k for k in columns if k in f]
+        table = {}
+        for k in usecols:
+            if h5py.check_string_dtype(f[k].dtype) is not None:
+                table[k] = f[k].asstr()[:].astype(str)
+            else:
+                table[k] = f[k][:]
+    if as_dataframe:
+        import pandas as pd
+        return pd.DataFrame(table)
+    return table
@@ -169,6 +169,75 @@ def get_bdinfo(freq, bw):
     return fbounds
 
 
+_tbfac_cache = {}
+_beamunit_scale = {'arcsec': np.radians(1. / 3600.), 'arcmin': np.radians(1. / 60.), 'deg': np.radians(1.), 'rad': 1.}
+
+
+def jy2tb_factors(freq, bmaj, bmin, beamunit='rad'):
+    """
+    Get the factors to convert intensity in Jy/beam to brightness temperature in K (Rayleigh-Jeans, with 2*k_b
+    for all polarizations). The factors are cached by (frequency, beam), so that they are only computed once
+    for images that share the same frequencies and beams.
+
+    Parameters
+    ----------
+    freq : array_like
+        Frequencies in Hz.
+    bmaj, bmin : float or array_like
+        Major and minor axes (FWHM) of the restoring beam, either one beam or one per frequency (extra beams
+        are ignored).
+    beamunit : str, optional
+        Unit of bmaj and bmin: 'arcsec', 'arcmin', 'deg', or 'rad' (default).
+
+    Returns
+    -------
+    factors : `numpy.ndarray`
+        An array of the conversion factors, one per frequency.
+    """
+    freq = np.atleast_1d(np.asarray(freq, dtype=float))
+    bmaj = np.broadcast_to(np.ravel(bmaj).astype(float)[:freq.size] * _beamunit_scale[beamunit], freq.shape)
+    bmin = np.broadcast_to(np.ravel(bmin).astype(float)[:freq.size] * _beamunit_scale[beamunit], freq.shape)
+    key = (freq.tobytes(), bmaj.tobytes(), bmin.tobytes())
+    if key not in _tbfac_cache:
+        k_b = 1.380649e-23  # Boltzmann constant in J/K
+        c_l = 299792458.0  # speed of light in m/s
+        beam_area = bmaj * bmin * np.pi / (4. * np.log(2.))
+        jy_to_si = 1e-26
+        _tbfac_cache[key] = jy_to_si / beam_area / (2. * k_b * freq ** 2 / c_l ** 2)
+    return _tbfac_cache[key]
+
+
+def jy2tb(data, freq, bmaj, bmin, beamunit='rad', faxis=-3, sclfactor=1.0):
+    """
+    Convert an image cube from Jy/beam to brightness temperature in K, in place, with one broadcast multiply.
+
+    Parameters
+    ----------
+    data : `numpy.ndarray`
+        Image data, e.g., in the shape of (npol, nfreq, ny, nx). It is modified in place.
+    freq : array_like
+        Frequencies of the planes along faxis in Hz.
+    bmaj, bmin : float or array_like
+        Major and minor axes (FWHM) of the restoring beam, either one beam or one per frequency.
+    beamunit : str, optional
+        Unit of bmaj and bmin: 'arcsec', 'arcmin', 'deg', or 'rad' (default).
+    faxis : int, optional
+        Index of the frequency axis of data. Default is -3, i.e., (..., nfreq, ny, nx).
+    sclfactor : float, optional
+        An additional scale factor applied in the same pass.
+
+    Returns
+    -------
+    data : `numpy.ndarray`
+        The converted data (the same array as the input).
+    """
+    factors = jy2tb_factors(freq, bmaj, bmin, beamunit=beamunit) * sclfactor
+    fshape = [1] * data.ndim
+    fshape[faxis] = data.shape[faxis]
+    data *= factors.reshape(fshape).astype(data.dtype, copy=False)
+    return data
+
+
 def read(filepath, hdus=None, verbose=False, **kwargs):
     """
     Read a fits file.
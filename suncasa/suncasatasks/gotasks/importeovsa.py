@@ -1,5 +1,5 @@
 ##################### generated by xml-casa (v2) from importeovsa.xml ###############
-##################### c9df476ec6913d95cc0ec94dbdf76dda ##############################
+##################### 31092f8c8f490654abf4a5d0be2b38b3 ##############################
 from __future__ import absolute_import
 from casashell.private.stack_manip import find_local as __sf__
 from casashell.private.stack_manip import find_frame as _find_frame
@@ -44,6 +44,8 @@ class _importeovsa:
     doscaling         If creating a new MS file with the amplitude of visibility data rescaled.
     keep_nsclms       Keep the no scaling measurement sets
     use_exist_udbcorr If use the existed udb_corr results.
+    nqueue            Maximum number of files in flight between the udb_corr and the import stages. 0 for 2 * ncpu
+    maxchunkmb        Upper limit (in MB) of the data block written to the MS with each column-level put
 
     --------- examples -----------------------------------------------------------
 
@@ -101,6 +103,17 @@ class _importeovsa:
     default: '0s'
     
     
+    --- Parallel import parameters ---
+    
+    nqueue -- Maximum number of files in flight between the udb_corr and the
+    import stages when ncpu > 1.
+    default: 0 => 2 * ncpu
+    
+    maxchunkmb -- Upper limit (in MB) of the data block written to the MS with
+    each column-level put.
+    default: 256
+    
+    
     
     
     
@@ -116,7 +129,7 @@ class _importeovsa:
     _info_group_ = """Import/export"""
     _info_desc_ = """Parallelized import EOVSA idb file(s) to a measurement set or multiple measurement set."""
 
-    __schema = {'idbfiles': {'anyof': [{'type': 'cStr', 'coerce': _coerce.to_str}, {'type': 'cStrVec', 'coerce': [_coerce.to_list,_coerce.to_strvec]}]}, 'ncpu': {'type': 'cInt'}, 'timebin': {'type': 'cStr', 'coerce': _coerce.to_str}, 'width': {'anyof': [{'type': 'cStr', 'coerce': _coerce.to_str}, {'type': 'cStrVec', 'coerce': [_coerce.to_list,_coerce.to_strvec]}, {'type': 'cInt'}, {'type': 'cIntVec', 'coerce': [_coerce.to_list,_coerce.to_intvec]}]}, 'visprefix': {'type': 'cStr', 'coerce': _coerce.to_str}, 'udb_corr': {'type': 'cBool'}, 'nocreatms': {'type': 'cBool'}, 'doconcat': {'type': 'cBool'}, 'modelms': {'type': 'cStr', 'coerce': _coerce.to_str}, 'doscaling': {'type': 'cBool'}, 'keep_nsclms': {'type': 'cBool'}, 'use_exist_udbcorr': {'type': 'cBool'}}
+    __schema = {'idbfiles': {'anyof': [{'type': 'cStr', 'coerce': _coerce.to_str}, {'type': 'cStrVec', 'coerce': [_coerce.to_list,_coerce.to_strvec]}]}, 'ncpu': {'type': 'cInt'}, 'timebin': {'type': 'cStr', 'coerce': _coerce.to_str}, 'width': {'anyof': [{'type': 'cStr', 'coerce': _coerce.to_str}, {'type': 'cStrVec', 'coerce': [_coerce.to_list,_coerce.to_strvec]}, {'type': 'cInt'}, {'type': 'cIntVec', 'coerce': [_coerce.to_list,_coerce.to_intvec]}]}, 'visprefix': {'type': 'cStr', 'coerce': _coerce.to_str}, 'udb_corr': {'type': 'cBool'}, 'nocreatms': {'type': 'cBool'}, 'doconcat': {'type': 'cBool'}, 'modelms': {'type': 'cStr', 'coerce': _coerce.to_str}, 'doscaling': {'type': 'cBool'}, 'keep_nsclms': {'type': 'cBool'}, 'use_exist_udbcorr': {'type': 'cBool'}, 'nqueue': {'type': 'cInt'}, 'maxchunkmb': {'type': 'cInt'}}
 
     def __init__(self):
         self.__stdout = None
@@ -248,6 +261,20 @@ class _importeovsa:
         if 'doconcat' in glb: return glb['doconcat']
         return False
 
+    def __nqueue_dflt( self, glb ):
+        return int(0)
+
+    def __nqueue( self, glb ):
+        if 'nqueue' in glb: return glb['nqueue']
+        return int(0)
+
+    def __maxchunkmb_dflt( self, glb ):
+        return int(256)
+
+    def __maxchunkmb( self, glb ):
+        if 'maxchunkmb' in glb: return glb['maxchunkmb']
+        return int(256)
+
     #--------- return non subparam/when values ---------------------------------------------
     def __use_exist_udbcorr( self, glb ):
         if 'use_exist_udbcorr' in glb: return glb['use_exist_udbcorr']
@@ -390,6 +417,26 @@ class _importeovsa:
         value = self.__use_exist_udbcorr( self.__globals_( ) )
         (pre,post) = (('','') if value == xml_default( ) else ('\x1B[34m','\x1B[0m')) if self.__validate_({'use_exist_udbcorr': value},{'use_exist_udbcorr': self.__schema['use_exist_udbcorr']}) else ('\x1B[91m','\x1B[0m')
         self.__do_inp_output('%-14.14s = %s%-23s%s' % ('use_exist_udbcorr',pre,self.__to_string_(value),post),description,0+len(pre)+len(post))
+    def __nqueue_inp(self):
+        def xml_default( ):
+            ## play the crazy subparameter shell game
+            dflt = self.__nqueue_dflt( self.__globals_( ) )
+            if dflt is not None: return dflt
+            return int(0)
+        description = ''
+        value = self.__nqueue( self.__globals_( ) )
+        (pre,post) = (('','') if value == xml_default( ) else ('\x1B[34m','\x1B[0m')) if self.__validate_({'nqueue': value},{'nqueue': self.__schema['nqueue']}) else ('\x1B[91m','\x1B[0m')
+        self.__do_inp_output('%-14.14s = %s%-23s%s' % ('nqueue',pre,self.__to_string_(value),post),description,0+len(pre)+len(post))
+    def __maxchunkmb_inp(self):
+        def xml_default( ):
+            ## play the crazy subparameter shell game
+            dflt = self.__maxchunkmb_dflt( self.__globals_( ) )
+            if dflt is not None: return dflt
+            return int(256)
+        description = ''
+        value = self.__maxchunkmb( self.__globals_( ) )
+        (pre,post) = (('','') if value == xml_default( ) else ('\x1B[34m','\x1B[0m')) if self.__validate_({'maxchunkmb': value},{'maxchunkmb': self.__schema['maxchunkmb']}) else ('\x1B[91m','\x1B[0m')
+        self.__do_inp_output('%-14.14s = %s%-23s%s' % ('maxchunkmb',pre,self.__to_string_(value),post),description,0+len(pre)+len(post))
 
     #--------- global default implementation-------------------------------------------
     @static_var('state', __sf__('casa_inp_go_state'))
@@ -408,6 +455,8 @@ class _importeovsa:
         if 'udb_corr' in glb: del glb['udb_corr']
         if 'keep_nsclms' in glb: del glb['keep_nsclms']
         if 'width' in glb: del glb['width']
+        if 'nqueue' in glb: del glb['nqueue']
+        if 'maxchunkmb' in glb: del glb['maxchunkmb']
 
 
     #--------- inp function -----------------------------------------------------------
@@ -426,6 +475,8 @@ class _importeovsa:
         self.__doscaling_inp( )
         self.__keep_nsclms_inp( )
         self.__use_exist_udbcorr_inp( )
+        self.__nqueue_inp( )
+        self.__maxchunkmb_inp( )
 
     #--------- tget function ----------------------------------------------------------
     @static_var('state', __sf__('casa_inp_go_state'))
@@ -468,6 +519,8 @@ class _importeovsa:
         _invocation_parameters['doscaling'] = self.__doscaling( self.__globals_( ) )
         _invocation_parameters['keep_nsclms'] = self.__keep_nsclms( self.__globals_( ) )
         _invocation_parameters['use_exist_udbcorr'] = self.__use_exist_udbcorr( self.__globals_( ) )
+        _invocation_parameters['nqueue'] = self.__nqueue( self.__globals_( ) )
+        _invocation_parameters['maxchunkmb'] = self.__maxchunkmb( self.__globals_( ) )
 
         try:
             with open(_postfile,'w') as _f:
@@ -483,7 +536,7 @@ class _importeovsa:
         except: return False
         return True
 
-    def __call__( self, idbfiles=None, ncpu=None, timebin=None, width=None, visprefix=None, udb_corr=None, nocreatms=None, doconcat=None, modelms=None, doscaling=None, keep_nsclms=None, use_exist_udbcorr=None ):
+    def __call__( self, idbfiles=None, ncpu=None, timebin=None, width=None, visprefix=None, udb_corr=None, nocreatms=None, doconcat=None, modelms=None, doscaling=None, keep_nsclms=None, use_exist_udbcorr=None, nqueue=None, maxchunkmb=None ):
         def noobj(s):
            if s.startswith('<') and s.endswith('>'):
                return "None"
@@ -492,7 +545,7 @@ class _importeovsa:
         _prefile = os.path.realpath('importeovsa.pre')
         _postfile = os.path.realpath('importeovsa.last')
         _return_result_ = None
-        _arguments = [idbfiles,ncpu,timebin,width,visprefix,udb_corr,nocreatms,doconcat,modelms,doscaling,keep_nsclms,use_exist_udbcorr]
+        _arguments = [idbfiles,ncpu,timebin,width,visprefix,udb_corr,nocreatms,doconcat,modelms,doscaling,keep_nsclms,use_exist_udbcorr,nqueue,maxchunkmb]
         _invocation_parameters = OrderedDict( )
         if any(map(lambda x: x is not None,_arguments)):
             # invoke python style
@@ -509,6 +562,8 @@ class _importeovsa:
             if modelms is not None: local_global['modelms'] = modelms
             if doscaling is not None: local_global['doscaling'] = doscaling
             if use_exist_udbcorr is not None: local_global['use_exist_udbcorr'] = use_exist_udbcorr
+            if nqueue is not None: local_global['nqueue'] = nqueue
+            if maxchunkmb is not None: local_global['maxchunkmb'] = maxchunkmb
 
             # the invocation parameters for the non-subparameters can now be set - this picks up those defaults
             _invocation_parameters['idbfiles'] = self.__idbfiles( local_global )
@@ -522,6 +577,8 @@ class _importeovsa:
             _invocation_parameters['modelms'] = self.__modelms( local_global )
             _invocation_parameters['doscaling'] = self.__doscaling( local_global )
             _invocation_parameters['use_exist_udbcorr'] = self.__use_exist_udbcorr( local_global )
+            _invocation_parameters['nqueue'] = self.__nqueue( local_global )
+            _invocation_parameters['maxchunkmb'] = self.__maxchunkmb( local_global )
 
             # the sub-parameters can then be set. Use the supplied value if not None, else the function, which gets the appropriate default
             _invocation_parameters['keep_nsclms'] = self.__keep_nsclms( _invocation_parameters ) if keep_nsclms is None else keep_nsclms
@@ -540,6 +597,8 @@ class _importeovsa:
             _invocation_parameters['doscaling'] = self.__doscaling( self.__globals_( ) )
             _invocation_parameters['keep_nsclms'] = self.__keep_nsclms( self.__globals_( ) )
             _invocation_parameters['use_exist_udbcorr'] = self.__use_exist_udbcorr( self.__globals_( ) )
+            _invocation_parameters['nqueue'] = self.__nqueue( self.__globals_( ) )
+            _invocation_parameters['maxchunkmb'] = self.__maxchunkmb( self.__globals_( ) )
         try:
             with open(_prefile,'w') as _f:
                 for _i in _invocation_parameters:
@@ -553,7 +612,7 @@ class _importeovsa:
                 _f.write(" )\n")
         except: pass
         try:
-            _return_result_ = _importeovsa_t( _invocation_parameters['idbfiles'],_invocation_parameters['ncpu'],_invocation_parameters['timebin'],_invocation_parameters['width'],_invocation_parameters['visprefix'],_invocation_parameters['udb_corr'],_invocation_parameters['nocreatms'],_invocation_parameters['doconcat'],_invocation_parameters['modelms'],_invocation_parameters['doscaling'],_invocation_parameters['keep_nsclms'],_invocation_parameters['use_exist_udbcorr'] )
+            _return_result_ = _importeovsa_t( _invocation_parameters['idbfiles'],_invocation_parameters['ncpu'],_invocation_parameters['timebin'],_invocation_parameters['width'],_invocation_parameters['visprefix'],_invocation_parameters['udb_corr'],_invocation_parameters['nocreatms'],_invocation_parameters['doconcat'],_invocation_parameters['modelms'],_invocation_parameters['doscaling'],_invocation_parameters['keep_nsclms'],_invocation_parameters['use_exist_udbcorr'],_invocation_parameters['nqueue'],_invocation_parameters['maxchunkmb'] )
         except Exception as e:
             from traceback import format_exc
             from casatasks import casalog
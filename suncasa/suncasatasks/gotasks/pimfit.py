@@ -1,5 +1,5 @@
 ##################### generated by xml-casa (v2) from pimfit.xml ####################
-##################### d7d637360366fa9a556c7f929f11bf8d ##############################
+##################### 227c893854283fe75252c9d657606eb8 ##############################
 from __future__ import absolute_import
 from casashell.private.stack_manip import find_local as __sf__
 from casashell.private.stack_manip import find_frame as _find_frame
@@ -26,7 +26,7 @@ class _pimfit:
     --------- parameter descriptions ---------------------------------------------
 
     imagefiles   A list of the input images
-    ncpu         Number of cpu cores to use
+    ncpu         Number of cpu cores to use. 0 to use all available cores
     doreg        True if use vla_prep to register the image
     ephemfile    emphemeris file generated from vla_prep.read_horizons()
     timestamps   A list of timestamps of the input images
@@ -53,6 +53,8 @@ class _pimfit:
     rms          RMS to use in calculation of uncertainties. Numeric or valid quantity (record or string). If numeric, it is given units of the input image. If quantity, units must conform to image units. If not positive, the rms of the residual image, in the region of the fit, is used.
     noisefwhm    Noise correlation beam FWHM. If numeric value, interpreted as pixel widths. If quantity (dictionary, string), it must have angular units.
     summary      File name to which to write table of fit parameters.
+    outfile      Name of the HDF5 file to which to write the fit results of all the images as a columnar table. If empty, the fit results are returned as a dictionary.
+    chunksize    Number of images sent to a worker at a time. 0 to choose it from the number of images and cpu cores
     [1;42mRETURNS[1;m         void
 
     --------- examples -----------------------------------------------------------
@@ -96,6 +98,11 @@ class _pimfit:
     noisefwhm        Noise correlation beam FWHM. If numeric value, interpreted as pixel widths. If
     quantity (dictionary, string), it must have angular units.
     summary          File name to which to write table of fit parameters.
+    outfile          Name of the HDF5 file to which to write the fit results of all the images as a
+                     columnar table (see suncasa.io.fittable.read_fittable). If empty, the fit
+                     results are returned as a dictionary.
+    chunksize        Number of images sent to a worker process at a time. If 0, it is chosen from the number
+                     of images and cpu cores so that the results stream back steadily.
     
     OVERVIEW
     This application is used to fit one or more two dimensional gaussians to sources in an image as
@@ -381,7 +388,7 @@ class _pimfit:
     _info_group_ = """analysis"""
     _info_desc_ = """Fit one or more elliptical Gaussian components on an image region(s)"""
 
-    __schema = {'imagefiles': {'type': 'cReqPathVec', 'coerce': [_coerce.to_list,_coerce.expand_pathvec]}, 'ncpu': {'type': 'cInt'}, 'doreg': {'type': 'cBool'}, 'ephemfile': {'type': 'cStr', 'coerce': _coerce.to_str}, 'timestamps': {'type': 'cStrVec', 'coerce': [_coerce.to_list,_coerce.to_strvec]}, 'msinfofile': {'type': 'cStr', 'coerce': _coerce.to_str}, 'box': {'type': 'cStr', 'coerce': _coerce.to_str}, 'region': {'type': 'cVariant', 'coerce': [_coerce.to_variant]}, 'chans': {'type': 'cVariant', 'coerce': [_coerce.to_variant]}, 'stokes': {'type': 'cStr', 'coerce': _coerce.to_str}, 'mask': {'type': 'cStr', 'coerce': _coerce.to_str}, 'includepix': {'type': 'cIntVec', 'coerce': [_coerce.to_list,_coerce.to_intvec]}, 'excludepix': {'type': 'cIntVec', 'coerce': [_coerce.to_list,_coerce.to_intvec]}, 'residual': {'type': 'cStr', 'coerce': _coerce.to_str}, 'model': {'type': 'cStr', 'coerce': _coerce.to_str}, 'estimates': {'type': 'cStr', 'coerce': _coerce.to_str}, 'logfile': {'type': 'cStr', 'coerce': _coerce.to_str}, 'append': {'type': 'cBool'}, 'newestimates': {'type': 'cStr', 'coerce': _coerce.to_str}, 'complist': {'type': 'cStr', 'coerce': _coerce.to_str}, 'overwrite': {'type': 'cBool'}, 'dooff': {'type': 'cBool'}, 'offset': {'type': 'cFloat', 'coerce': _coerce.to_float}, 'fixoffset': {'type': 'cBool'}, 'stretch': {'type': 'cBool'}, 'rms': {'anyof': [{'type': 'cInt'}, {'type': 'cFloat', 'coerce': _coerce.to_float}, {'type': 'cDict'}, {'type': 'cStr', 'coerce': _coerce.to_str}]}, 'noisefwhm': {'anyof': [{'type': 'cInt'}, {'type': 'cFloat', 'coerce': _coerce.to_float}, {'type': 'cDict'}, {'type': 'cStr', 'coerce': _coerce.to_str}]}, 'summary': {'type': 'cStr', 'coerce': _coerce.to_str}}
+    __schema = {'imagefiles': {'type': 'cReqPathVec', 'coerce': [_coerce.to_list,_coerce.expand_pathvec]}, 'ncpu': {'type': 'cInt'}, 'doreg': {'type': 'cBool'}, 'ephemfile': {'type': 'cStr', 'coerce': _coerce.to_str}, 'timestamps': {'type': 'cStrVec', 'coerce': [_coerce.to_list,_coerce.to_strvec]}, 'msinfofile': {'type': 'cStr', 'coerce': _coerce.to_str}, 'box': {'type': 'cStr', 'coerce': _coerce.to_str}, 'region': {'type': 'cVariant', 'coerce': [_coerce.to_variant]}, 'chans': {'type': 'cVariant', 'coerce': [_coerce.to_variant]}, 'stokes': {'type': 'cStr', 'coerce': _coerce.to_str}, 'mask': {'type': 'cStr', 'coerce': _coerce.to_str}, 'includepix': {'type': 'cIntVec', 'coerce': [_coerce.to_list,_coerce.to_intvec]}, 'excludepix': {'type': 'cIntVec', 'coerce': [_coerce.to_list,_coerce.to_intvec]}, 'residual': {'type': 'cStr', 'coerce': _coerce.to_str}, 'model': {'type': 'cStr', 'coerce': _coerce.to_str}, 'estimates': {'type': 'cStr', 'coerce': _coerce.to_str}, 'logfile': {'type': 'cStr', 'coerce': _coerce.to_str}, 'append': {'type': 'cBool'}, 'newestimates': {'type': 'cStr', 'coerce': _coerce.to_str}, 'complist': {'type': 'cStr', 'coerce': _coerce.to_str}, 'overwrite': {'type': 'cBool'}, 'dooff': {'type': 'cBool'}, 'offset': {'type': 'cFloat', 'coerce': _coerce.to_float}, 'fixoffset': {'type': 'cBool'}, 'stretch': {'type': 'cBool'}, 'rms': {'anyof': [{'type': 'cInt'}, {'type': 'cFloat', 'coerce': _coerce.to_float}, {'type': 'cDict'}, {'type': 'cStr', 'coerce': _coerce.to_str}]}, 'noisefwhm': {'anyof': [{'type': 'cInt'}, {'type': 'cFloat', 'coerce': _coerce.to_float}, {'type': 'cDict'}, {'type': 'cStr', 'coerce': _coerce.to_str}]}, 'summary': {'type': 'cStr', 'coerce': _coerce.to_str}, 'outfile': {'type': 'cStr', 'coerce': _coerce.to_str}, 'chunksize': {'type': 'cInt'}}
 
     def __init__(self):
         self.__stdout = None
@@ -518,11 +525,11 @@ class _pimfit:
         return ''
 
     def __ncpu_dflt( self, glb ):
-        return int(8)
+        return int(0)
 
     def __ncpu( self, glb ):
         if 'ncpu' in glb: return glb['ncpu']
-        return int(8)
+        return int(0)
 
     def __stokes_dflt( self, glb ):
         return ''
@@ -580,6 +587,20 @@ class _pimfit:
         if 'doreg' in glb: return glb['doreg']
         return False
 
+    def __outfile_dflt( self, glb ):
+        return ''
+
+    def __outfile( self, glb ):
+        if 'outfile' in glb: return glb['outfile']
+        return ''
+
+    def __chunksize_dflt( self, glb ):
+        return int(0)
+
+    def __chunksize( self, glb ):
+        if 'chunksize' in glb: return glb['chunksize']
+        return int(0)
+
 
 
     #--------- return inp/go default --------------------------------------------------
@@ -799,6 +820,16 @@ class _pimfit:
         value = self.__summary( self.__globals_( ) )
         (pre,post) = ('','') if self.__validate_({'summary': value},{'summary': self.__schema['summary']}) else ('\x1B[91m','\x1B[0m')
         self.__do_inp_output('%-13.13s = %s%-23s%s' % ('summary',pre,self.__to_string_(value),post),description,0+len(pre)+len(post))
+    def __outfile_inp(self):
+        description = ''
+        value = self.__outfile( self.__globals_( ) )
+        (pre,post) = ('','') if self.__validate_({'outfile': value},{'outfile': self.__schema['outfile']}) else ('\x1B[91m','\x1B[0m')
+        self.__do_inp_output('%-13.13s = %s%-23s%s' % ('outfile',pre,self.__to_string_(value),post),description,0+len(pre)+len(post))
+    def __chunksize_inp(self):
+        description = ''
+        value = self.__chunksize( self.__globals_( ) )
+        (pre,post) = ('','') if self.__validate_({'chunksize': value},{'chunksize': self.__schema['chunksize']}) else ('\x1B[91m','\x1B[0m')
+        self.__do_inp_output('%-13.13s = %s%-23s%s' % ('chunksize',pre,self.__to_string_(value),post),description,0+len(pre)+len(post))
 
     #--------- global default implementation-------------------------------------------
     @static_var('state', __sf__('casa_inp_go_state'))
@@ -833,6 +864,8 @@ class _pimfit:
         if 'summary' in glb: del glb['summary']
         if 'includepix' in glb: del glb['includepix']
         if 'append' in glb: del glb['append']
+        if 'outfile' in glb: del glb['outfile']
+        if 'chunksize' in glb: del glb['chunksize']
 
 
     #--------- inp function -----------------------------------------------------------
@@ -867,6 +900,8 @@ class _pimfit:
         self.__rms_inp( )
         self.__noisefwhm_inp( )
         self.__summary_inp( )
+        self.__outfile_inp( )
+        self.__chunksize_inp( )
 
     #--------- tget function ----------------------------------------------------------
     @static_var('state', __sf__('casa_inp_go_state'))
@@ -890,7 +925,7 @@ class _pimfit:
             print("could not find last file, setting defaults instead...")
             self.set_global_defaults( )
 
-    def __call__( self, imagefiles=None, ncpu=None, doreg=None, ephemfile=None, timestamps=None, msinfofile=None, box=None, region=None, chans=None, stokes=None, mask=None, includepix=None, excludepix=None, residual=None, model=None, estimates=None, logfile=None, append=None, newestimates=None, complist=None, overwrite=None, dooff=None, offset=None, fixoffset=None, stretch=None, rms=None, noisefwhm=None, summary=None ):
+    def __call__( self, imagefiles=None, ncpu=None, doreg=None, ephemfile=None, timestamps=None, msinfofile=None, box=None, region=None, chans=None, stokes=None, mask=None, includepix=None, excludepix=None, residual=None, model=None, estimates=None, logfile=None, append=None, newestimates=None, complist=None, overwrite=None, dooff=None, offset=None, fixoffset=None, stretch=None, rms=None, noisefwhm=None, summary=None, outfile=None, chunksize=None ):
         def noobj(s):
            if s.startswith('<') and s.endswith('>'):
                return "None"
@@ -899,7 +934,7 @@ class _pimfit:
         _prefile = os.path.realpath('pimfit.pre')
         _postfile = os.path.realpath('pimfit.last')
         _return_result_ = None
-        _arguments = [imagefiles,ncpu,doreg,ephemfile,timestamps,msinfofile,box,region,chans,stokes,mask,includepix,excludepix,residual,model,estimates,logfile,append,newestimates,complist,overwrite,dooff,offset,fixoffset,stretch,rms,noisefwhm,summary]
+        _arguments = [imagefiles,ncpu,doreg,ephemfile,timestamps,msinfofile,box,region,chans,stokes,mask,includepix,excludepix,residual,model,estimates,logfile,append,newestimates,complist,overwrite,dooff,offset,fixoffset,stretch,rms,noisefwhm,summary,outfile,chunksize]
         _invocation_parameters = OrderedDict( )
         if any(map(lambda x: x is not None,_arguments)):
             # invoke python style
@@ -925,6 +960,8 @@ class _pimfit:
             if rms is not None: local_global['rms'] = rms
             if noisefwhm is not None: local_global['noisefwhm'] = noisefwhm
             if summary is not None: local_global['summary'] = summary
+            if outfile is not None: local_global['outfile'] = outfile
+            if chunksize is not None: local_global['chunksize'] = chunksize
 
             # the invocation parameters for the non-subparameters can now be set - this picks up those defaults
             _invocation_parameters['imagefiles'] = self.__imagefiles( local_global )
@@ -947,6 +984,8 @@ class _pimfit:
             _invocation_parameters['rms'] = self.__rms( local_global )
             _invocation_parameters['noisefwhm'] = self.__noisefwhm( local_global )
             _invocation_parameters['summary'] = self.__summary( local_global )
+            _invocation_parameters['outfile'] = self.__outfile( local_global )
+            _invocation_parameters['chunksize'] = self.__chunksize( local_global )
 
             # the sub-parameters can then be set. Use the supplied value if not None, else the function, which gets the appropriate default
             _invocation_parameters['ephemfile'] = self.__ephemfile( _invocation_parameters ) if ephemfile is None else ephemfile
@@ -988,6 +1027,8 @@ class _pimfit:
             _invocation_parameters['rms'] = self.__rms( self.__globals_( ) )
             _invocation_parameters['noisefwhm'] = self.__noisefwhm( self.__globals_( ) )
             _invocation_parameters['summary'] = self.__summary( self.__globals_( ) )
+            _invocation_parameters['outfile'] = self.__outfile( self.__globals_( ) )
+            _invocation_parameters['chunksize'] = self.__chunksize( self.__globals_( ) )
         try:
             with open(_prefile,'w') as _f:
                 for _i in _invocation_parameters:
@@ -1001,7 +1042,7 @@ class _pimfit:
                 _f.write(" )\n")
         except: pass
         try:
-            _return_result_ = _pimfit_t( _invocation_parameters['imagefiles'],_invocation_parameters['ncpu'],_invocation_parameters['doreg'],_invocation_parameters['ephemfile'],_invocation_parameters['timestamps'],_invocation_parameters['msinfofile'],_invocation_parameters['box'],_invocation_parameters['region'],_invocation_parameters['chans'],_invocation_parameters['stokes'],_invocation_parameters['mask'],_invocation_parameters['includepix'],_invocation_parameters['excludepix'],_invocation_parameters['residual'],_invocation_parameters['model'],_invocation_parameters['estimates'],_invocation_parameters['logfile'],_invocation_parameters['append'],_invocation_parameters['newestimates'],_invocation_parameters['complist'],_invocation_parameters['overwrite'],_invocation_parameters['dooff'],_invocation_parameters['offset'],_invocation_parameters['fixoffset'],_invocation_parameters['stretch'],_invocation_parameters['rms'],_invocation_parameters['noisefwhm'],_invocation_parameters['summary'] )
+            _return_result_ = _pimfit_t( _invocation_parameters['imagefiles'],_invocation_parameters['ncpu'],_invocation_parameters['doreg'],_invocation_parameters['ephemfile'],_invocation_parameters['timestamps'],_invocation_parameters['msinfofile'],_invocation_parameters['box'],_invocation_parameters['region'],_invocation_parameters['chans'],_invocation_parameters['stokes'],_invocation_parameters['mask'],_invocation_parameters['includepix'],_invocation_parameters['excludepix'],_invocation_parameters['residual'],_invocation_parameters['model'],_invocation_parameters['estimates'],_invocation_parameters['logfile'],_invocation_parameters['append'],_invocation_parameters['newestimates'],_invocation_parameters['complist'],_invocation_parameters['overwrite'],_invocation_parameters['dooff'],_invocation_parameters['offset'],_invocation_parameters['fixoffset'],_invocation_parameters['stretch'],_invocation_parameters['rms'],_invocation_parameters['noisefwhm'],_invocation_parameters['summary'] ,_invocation_parameters['outfile'],_invocation_parameters['chunksize'] )
         except Exception as e:
             from traceback import format_exc
             from casatasks import casalog
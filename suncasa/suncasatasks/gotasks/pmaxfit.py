@@ -1,5 +1,5 @@
 ##################### generated by xml-casa (v2) from pmaxfit.xml ###################
-##################### b3be0c8ff5a66315d1c40770a10aa871 ##############################
+##################### f7891178576a2b65d440686acd79af11 ##############################
 from __future__ import absolute_import
 from casashell.private.stack_manip import find_local as __sf__
 from casashell.private.stack_manip import find_frame as _find_frame
@@ -51,9 +51,10 @@ class _pmaxfit:
     --------- parameter descriptions ---------------------------------------------
 
     imagefiles A list of the input images
-    ncpu       Number of cpu cores to use
+    ncpu       Number of cpu cores to use. 0 to use all available cores
     box        Rectangular region(s) to select in direction plane. See "help par.box" for details. Default is to use the entire direction plane.
     width      Half-width of fit grid
+    chunksize  Number of images sent to a worker at a time. 0 to choose it from the number of images and cpu cores
     [1;42mRETURNS[1;m       void
 
     --------- examples -----------------------------------------------------------
@@ -83,7 +84,7 @@ class _pmaxfit:
     _info_group_ = """analysis"""
     _info_desc_ = """Find maximum and do parabolic fit in the sky"""
 
-    __schema = {'imagefiles': {'type': 'cReqPathVec', 'coerce': [_coerce.to_list,_coerce.expand_pathvec]}, 'ncpu': {'type': 'cInt'}, 'box': {'type': 'cStr', 'coerce': _coerce.to_str}, 'width': {'type': 'cInt'}}
+    __schema = {'imagefiles': {'type': 'cReqPathVec', 'coerce': [_coerce.to_list,_coerce.expand_pathvec]}, 'ncpu': {'type': 'cInt'}, 'box': {'type': 'cStr', 'coerce': _coerce.to_str}, 'width': {'type': 'cInt'}, 'chunksize': {'type': 'cInt'}}
 
     def __init__(self):
         self.__stdout = None
@@ -150,11 +151,11 @@ class _pmaxfit:
         return [  ]
 
     def __ncpu_dflt( self, glb ):
-        return int(8)
+        return int(0)
 
     def __ncpu( self, glb ):
         if 'ncpu' in glb: return glb['ncpu']
-        return int(8)
+        return int(0)
 
     def __box_dflt( self, glb ):
         return ''
@@ -170,6 +171,13 @@ class _pmaxfit:
         if 'width' in glb: return glb['width']
         return int(5)
 
+    def __chunksize_dflt( self, glb ):
+        return int(0)
+
+    def __chunksize( self, glb ):
+        if 'chunksize' in glb: return glb['chunksize']
+        return int(0)
+
 
 
     #--------- return inp/go default --------------------------------------------------
@@ -199,6 +207,11 @@ class _pmaxfit:
         value = self.__width( self.__globals_( ) )
         (pre,post) = ('','') if self.__validate_({'width': value},{'width': self.__schema['width']}) else ('\x1B[91m','\x1B[0m')
         self.__do_inp_output('%-10.10s = %s%-23s%s' % ('width',pre,self.__to_string_(value),post),description,0+len(pre)+len(post))
+    def __chunksize_inp(self):
+        description = ''
+        value = self.__chunksize( self.__globals_( ) )
+        (pre,post) = ('','') if self.__validate_({'chunksize': value},{'chunksize': self.__schema['chunksize']}) else ('\x1B[91m','\x1B[0m')
+        self.__do_inp_output('%-10.10s = %s%-23s%s' % ('chunksize',pre,self.__to_string_(value),post),description,0+len(pre)+len(post))
 
     #--------- global default implementation-------------------------------------------
     @static_var('state', __sf__('casa_inp_go_state'))
@@ -209,6 +222,7 @@ class _pmaxfit:
         if 'ncpu' in glb: del glb['ncpu']
         if 'box' in glb: del glb['box']
         if 'width' in glb: del glb['width']
+        if 'chunksize' in glb: del glb['chunksize']
 
 
     #--------- inp function -----------------------------------------------------------
@@ -219,6 +233,7 @@ class _pmaxfit:
         self.__ncpu_inp( )
         self.__box_inp( )
         self.__width_inp( )
+        self.__chunksize_inp( )
 
     #--------- tget function ----------------------------------------------------------
     @static_var('state', __sf__('casa_inp_go_state'))
@@ -242,7 +257,7 @@ class _pmaxfit:
             print("could not find last file, setting defaults instead...")
             self.set_global_defaults( )
 
-    def __call__( self, imagefiles=None, ncpu=None, box=None, width=None ):
+    def __call__( self, imagefiles=None, ncpu=None, box=None, width=None, chunksize=None ):
         def noobj(s):
            if s.startswith('<') and s.endswith('>'):
                return "None"
@@ -251,7 +266,7 @@ class _pmaxfit:
         _prefile = os.path.realpath('pmaxfit.pre')
         _postfile = os.path.realpath('pmaxfit.last')
         _return_result_ = None
-        _arguments = [imagefiles,ncpu,box,width]
+        _arguments = [imagefiles,ncpu,box,width,chunksize]
         _invocation_parameters = OrderedDict( )
         if any(map(lambda x: x is not None,_arguments)):
             # invoke python style
@@ -261,12 +276,14 @@ class _pmaxfit:
             if ncpu is not None: local_global['ncpu'] = ncpu
             if box is not None: local_global['box'] = box
             if width is not None: local_global['width'] = width
+            if chunksize is not None: local_global['chunksize'] = chunksize
 
             # the invocation parameters for the non-subparameters can now be set - this picks up those defaults
             _invocation_parameters['imagefiles'] = self.__imagefiles( local_global )
             _invocation_parameters['ncpu'] = self.__ncpu( local_global )
             _invocation_parameters['box'] = self.__box( local_global )
             _invocation_parameters['width'] = self.__width( local_global )
+            _invocation_parameters['chunksize'] = self.__chunksize( local_global )
 
             # the sub-parameters can then be set. Use the supplied value if not None, else the function, which gets the appropriate default
             
@@ -277,6 +294,7 @@ class _pmaxfit:
             _invocation_parameters['ncpu'] = self.__ncpu( self.__globals_( ) )
             _invocation_parameters['box'] = self.__box( self.__globals_( ) )
             _invocation_parameters['width'] = self.__width( self.__globals_( ) )
+            _invocation_parameters['chunksize'] = self.__chunksize( self.__globals_( ) )
         try:
             with open(_prefile,'w') as _f:
                 for _i in _invocation_parameters:
@@ -290,7 +308,7 @@ class _pmaxfit:
                 _f.write(" )\n")
         except: pass
         try:
-            _return_result_ = _pmaxfit_t( _invocation_parameters['imagefiles'],_invocation_parameters['ncpu'],_invocation_parameters['box'],_invocation_parameters['width'] )
+            _return_result_ = _pmaxfit_t( _invocation_parameters['imagefiles'],_invocation_parameters['ncpu'],_invocation_parameters['box'],_invocation_parameters['width'],_invocation_parameters['chunksize'] )
         except Exception as e:
             from traceback import format_exc
             from casatasks import casalog
@@ -1,5 +1,5 @@
 ##################### generated by xml-casa (v2) from subvs.xml #####################
-##################### 359882fd4602fc4cb310cc193180fe92 ##############################
+##################### ab77c318863acc4669c87ff43ec06d3d ##############################
 from __future__ import absolute_import
 from casashell.private.stack_manip import find_local as __sf__
 from casashell.private.stack_manip import find_frame as _find_frame
@@ -52,6 +52,9 @@ class _subvs:
     splitsel    Split the selected timerange and spectral channels as outputvis
     reverse     Reverse the sign of the background-subtracted data (for absorptive structure)
     overwrite   Overwrite the already existing output measurement set
+    maxmemmb    Upper limit (in MB) of the visibility chunk smoothed or subtracted at once
+    ncpu        Number of processes used to smooth the visibility chunks
+    streaming   Read, subtract, and write the visibilities of each spw in chunks of baselines no larger than maxmemmb
 
     --------- examples -----------------------------------------------------------
 
@@ -120,6 +123,13 @@ class _subvs:
     outputvis already exists, the selected subtime and spw in the
     output measurment set will be replaced with background subtracted
     visibilities
+    maxmemmb -- upper limit (in MB) of the visibility chunk smoothed at once in the
+    lowpass and highpass modes. default = 1024
+    ncpu -- number of processes used to smooth the visibility chunks. default = 1
+    streaming -- True or False. default = False. If streaming = True, the visibilities of each
+    spw are read, background subtracted, and written back in chunks of baselines,
+    each of which holds the entire time series of its baselines and is no larger
+    than maxmemmb. Peak memory is then bounded regardless of the observation length.
 
 
     """
@@ -127,7 +137,7 @@ class _subvs:
     _info_group_ = """misc"""
     _info_desc_ = """Vector-subtraction in UV using selected time ranges and spectral channels as background"""
 
-    __schema = {'vis': {'type': 'cReqPath', 'coerce': _coerce.expand_path}, 'outputvis': {'type': 'cPath', 'coerce': _coerce.expand_path}, 'timerange': {'type': 'cStr', 'coerce': _coerce.to_str}, 'spw': {'type': 'cStr', 'coerce': _coerce.to_str}, 'mode': {'type': 'cStr', 'coerce': _coerce.to_str, 'allowed': [ 'linear', 'lowpass', 'highpass' ]}, 'subtime1': {'type': 'cStr', 'coerce': _coerce.to_str}, 'subtime2': {'type': 'cStr', 'coerce': _coerce.to_str}, 'smoothaxis': {'type': 'cStr', 'coerce': _coerce.to_str}, 'smoothtype': {'type': 'cStr', 'coerce': _coerce.to_str}, 'smoothwidth': {'type': 'cInt'}, 'splitsel': {'type': 'cBool'}, 'reverse': {'type': 'cBool'}, 'overwrite': {'type': 'cBool'}}
+    __schema = {'vis': {'type': 'cReqPath', 'coerce': _coerce.expand_path}, 'outputvis': {'type': 'cPath', 'coerce': _coerce.expand_path}, 'timerange': {'type': 'cStr', 'coerce': _coerce.to_str}, 'spw': {'type': 'cStr', 'coerce': _coerce.to_str}, 'mode': {'type': 'cStr', 'coerce': _coerce.to_str, 'allowed': [ 'linear', 'lowpass', 'highpass' ]}, 'subtime1': {'type': 'cStr', 'coerce': _coerce.to_str}, 'subtime2': {'type': 'cStr', 'coerce': _coerce.to_str}, 'smoothaxis': {'type': 'cStr', 'coerce': _coerce.to_str}, 'smoothtype': {'type': 'cStr', 'coerce': _coerce.to_str}, 'smoothwidth': {'type': 'cInt'}, 'splitsel': {'type': 'cBool'}, 'reverse': {'type': 'cBool'}, 'overwrite': {'type': 'cBool'}, 'maxmemmb': {'type': 'cInt'}, 'ncpu': {'type': 'cInt'}, 'streaming': {'type': 'cBool'}}
 
     def __init__(self):
         self.__stdout = None
@@ -242,6 +252,27 @@ class _subvs:
         if 'overwrite' in glb: return glb['overwrite']
         return False
 
+    def __maxmemmb_dflt( self, glb ):
+        return int(1024)
+
+    def __maxmemmb( self, glb ):
+        if 'maxmemmb' in glb: return glb['maxmemmb']
+        return int(1024)
+
+    def __ncpu_dflt( self, glb ):
+        return int(1)
+
+    def __ncpu( self, glb ):
+        if 'ncpu' in glb: return glb['ncpu']
+        return int(1)
+
+    def __streaming_dflt( self, glb ):
+        return False
+
+    def __streaming( self, glb ):
+        if 'streaming' in glb: return glb['streaming']
+        return False
+
 
 
     #--------- return inp/go default --------------------------------------------------
@@ -362,6 +393,21 @@ class _subvs:
         value = self.__overwrite( self.__globals_( ) )
         (pre,post) = ('','') if self.__validate_({'overwrite': value},{'overwrite': self.__schema['overwrite']}) else ('\x1B[91m','\x1B[0m')
         self.__do_inp_output('%-14.14s = %s%-23s%s' % ('overwrite',pre,self.__to_string_(value),post),description,0+len(pre)+len(post))
+    def __maxmemmb_inp(self):
+        description = ''
+        value = self.__maxmemmb( self.__globals_( ) )
+        (pre,post) = ('','') if self.__validate_({'maxmemmb': value},{'maxmemmb': self.__schema['maxmemmb']}) else ('\x1B[91m','\x1B[0m')
+        self.__do_inp_output('%-14.14s = %s%-23s%s' % ('maxmemmb',pre,self.__to_string_(value),post),description,0+len(pre)+len(post))
+    def __ncpu_inp(self):
+        description = ''
+        value = self.__ncpu( self.__globals_( ) )
+        (pre,post) = ('','') if self.__validate_({'ncpu': value},{'ncpu': self.__schema['ncpu']}) else ('\x1B[91m','\x1B[0m')
+        self.__do_inp_output('%-14.14s = %s%-23s%s' % ('ncpu',pre,self.__to_string_(value),post),description,0+len(pre)+len(post))
+    def __streaming_inp(self):
+        description = ''
+        value = self.__streaming( self.__globals_( ) )
+        (pre,post) = ('','') if self.__validate_({'streaming': value},{'streaming': self.__schema['streaming']}) else ('\x1B[91m','\x1B[0m')
+        self.__do_inp_output('%-14.14s = %s%-23s%s' % ('streaming',pre,self.__to_string_(value),post),description,0+len(pre)+len(post))
 
     #--------- global default implementation-------------------------------------------
     @static_var('state', __sf__('casa_inp_go_state'))
@@ -381,6 +427,9 @@ class _subvs:
         if 'smoothtype' in glb: del glb['smoothtype']
         if 'spw' in glb: del glb['spw']
         if 'timerange' in glb: del glb['timerange']
+        if 'maxmemmb' in glb: del glb['maxmemmb']
+        if 'ncpu' in glb: del glb['ncpu']
+        if 'streaming' in glb: del glb['streaming']
 
 
     #--------- inp function -----------------------------------------------------------
@@ -400,6 +449,9 @@ class _subvs:
         self.__splitsel_inp( )
         self.__reverse_inp( )
         self.__overwrite_inp( )
+        self.__maxmemmb_inp( )
+        self.__ncpu_inp( )
+        self.__streaming_inp( )
 
     #--------- tget function ----------------------------------------------------------
     @static_var('state', __sf__('casa_inp_go_state'))
@@ -423,7 +475,7 @@ class _subvs:
             print("could not find last file, setting defaults instead...")
             self.set_global_defaults( )
 
-    def __call__( self, vis=None, outputvis=None, timerange=None, spw=None, mode=None, subtime1=None, subtime2=None, smoothaxis=None, smoothtype=None, smoothwidth=None, splitsel=None, reverse=None, overwrite=None ):
+    def __call__( self, vis=None, outputvis=None, timerange=None, spw=None, mode=None, subtime1=None, subtime2=None, smoothaxis=None, smoothtype=None, smoothwidth=None, splitsel=None, reverse=None, overwrite=None, maxmemmb=None, ncpu=None, streaming=None ):
         def noobj(s):
            if s.startswith('<') and s.endswith('>'):
                return "None"
@@ -432,7 +484,7 @@ class _subvs:
         _prefile = os.path.realpath('subvs.pre')
         _postfile = os.path.realpath('subvs.last')
         _return_result_ = None
-        _arguments = [vis,outputvis,timerange,spw,mode,subtime1,subtime2,smoothaxis,smoothtype,smoothwidth,splitsel,reverse,overwrite]
+        _arguments = [vis,outputvis,timerange,spw,mode,subtime1,subtime2,smoothaxis,smoothtype,smoothwidth,splitsel,reverse,overwrite,maxmemmb,ncpu,streaming]
         _invocation_parameters = OrderedDict( )
         if any(map(lambda x: x is not None,_arguments)):
             # invoke python style
@@ -446,6 +498,9 @@ class _subvs:
             if splitsel is not None: local_global['splitsel'] = splitsel
             if reverse is not None: local_global['reverse'] = reverse
             if overwrite is not None: local_global['overwrite'] = overwrite
+            if maxmemmb is not None: local_global['maxmemmb'] = maxmemmb
+            if ncpu is not None: local_global['ncpu'] = ncpu
+            if streaming is not None: local_global['streaming'] = streaming
 
             # the invocation parameters for the non-subparameters can now be set - this picks up those defaults
             _invocation_parameters['vis'] = self.__vis( local_global )
@@ -456,6 +511,9 @@ class _subvs:
             _invocation_parameters['splitsel'] = self.__splitsel( local_global )
             _invocation_parameters['reverse'] = self.__reverse( local_global )
             _invocation_parameters['overwrite'] = self.__overwrite( local_global )
+            _invocation_parameters['maxmemmb'] = self.__maxmemmb( local_global )
+            _invocation_parameters['ncpu'] = self.__ncpu( local_global )
+            _invocation_parameters['streaming'] = self.__streaming( local_global )
 
             # the sub-parameters can then be set. Use the supplied value if not None, else the function, which gets the appropriate default
             _invocation_parameters['subtime1'] = self.__subtime1( _invocation_parameters ) if subtime1 is None else subtime1
@@ -479,6 +537,9 @@ class _subvs:
             _invocation_parameters['splitsel'] = self.__splitsel( self.__globals_( ) )
             _invocation_parameters['reverse'] = self.__reverse( self.__globals_( ) )
             _invocation_parameters['overwrite'] = self.__overwrite( self.__globals_( ) )
+            _invocation_parameters['maxmemmb'] = self.__maxmemmb( self.__globals_( ) )
+            _invocation_parameters['ncpu'] = self.__ncpu( self.__globals_( ) )
+            _invocation_parameters['streaming'] = self.__streaming( self.__globals_( ) )
         try:
             with open(_prefile,'w') as _f:
                 for _i in _invocation_parameters:
@@ -492,7 +553,7 @@ class _subvs:
                 _f.write(" )\n")
         except: pass
         try:
-            _return_result_ = _subvs_t( _invocation_parameters['vis'],_invocation_parameters['outputvis'],_invocation_parameters['timerange'],_invocation_parameters['spw'],_invocation_parameters['mode'],_invocation_parameters['subtime1'],_invocation_parameters['subtime2'],_invocation_parameters['smoothaxis'],_invocation_parameters['smoothtype'],_invocation_parameters['smoothwidth'],_invocation_parameters['splitsel'],_invocation_parameters['reverse'],_invocation_parameters['overwrite'] )
+            _return_result_ = _subvs_t( _invocation_parameters['vis'],_invocation_parameters['outputvis'],_invocation_parameters['timerange'],_invocation_parameters['spw'],_invocation_parameters['mode'],_invocation_parameters['subtime1'],_invocation_parameters['subtime2'],_invocation_parameters['smoothaxis'],_invocation_parameters['smoothtype'],_invocation_parameters['smoothwidth'],_invocation_parameters['splitsel'],_invocation_parameters['reverse'],_invocation_parameters['overwrite'] ,_invocation_parameters['maxmemmb'],_invocation_parameters['ncpu'],_invocation_parameters['streaming'] )
         except Exception as e:
             from traceback import format_exc
             from casatasks import casalog
@@ -1,5 +1,5 @@
 ##################### generated by xml-casa (v2) from importeovsa.xml ###############
-##################### c9df476ec6913d95cc0ec94dbdf76dda ##############################
+##################### 31092f8c8f490654abf4a5d0be2b38b3 ##############################
 from __future__ import absolute_import
 import numpy
 from casatools.typecheck import CasaValidator as _val_ctor
@@ -36,6 +36,8 @@ class _importeovsa:
     doscaling         If creating a new MS file with the amplitude of visibility data rescaled.
     keep_nsclms       Keep the no scaling measurement sets
     use_exist_udbcorr If use the existed udb_corr results.
+    nqueue            Maximum number of files in flight between the udb_corr and the import stages. 0 for 2 * ncpu
+    maxchunkmb        Upper limit (in MB) of the data block written to the MS with each column-level put
 
     --------- examples -----------------------------------------------------------
 
@@ -93,6 +95,17 @@ class _importeovsa:
     default: '0s'
     
     
+    --- Parallel import parameters ---
+    
+    nqueue -- Maximum number of files in flight between the udb_corr and the
+    import stages when ncpu > 1.
+    default: 0 => 2 * ncpu
+    
+    maxchunkmb -- Upper limit (in MB) of the data block written to the MS with
+    each column-level put.
+    default: 256
+    
+    
     
     
     
@@ -108,14 +121,14 @@ class _importeovsa:
     _info_group_ = """Import/export"""
     _info_desc_ = """Parallelized import EOVSA idb file(s) to a measurement set or multiple measurement set."""
 
-    def __call__( self, idbfiles='', ncpu=int(1), timebin='0s', width=int(1), visprefix='', udb_corr=True, nocreatms=False, doconcat=False, modelms='', doscaling=False, keep_nsclms=False, use_exist_udbcorr=False ):
-        schema = {'idbfiles': {'anyof': [{'type': 'cStr', 'coerce': _coerce.to_str}, {'type': 'cStrVec', 'coerce': [_coerce.to_list,_coerce.to_strvec]}]}, 'ncpu': {'type': 'cInt'}, 'timebin': {'type': 'cStr', 'coerce': _coerce.to_str}, 'width': {'anyof': [{'type': 'cStr', 'coerce': _coerce.to_str}, {'type': 'cStrVec', 'coerce': [_coerce.to_list,_coerce.to_strvec]}, {'type': 'cInt'}, {'type': 'cIntVec', 'coerce': [_coerce.to_list,_coerce.to_intvec]}]}, 'visprefix': {'type': 'cStr', 'coerce': _coerce.to_str}, 'udb_corr': {'type': 'cBool'}, 'nocreatms': {'type': 'cBool'}, 'doconcat': {'type': 'cBool'}, 'modelms': {'type': 'cStr', 'coerce': _coerce.to_str}, 'doscaling': {'type': 'cBool'}, 'keep_nsclms': {'type': 'cBool'}, 'use_exist_udbcorr': {'type': 'cBool'}}
-        doc = {'idbfiles': idbfiles, 'ncpu': ncpu, 'timebin': timebin, 'width': width, 'visprefix': visprefix, 'udb_corr': udb_corr, 'nocreatms': nocreatms, 'doconcat': doconcat, 'modelms': modelms, 'doscaling': doscaling, 'keep_nsclms': keep_nsclms, 'use_exist_udbcorr': use_exist_udbcorr}
+    def __call__( self, idbfiles='', ncpu=int(1), timebin='0s', width=int(1), visprefix='', udb_corr=True, nocreatms=False, doconcat=False, modelms='', doscaling=False, keep_nsclms=False, use_exist_udbcorr=False, nqueue=int(0), maxchunkmb=int(256) ):
+        schema = {'idbfiles': {'anyof': [{'type': 'cStr', 'coerce': _coerce.to_str}, {'type': 'cStrVec', 'coerce': [_coerce.to_list,_coerce.to_strvec]}]}, 'ncpu': {'type': 'cInt'}, 'timebin': {'type': 'cStr', 'coerce': _coerce.to_str}, 'width': {'anyof': [{'type': 'cStr', 'coerce': _coerce.to_str}, {'type': 'cStrVec', 'coerce': [_coerce.to_list,_coerce.to_strvec]}, {'type': 'cInt'}, {'type': 'cIntVec', 'coerce': [_coerce.to_list,_coerce.to_intvec]}]}, 'visprefix': {'type': 'cStr', 'coerce': _coerce.to_str}, 'udb_corr': {'type': 'cBool'}, 'nocreatms': {'type': 'cBool'}, 'doconcat': {'type': 'cBool'}, 'modelms': {'type': 'cStr', 'coerce': _coerce.to_str}, 'doscaling': {'type': 'cBool'}, 'keep_nsclms': {'type': 'cBool'}, 'use_exist_udbcorr': {'type': 'cBool'}, 'nqueue': {'type': 'cInt'}, 'maxchunkmb': {'type': 'cInt'}}
+        doc = {'idbfiles': idbfiles, 'ncpu': ncpu, 'timebin': timebin, 'width': width, 'visprefix': visprefix, 'udb_corr': udb_corr, 'nocreatms': nocreatms, 'doconcat': doconcat, 'modelms': modelms, 'doscaling': doscaling, 'keep_nsclms': keep_nsclms, 'use_exist_udbcorr': use_exist_udbcorr, 'nqueue': nqueue, 'maxchunkmb': maxchunkmb}
         assert _pc.validate(doc,schema), create_error_string(_pc.errors)
-        _logging_state_ = _start_log( 'importeovsa', [ 'idbfiles=' + repr(_pc.document['idbfiles']), 'ncpu=' + repr(_pc.document['ncpu']), 'timebin=' + repr(_pc.document['timebin']), 'width=' + repr(_pc.document['width']), 'visprefix=' + repr(_pc.document['visprefix']), 'udb_corr=' + repr(_pc.document['udb_corr']), 'nocreatms=' + repr(_pc.document['nocreatms']), 'doconcat=' + repr(_pc.document['doconcat']), 'modelms=' + repr(_pc.document['modelms']), 'doscaling=' + repr(_pc.document['doscaling']), 'keep_nsclms=' + repr(_pc.document['keep_nsclms']), 'use_exist_udbcorr=' + repr(_pc.document['use_exist_udbcorr']) ] )
+        _logging_state_ = _start_log( 'importeovsa', [ 'idbfiles=' + repr(_pc.document['idbfiles']), 'ncpu=' + repr(_pc.document['ncpu']), 'timebin=' + repr(_pc.document['timebin']), 'width=' + repr(_pc.document['width']), 'visprefix=' + repr(_pc.document['visprefix']), 'udb_corr=' + repr(_pc.document['udb_corr']), 'nocreatms=' + repr(_pc.document['nocreatms']), 'doconcat=' + repr(_pc.document['doconcat']), 'modelms=' + repr(_pc.document['modelms']), 'doscaling=' + repr(_pc.document['doscaling']), 'keep_nsclms=' + repr(_pc.document['keep_nsclms']), 'use_exist_udbcorr=' + repr(_pc.document['use_exist_udbcorr']), 'nqueue=' + repr(_pc.document['nqueue']), 'maxchunkmb=' + repr(_pc.document['maxchunkmb']) ] )
         task_result = None
         try:
-            task_result = _importeovsa_t( _pc.document['idbfiles'], _pc.document['ncpu'], _pc.document['timebin'], _pc.document['width'], _pc.document['visprefix'], _pc.document['udb_corr'], _pc.document['nocreatms'], _pc.document['doconcat'], _pc.document['modelms'], _pc.document['doscaling'], _pc.document['keep_nsclms'], _pc.document['use_exist_udbcorr'] )
+            task_result = _importeovsa_t( _pc.document['idbfiles'], _pc.document['ncpu'], _pc.document['timebin'], _pc.document['width'], _pc.document['visprefix'], _pc.document['udb_corr'], _pc.document['nocreatms'], _pc.document['doconcat'], _pc.document['modelms'], _pc.document['doscaling'], _pc.document['keep_nsclms'], _pc.document['use_exist_udbcorr'], _pc.document['nqueue'], _pc.document['maxchunkmb'] )
         except Exception as exc:
             _except_log('importeovsa', exc)
             raise
@@ -1,5 +1,5 @@
 ##################### generated by xml-casa (v2) from pmaxfit.xml ###################
-##################### b3be0c8ff5a66315d1c40770a10aa871 ##############################
+##################### f7891178576a2b65d440686acd79af11 ##############################
 from __future__ import absolute_import
 import numpy
 from casatools.typecheck import CasaValidator as _val_ctor
@@ -41,9 +41,10 @@ class _pmaxfit:
     --------- parameter descriptions ---------------------------------------------
 
     imagefiles A list of the input images
-    ncpu       Number of cpu cores to use
+    ncpu       Number of cpu cores to use. 0 to use all available cores
     box        Rectangular region(s) to select in direction plane. See "help par.box" for details. Default is to use the entire direction plane.
     width      Half-width of fit grid
+    chunksize  Number of images sent to a worker at a time. 0 to choose it from the number of images and cpu cores
     [1;42mRETURNS[1;m       void
 
     --------- examples -----------------------------------------------------------
@@ -73,12 +74,12 @@ class _pmaxfit:
     _info_group_ = """analysis"""
     _info_desc_ = """Find maximum and do parabolic fit in the sky"""
 
-    def __call__( self, imagefiles=[  ], ncpu=int(8), box='', width=int(5) ):
-        schema = {'imagefiles': {'type': 'cReqPathVec', 'coerce': [_coerce.to_list,_coerce.expand_pathvec]}, 'ncpu': {'type': 'cInt'}, 'box': {'type': 'cStr', 'coerce': _coerce.to_str}, 'width': {'type': 'cInt'}}
-        doc = {'imagefiles': imagefiles, 'ncpu': ncpu, 'box': box, 'width': width}
+    def __call__( self, imagefiles=[  ], ncpu=int(0), box='', width=int(5), chunksize=int(0) ):
+        schema = {'imagefiles': {'type': 'cReqPathVec', 'coerce': [_coerce.to_list,_coerce.expand_pathvec]}, 'ncpu': {'type': 'cInt'}, 'box': {'type': 'cStr', 'coerce': _coerce.to_str}, 'width': {'type': 'cInt'}, 'chunksize': {'type': 'cInt'}}
+        doc = {'imagefiles': imagefiles, 'ncpu': ncpu, 'box': box, 'width': width, 'chunksize': chunksize}
         assert _pc.validate(doc,schema), str(_pc.errors)
-        _logging_state_ = _start_log( 'pmaxfit', [ 'imagefiles=' + repr(_pc.document['imagefiles']), 'ncpu=' + repr(_pc.document['ncpu']), 'box=' + repr(_pc.document['box']), 'width=' + repr(_pc.document['width']) ] )
-        return _end_log( _logging_state_, 'pmaxfit', _pmaxfit_t( _pc.document['imagefiles'], _pc.document['ncpu'], _pc.document['box'], _pc.document['width'] ) )
+        _logging_state_ = _start_log( 'pmaxfit', [ 'imagefiles=' + repr(_pc.document['imagefiles']), 'ncpu=' + repr(_pc.document['ncpu']), 'box=' + repr(_pc.document['box']), 'width=' + repr(_pc.document['width']), 'chunksize=' + repr(_pc.document['chunksize']) ] )
+        return _end_log( _logging_state_, 'pmaxfit', _pmaxfit_t( _pc.document['imagefiles'], _pc.document['ncpu'], _pc.document['box'], _pc.document['width'], _pc.document['chunksize'] ) )
 
 pmaxfit = _pmaxfit( )
 
@@ -4,14 +4,12 @@ check_dependencies()
 import sys
 import os
 import numpy as np
-import numpy.ma as ma
-import scipy.constants as constants
 import time
 from astropy.time import Time
 from eovsapy import util
 from eovsapy import dump_tsys as dtsys
-import aipy
 from suncasa.eovsa import impteovsa as ipe
+from suncasa.suncasatasks.private import task_concateovsa as ce
 
 py3 = sys.version_info.major >= 3
 
@@ -103,6 +101,32 @@ def udb_corr_external(filelist, udbcorr_path, use_exist_udbcorr=False):
     return filelist
 
 
+def putcol_bands(tb, colname, arr, chan_band, nrows, maxchunkmb=256):
+    '''Write a (npol, nf, nrows) array into the main table column colname, one band (spw) at a time.
+       Each band occupies the rows [l * nrows, (l + 1) * nrows) of the table. Instead of writing every row
+       with tb.putcell, the band is written with column-level tb.putcol calls over contiguous row ranges.
+       Required inputs:
+       tb - an opened table tool with write access
+       colname - name of the column, e.g., 'DATA' or 'FLAG'
+       arr - array in the shape of (npol, nf, nrows)
+       chan_band - band information returned by impteovsa.get_band
+       nrows - number of rows per band
+       Optional inputs:
+       maxchunkmb - upper limit (in MB) of the contiguous block copied from arr for each putcol call
+    '''
+    for l, cband in enumerate(chan_band):
+        time1 = time.time()
+        cidx0, cidx1 = cband['cidx'][0], cband['cidx'][-1] + 1
+        rowbytes = arr.shape[0] * (cidx1 - cidx0) * arr.itemsize
+        nrowchunk = int(max(1, min(nrows, maxchunkmb * 1024 ** 2 // rowbytes)))
+        for row in range(0, nrows, nrowchunk):
+            nrow = min(nrowchunk, nrows - row)
+            block = np.ascontiguousarray(arr[:, cidx0:cidx1, row:row + nrow])
+            tb.putcol(colname, block, startrow=int(row + l * nrows), nrow=int(nrow))
+        casalog.post('---{0} of spw {1:02d} is updated in --- {2:10.2f} seconds ---'.format(colname, (l + 1),
+                                                                                          time.time() - time1))
+
+
 def trange2filelist(trange=[], verbose=False):
     '''This finds all solar IDB files within a timerange;
        Required inputs:
@@ -172,109 +196,52 @@ def trange2filelist(trange=[], verbose=False):
     return filelist
 
 
-def importeovsa_iter(filelist, timebin, width, visprefix, nocreatms, modelms, doscaling, keep_nsclms, fileidx):
+def importeovsa_iter(filelist, timebin, width, visprefix, nocreatms, modelms, doscaling, keep_nsclms, fileidx,
+                     maxchunkmb=256):
     '''
-
+       filelist - list of IDB file names, or of in-memory IDB structures returned by impteovsa.read_idb
+       maxchunkmb - upper limit (in MB) of the data block written to the MS with each column-level put
     '''
 
-    filename = filelist[fileidx]
-    uv = aipy.miriad.UV(filename)
-    # try:
+    time0 = time.time()
+    idb = filelist[fileidx]
+    if not isinstance(idb, dict):
+        idb = ipe.read_idb(idb)
+    filename = idb['filename']
     msname0 = list(filename.split('/')[-1])
     msname = visprefix + ''.join(msname0) + '.ms'
-    # try:
-    # uv.select('antennae', 0, 1, include=True)
-    # uv.select('polarization', -5, -5, include=True)
 
-    if 'antlist' in uv.vartable:
-        ants = uv['antlist'].replace('\x00', '')
-        antlist = list(map(int, ants.split()))
-    else:
-        antlist = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16]
-
-    good_idx = np.where(uv['sfreq'] > 0)[0]
-
-    nf = len(good_idx)
-    npol = uv['npol']
-    nants = uv['nants']
-    source_id = uv['source'].replace('\x00', '')
-    sfreq = uv['sfreq'][good_idx]
-    sdf = uv['sdf'][good_idx]
-    ra, dec = uv['ra'], uv['dec']
-    nbl = int(nants * (nants - 1) / 2)
-    bl2ord = ipe.bl_list2(nants)
-    npairs = int(nbl + nants)
-
-    timesall = []
-    uv.rewind()
-    for preamble, data in uv.all():
-        uvw, t, (i, j) = preamble
-        timesall.append(t)
-    timesjd = np.unique(timesall)
-    # except:
-    #     pass
-
-    uv.select('clear', -1, -1, include=True)
-    times = ipe.jd2mjds(np.asarray(timesjd))
-    inttime = np.median((times - np.roll(times, 1))[1:]) / 60  ## time in minutes
-    inttimed = inttime / (24 * 60)  ## time in days
-
-    time_steps = np.round((times[-1] - times[0]) / inttime / 60).astype(int) + 1
-    # time_steps = len(timesall) / (npairs * npol)
-    if len(times) != time_steps:
-        ### This is to solve the timestamp glitch in idb files.
-        ### The timestamps are supposed to be evenly spaced
-        ### However, some idb files may miss a few timestamps in the evenly-spaced time grid.
-        ### The step will map the the data to the evenly-spaced time grid.
-        timesnew = np.linspace(times[0], times[-1], time_steps)
-        timesnew[np.hstack([[0], np.cumsum(np.round(np.diff(times) / 60 / inttime))]).astype(int)] = times
-        times = timesnew
+    antlist = idb['antlist']
+    npol = idb['npol']
+    nants = idb['nants']
+    source_id = idb['source_id']
+    ra, dec = idb['ra'], idb['dec']
+    bl2ord = idb['bl2ord']
+    npairs = idb['npairs']
+    times = idb['times']
+    inttime = idb['inttime']
+    time_steps = len(times)
     durtim = int(np.round((times[-1] - times[0]) / 60 + inttime))  ## time in minutes
-    time0 = time.time()
 
-    flag = np.ones((npol, nf, time_steps, npairs), dtype=bool)
-    out = np.zeros((npol, nf, time_steps, npairs), dtype=np.complex64)  # Cross-correlations
-    uvwarray = np.zeros((3, time_steps, npairs), dtype=float)
-    chan_band = ipe.get_band(sfreq=sfreq, sdf=sdf, date=Time(uv['time'], format='jd'))
+    out = idb['data']  # Cross-correlations
+    flag = idb['flag']
+    uvwarray = idb['uvw']
+    nf = out.shape[1]
+    chan_band = idb['chan_band']
     nband = len(chan_band)
 
-    uv.rewind()
-    l = -1
-    for preamble, data in uv.all():
-        uvw, t, (i0, j0) = preamble
-        i = antlist.index(i0 + 1)
-        j = antlist.index(j0 + 1)
-        if i > j:
-            # Reverse order of indices
-            j = antlist.index(i0 + 1)
-            i = antlist.index(j0 + 1)
-        # Assumes uv['pol'] is one of -5, -6, -7, -8
-        k = -5 - uv['pol']
-        l += 1
-        mask0 = data.mask
-        data = ma.masked_array(ma.masked_invalid(data), fill_value=0.0)
-        try:
-            tidx = np.where(np.abs(timesjd - t) < inttimed)[0][0]
-        except:
-            tidx = l / (npairs * npol)
-        out[k, :, tidx, bl2ord[i0, j0]] = data.data
-        flag[k, :, tidx, bl2ord[i0, j0]] = np.logical_or(data.mask, mask0)
-        # if i != j:
-        if k == 3:
-            uvwarray[:, tidx, bl2ord[i0, j0]] = -uvw * constants.speed_of_light / 1e9
-
     nrows = time_steps * npairs
     if doscaling:
+        ## normalize the cross-correlations of baseline i-j by sqrt(|auto_i| * |auto_j|)
+        blidx, ant1, ant2 = ipe.bl_scaling_index(antlist, bl2ord)
+        autoidx = np.diag(bl2ord)
         out2 = out.copy()
-        for i0 in antlist:
-            for j0 in antlist:
-                if i0 < j0:
-                    i, j = i0 - 1, j0 - 1
-                    out2[:, :, :, bl2ord[i, j]] = out[:, :, :, bl2ord[i, j]] / np.sqrt(
-                        np.abs(out[:, :, :, bl2ord[i, i]]) * np.abs(out[:, :, :, bl2ord[j, j]]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            autoamp = np.sqrt(np.abs(out[:, :, :, autoidx]))
+            out2[:, :, :, blidx] /= autoamp[:, :, :, ant1] * autoamp[:, :, :, ant2]
+        del autoamp
         out2 = out2.reshape(npol, nf, nrows)
-        out2[np.isnan(out2)] = 0
-        out2[np.isinf(out2)] = 0
+        out2[~np.isfinite(out2)] = 0
     # out2 = ma.masked_array(ma.masked_invalid(out2), fill_value=0.0)
     out = out.reshape(npol, nf, nrows) * 1e4
     flag = flag.reshape(npol, nf, nrows)
@@ -286,7 +253,7 @@ def importeovsa_iter(filelist, timebin, width, visprefix, nocreatms, modelms, do
     casalog.post('IDB File {0} is readed in --- {1:10.2f} seconds ---'.format(filename, (time.time() - time0)))
 
     if not nocreatms:
-        modelms = ipe.creatms(filename, visprefix)
+        modelms = ipe.creatms(filename, visprefix, idb=idb)
         os.system('mv {} {}'.format(modelms, msname))
     else:
         casalog.post('----------------------------------------')
@@ -300,16 +267,9 @@ def importeovsa_iter(filelist, timebin, width, visprefix, nocreatms, modelms, do
     casalog.post('----------------------------------------')
     casalog.post("Updating the main table of {}".format(msname))
     casalog.post('----------------------------------------')
-    for l, cband in enumerate(chan_band):
-        time1 = time.time()
-        # nchannels = len(cband['cidx'])
-        for row in range(nrows):
-            if not doscaling or keep_nsclms:
-                datacell = out[:, cband['cidx'][0]:cband['cidx'][-1] + 1, row]
-                rownr = int(row + l * nrows)
-                tb.putcell('DATA', rownr, datacell)
-            tb.putcell('FLAG', rownr, flag[:, cband['cidx'][0]:cband['cidx'][-1] + 1, row])
-        casalog.post('---spw {0:02d} is updated in --- {1:10.2f} seconds ---'.format((l + 1), time.time() - time1))
+    if not doscaling or keep_nsclms:
+        putcol_bands(tb, 'DATA', out, chan_band, nrows, maxchunkmb=maxchunkmb)
+    putcol_bands(tb, 'FLAG', flag, chan_band, nrows, maxchunkmb=maxchunkmb)
     tb.putcol('UVW', uvwarray)
     tb.putcol('SIGMA', sigma)
     tb.putcol('WEIGHT', 1.0 / sigma ** 2)
@@ -417,12 +377,7 @@ def importeovsa_iter(filelist, timebin, width, visprefix, nocreatms, modelms, do
         casalog.post('----------------------------------------')
         casalog.post("Updating the main table of {}".format(msname_scl))
         casalog.post('----------------------------------------')
-        for l, cband in enumerate(chan_band):
-            time1 = time.time()
-            for row in range(nrows):
-                rownr = int(row + l * nrows)
-                tb.putcell('DATA', rownr, out2[:, cband['cidx'][0]:cband['cidx'][-1] + 1, row])
-            casalog.post('---spw {0:02d} is updated in --- {1:10.2f} seconds ---'.format((l + 1), time.time() - time1))
+        putcol_bands(tb, 'DATA', out2, chan_band, nrows, maxchunkmb=maxchunkmb)
         tb.close()
 
     if not (timebin == '0s' and width == 1):
@@ -447,9 +402,110 @@ def importeovsa_iter(filelist, timebin, width, visprefix, nocreatms, modelms, do
         return [True, msfile, durtim]
 
 
+def udb_corr_iter(udbcorr_path, filename):
+    '''Apply udb_corr to one IDB file. Returns the name of the corrected file, or None if the correction failed.'''
+    from eovsapy.pipeline_cal import udb_corr
+    try:
+        return udb_corr(filename, outpath='{}/'.format(udbcorr_path), calibrate=True, desat=True)
+    except:
+        return None
+
+
+def importeovsa_pipeline(filelist, ncpu, timebin, width, visprefix, nocreatms, modelms, doscaling, keep_nsclms,
+                         udbcorr_path=None, nqueue=None, maxchunkmb=256):
+    '''Import IDB files with a staged pipeline: udb_corr workers feed importeovsa_iter workers, so that the
+       import of the corrected files overlaps with the correction of the rest.
+       Required inputs:
+       filelist - list of IDB files
+       ncpu - total number of worker processes shared by the udb_corr and import stages
+       Optional inputs:
+       udbcorr_path - if provided, apply udb_corr to the files and write the corrected files to this path
+       nqueue - maximum number of files in flight between the udb_corr and the import stages. Default is 2 * ncpu
+       maxchunkmb - upper limit (in MB) of the data block written to the MS with each column-level put
+       Returns:
+       res - list of the importeovsa_iter results in the order of filelist, with None for files failed in udb_corr
+       firstfile - name of the first file that was imported (after udb_corr)
+    '''
+    import multiprocessing as mprocs
+    import queue
+
+    nfile = len(filelist)
+    if udbcorr_path:
+        ncorr = max(1, ncpu // 2)
+        corrpool = mprocs.Pool(ncorr)
+    else:
+        ncorr = 0
+        corrpool = None
+    nimp = max(1, ncpu - ncorr)
+    imppool = mprocs.Pool(nimp)
+    if not nqueue:
+        nqueue = 2 * ncpu
+
+    ## the workers report (stage, file index, result, exception) here as soon as a job finishes
+    finished = queue.Queue()
+    inflight = {}
+
+    def submit(pool, stage, fidx, func, args):
+        pool.apply_async(func, args, callback=lambda r: finished.put((stage, fidx, r, None)),
+                         error_callback=lambda e: finished.put((stage, fidx, None, e)))
+        inflight[fidx] = stage
+
+    corrfiles = {}
+    res = [None] * nfile
+    done = [False] * nfile
+    nextcorr = 0
+    firstfile = None
+
+    try:
+        while not all(done):
+            ## stage 1: keep at most nqueue files in flight between udb_corr and the import
+            while nextcorr < nfile and len(inflight) + len(corrfiles) < nqueue:
+                if corrpool:
+                    submit(corrpool, 'udb_corr', nextcorr, udb_corr_iter, (udbcorr_path, filelist[nextcorr]))
+                else:
+                    corrfiles[nextcorr] = filelist[nextcorr]
+                nextcorr += 1
+
+            ## the first file in order determines the name of the concatenated MS and the standard MS
+            if firstfile is None:
+                fidx = done.index(False)
+                if fidx in corrfiles:
+                    firstfile = corrfiles[fidx]
+                    if nocreatms and not (modelms and os.path.exists(modelms)):
+                        modelms = ipe.creatms(firstfile, visprefix)
+
+            ## stage 2: import the corrected files
+            if firstfile is not None:
+                for fidx in sorted(corrfiles.keys()):
+                    submit(imppool, 'import', fidx, importeovsa_iter, (
+                        [corrfiles.pop(fidx)], timebin, width, visprefix, nocreatms, modelms, doscaling,
+                        keep_nsclms, 0, maxchunkmb))
+
+            ## wait for the next job to finish
+            stage, fidx, result, error = finished.get()
+            del inflight[fidx]
+            if error is not None:
+                raise error
+            if stage == 'udb_corr':
+                if result is None:
+                    casalog.post("Warning: udb_corr failed on {}.".format(filelist[fidx]))
+                    done[fidx] = True
+                else:
+                    corrfiles[fidx] = result
+            else:
+                res[fidx] = result
+                done[fidx] = True
+    finally:
+        for pool in [corrpool, imppool]:
+            if pool:
+                pool.close()
+                pool.join()
+    return res, firstfile
+
+
 def importeovsa(idbfiles=None, ncpu=None, timebin=None, width=None, visprefix=None, udb_corr=True, nocreatms=None,
                 doconcat=None, modelms=None,
-                doscaling=False, keep_nsclms=False, use_exist_udbcorr=False):
+                doscaling=False, keep_nsclms=False, use_exist_udbcorr=False, nqueue=0, maxchunkmb=256):
     casalog.origin('importeovsa')
 
     if type(idbfiles) == Time:
@@ -491,52 +547,51 @@ def importeovsa(idbfiles=None, ncpu=None, timebin=None, width=None, visprefix=No
         width = 1
 
     if udb_corr:
-        from eovsapy.pipeline_cal import udb_corr
         udbcorr_path = visprefix + '/tmp_UDBcorr/'
         if not os.path.exists(udbcorr_path):
             os.makedirs(udbcorr_path)
-        filelist_tmp = []
-        for ll in filelist:
-            try:
-                filelist_tmp.append(udb_corr(ll, outpath='{}/'.format(udbcorr_path), calibrate=True, desat=True))
-            except:
-                pass
-
-        if filelist_tmp == []:
-            raise ValueError('udb_corr failed to return any results. Please check your calibration.')
-        else:
-            filelist = filelist_tmp
-        # filelist = udb_corr_external(filelist, udbcorr_path, use_exist_udbcorr)
-
-    if not modelms:
-        if nocreatms:
-            filename = filelist[0]
-            modelms = ipe.creatms(filename, visprefix)
     else:
-        if not os.path.exists(modelms):
-            if nocreatms:
-                filename = filelist[0]
-                modelms = ipe.creatms(filename, visprefix)
-
-    iterable = range(len(filelist))
+        udbcorr_path = None
 
     t0 = time.time()
     casalog.post('Perform importeovsa in parallel with {} CPUs...'.format(ncpu))
 
-    if ncpu == 1:
+    if ncpu > 1:
+        ## udb_corr and import run as overlapping stages
+        res, firstfile = importeovsa_pipeline(filelist, ncpu, timebin, width, visprefix, nocreatms, modelms,
+                                              doscaling, keep_nsclms, udbcorr_path=udbcorr_path, nqueue=nqueue,
+                                              maxchunkmb=maxchunkmb)
+        if firstfile is None:
+            raise ValueError('udb_corr failed to return any results. Please check your calibration.')
+        res = [r for r in res if r is not None]
+    else:
+        if udb_corr:
+            filelist_tmp = []
+            for ll in filelist:
+                fcorr = udb_corr_iter(udbcorr_path, ll)
+                if fcorr is not None:
+                    filelist_tmp.append(fcorr)
+
+            if filelist_tmp == []:
+                raise ValueError('udb_corr failed to return any results. Please check your calibration.')
+            else:
+                filelist = filelist_tmp
+            # filelist = udb_corr_external(filelist, udbcorr_path, use_exist_udbcorr)
+        firstfile = filelist[0]
+
+        if not modelms:
+            if nocreatms:
+                modelms = ipe.creatms(firstfile, visprefix)
+        else:
+            if not os.path.exists(modelms):
+                if nocreatms:
+                    modelms = ipe.creatms(firstfile, visprefix)
+
         res = []
         for fidx, ll in enumerate(filelist):
             res.append(
-                importeovsa_iter(filelist, timebin, width, visprefix, nocreatms, modelms, doscaling, keep_nsclms, fidx))
-    if ncpu > 1:
-        import multiprocessing as mprocs
-        from functools import partial
-        imppart = partial(importeovsa_iter, filelist, timebin, width, visprefix, nocreatms, modelms, doscaling,
-                          keep_nsclms)
-        pool = mprocs.Pool(ncpu)
-        res = pool.map(imppart, iterable)
-        pool.close()
-        pool.join()
+                importeovsa_iter(filelist, timebin, width, visprefix, nocreatms, modelms, doscaling, keep_nsclms, fidx,
+                                 maxchunkmb))
 
     # print res
     t1 = time.time()
@@ -571,8 +626,7 @@ def importeovsa(idbfiles=None, ncpu=None, timebin=None, width=None, visprefix=No
         os.system('rm -rf {}'.format(udbcorr_path))
 
     if doconcat:
-        from suncasa.suncasatasks.private import task_concateovsa as ce
-        msname = os.path.basename(filelist[0])
+        msname = os.path.basename(firstfile)
         durtim = int(np.array(results['durtim']).sum())
         if doscaling:
             msfiles = list(np.array(results['msfile_scl'])[np.where(np.array(results['succeeded']) == True)])
@@ -583,6 +637,7 @@ def importeovsa(idbfiles=None, ncpu=None, timebin=None, width=None, visprefix=No
         else:
             msfiles = list(np.array(results['msfile'])[np.where(np.array(results['succeeded']) == True)])
             concatvis = visprefix + msname + '-{:d}m{}.ms'.format(durtim, '')
+        ## concatenate once: the post-processing of concateovsa assumes measurement sets fresh from the import
         ce.concateovsa(msfiles, concatvis, datacolumn='data', keep_orig_ms=True, cols2rm="model,corrected")
         return concatvis
     else:
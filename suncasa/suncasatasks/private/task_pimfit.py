@@ -1,8 +1,10 @@
 import os
+import numpy as np
 from time import time
 import multiprocessing as mprocs
 from suncasa.utils import DButil
 from suncasa.utils import helioimage2fits as hf
+from suncasa.io import fittable
 
 from ...casa_compat import import_casatools, import_casatasks
 tasks = import_casatasks('split','tclean','gencal','clearcal','applycal','flagdata','casalog','bandpass')
@@ -19,13 +21,24 @@ tools = import_casatools(['iatool', 'rgtool'])
 
 iatool = tools['iatool']
 rgtool = tools['rgtool']
-myia = iatool()
-myrg = rgtool()
+
+## tools of a worker process, created once by init_worker when the process starts
+_worker = {}
+
+
+def init_worker():
+    _worker['ia'] = iatool()
+    _worker['rg'] = rgtool()
+
 
 def imfit_iter(imgfiles, doreg, tims, msinfofile, ephem, box, region, chans, stokes, mask, includepix, excludepix,
                residual, model, estimates, logfile, append, newestimates, complist,
                overwrite, dooff, offset, fixoffset, stretch, rms, noisefwhm, summary,
                imidx):
+    if not _worker:
+        init_worker()
+    myia = _worker['ia']
+    myrg = _worker['rg']
     try:
         from astropy.io import fits as pyfits
     except:
@@ -58,7 +71,7 @@ def imfit_iter(imgfiles, doreg, tims, msinfofile, ephem, box, region, chans, sto
             raise Exception("Cannot create image analysis tool using " + img)
         print('Processing image: ' + img)
         hdr = pyfits.getheader(img)
-        pols = DButil.polsfromfitsheader(hdr)
+        pols = list(DButil.polsfromfitsheader(hdr))
         ndx, ndy, nchans, npols = myia.shape()
         results = {}
         for itpp in pols:
@@ -88,10 +101,22 @@ def imfit_iter(imgfiles, doreg, tims, msinfofile, ephem, box, region, chans, sto
         myia.done()
 
 
+def imfit_rows(imfit_part, imidx):
+    """
+    Runs imfit_iter on the image imidx and returns its results as rows of a fit table (see `suncasa.io.fittable`)
+    instead of the nested dictionary.
+    """
+    res = imfit_part(imidx)
+    if res is None:
+        return [False, '', '', fittable.fit_rows('', '', {})]
+    succeeded, timstr, img, results = res
+    return [succeeded, timstr, img, fittable.fit_rows(timstr, img, results, gaussfit=True)]
+
+
 def pimfit(imagefiles, ncpu, doreg, timestamps, msinfofile, ephemfile, box, region, chans, stokes, mask, includepix,
            excludepix,
            residual, model, estimates, logfile, append, newestimates, complist,
-           overwrite, dooff, offset, fixoffset, stretch, rms, noisefwhm, summary):
+           overwrite, dooff, offset, fixoffset, stretch, rms, noisefwhm, summary, outfile='', chunksize=0):
     from functools import partial
     import pdb
     # check if imagefiles is a single file or a list of files
@@ -129,11 +154,20 @@ def pimfit(imagefiles, ncpu, doreg, timestamps, msinfofile, ephemfile, box, regi
             casalog.post(img + 'does not exist. Skipping this one...')
 
     iterable = range(len(imgfiles))
-    res = []
 
     if not (type(ncpu) is int):
         casalog.post('ncpu should be an integer')
-        ncpu = 8
+        ncpu = 0
+    if ncpu <= 0:
+        ## use all the cores available to this process
+        if hasattr(os, 'sched_getaffinity'):
+            ncpu = len(os.sched_getaffinity(0))
+        else:
+            ncpu = mprocs.cpu_count()
+    ncpu = max(1, min(ncpu, len(imgfiles)))
+    ## images are sent to the workers in chunks, small enough for the results to stream back steadily
+    if not chunksize:
+        chunksize = int(max(1, min(64, np.ceil(len(imgfiles) / (4. * ncpu)))))
 
     # partition
     imfit_part = partial(imfit_iter, imgfiles, doreg, tims, msinfofile, ephem, box, region, chans, stokes, mask,
@@ -141,30 +175,50 @@ def pimfit(imagefiles, ncpu, doreg, timestamps, msinfofile, ephemfile, box, regi
                          residual, model, estimates, logfile, append, newestimates, complist, \
                          overwrite, dooff, offset, fixoffset, stretch, rms, noisefwhm, summary)
 
+    ## with outfile, the workers return the results as rows of a columnar table, which are appended to outfile as
+    ## they arrive instead of being collected as nested dictionaries
+    if outfile:
+        fit_part = partial(imfit_rows, imfit_part)
+        writer = fittable.FitTableWriter(outfile)
+    else:
+        fit_part = imfit_part
+        writer = None
+
     # parallelization
-    para = 1
+    para = ncpu > 1
     timelapse = 0
     t0 = time()
     if para:
         casalog.post('Perform imfit in parallel ...')
-        pool = mprocs.Pool(ncpu)
-        # res = pool.map_async(imfit_part, iterable)
-        res = pool.map(imfit_part, iterable)
-        pool.close()
-        pool.join()
+        pool = mprocs.Pool(ncpu, initializer=init_worker)
+        resiter = pool.imap(fit_part, iterable, chunksize)
     else:
-        for i in iterable:
-            res.append(imfit_part(i))
+        resiter = (fit_part(i) for i in iterable)
 
-    t1 = time()
-    timelapse = t1 - t0
-    print('It took %f secs to complete' % timelapse)
     # repackage this into a single dictionary
     results = {'succeeded': [], 'timestamps': [], 'imagenames': [], 'outputs': []}
-    for r in res:
-        results['succeeded'].append(r[0])
-        results['timestamps'].append(r[1])
-        results['imagenames'].append(r[2])
-        results['outputs'].append(r[3])
+    try:
+        for r in resiter:
+            results['succeeded'].append(r[0])
+            results['timestamps'].append(r[1])
+            results['imagenames'].append(r[2])
+            if writer is not None:
+                writer.append(r[3])
+            else:
+                results['outputs'].append(r[3])
+        if para:
+            pool.close()
+    finally:
+        if para:
+            pool.terminate()
+            pool.join()
+        if writer is not None:
+            writer.close()
+    if writer is not None:
+        del results['outputs']
+        results['outfile'] = outfile
 
+    t1 = time()
+    timelapse = t1 - t0
+    print('It took %f secs to complete' % timelapse)
     return results
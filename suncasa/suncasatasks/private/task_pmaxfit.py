@@ -13,9 +13,56 @@ tools = import_casatools(['iatool', 'rgtool'])
 iatool = tools['iatool']
 rgtool = tools['rgtool']
 
+## pixel coordinates along x and y, cached by the shape of the image (box)
+_pixgrids = {}
+
+
+def pixel_grids(ny, nx):
+    if (ny, nx) not in _pixgrids:
+        _pixgrids[(ny, nx)] = (np.arange(nx, dtype=float), np.arange(ny, dtype=float))
+    return _pixgrids[(ny, nx)]
+
+
+def centroids(data, thresh=0.5):
+    """
+    Computes the peak and the intensity-weighted moments of the pixels above thresh * peak, for all planes of
+    an image cube at once. NaNs are ignored.
+    data -- image cube in the shape of (npol, nchan, ny, nx)
+    Returns a dictionary of arrays in the shape of (npol, nchan): the peak, the centroid (xc, yc) and second
+    moments (xx, yy, xy) in pixels, and the number of pixels above the threshold (npix).
+    """
+    data = np.asarray(data, dtype=float)
+    ny, nx = data.shape[-2:]
+    x, y = pixel_grids(ny, nx)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        peak = np.nanmax(data, axis=(-2, -1))
+        inmask = data >= thresh * peak[..., None, None]
+        w = np.where(inmask, data, 0.)
+        tot = w.sum(axis=(-2, -1))
+        wx = w.sum(axis=-2)
+        wy = w.sum(axis=-1)
+        xc = (wx * x).sum(axis=-1) / tot
+        yc = (wy * y).sum(axis=-1) / tot
+        xx = (wx * x ** 2).sum(axis=-1) / tot - xc ** 2
+        yy = (wy * y ** 2).sum(axis=-1) / tot - yc ** 2
+        xy = np.einsum('...ij,i,j->...', w, y, x) / tot - xc * yc
+    return {'peak': peak, 'xc': xc, 'yc': yc, 'xx': xx, 'yy': yy, 'xy': xy, 'npix': inmask.sum(axis=(-2, -1))}
+
+
+## tools of a worker process, created once by init_worker when the process starts
+_worker = {}
+
+
+def init_worker():
+    _worker['ia'] = iatool()
+    _worker['rg'] = rgtool()
+
+
 def maxfit_iter(imgfiles, box, width, imidx):
-    myia = iatool()
-    myrg = rgtool()
+    if not _worker:
+        init_worker()
+    myia = _worker['ia']
+    myrg = _worker['rg']
     try:
         from astropy.io import fits as pyfits
     except:
@@ -29,10 +76,8 @@ def maxfit_iter(imgfiles, box, width, imidx):
         if (not myia.open(img)):
             raise Exception("Cannot create image analysis tool using " + img)
         print('Processing image: ' + img)
-        hdulist = pyfits.open(img)
-        hdu = hdulist[0]
         hdr = pyfits.getheader(img)
-        pols = DButil.polsfromfitsheader(hdr)
+        pols = list(DButil.polsfromfitsheader(hdr))
         freqs = DButil.freqsfromfitsheader(hdr)
         ndx, ndy, nchans, npols = myia.shape()
         blc, trc = [0, 0], [ndx, ndy]
@@ -41,23 +86,24 @@ def maxfit_iter(imgfiles, box, width, imidx):
                 blc[0], blc[1], trc[0], trc[1] = [int(ll) for ll in box.split(',')]
         if 'width' not in locals():
             width = 5
+        ## read the box once and get the centroids of all channels and polarizations in one pass
+        with pyfits.open(img) as hdulist:
+            cube = hdulist[0].data[:, :, blc[1]:trc[1] + 1, blc[0]:trc[0] + 1]
+        cents = centroids(cube, thresh=0.5)
         results = {}
         for itpp in pols:
             results[itpp] = {'results': {}, 'converged': []}
         for ll in range(nchans):
             for pp, itpp in enumerate(pols):
-                imgdata = hdu.data[pp, ll, blc[1]:trc[1] + 1, blc[0]:trc[0] + 1]
-                imgdata = np.ma.masked_less(imgdata, 0.5 * np.nanmax(imgdata))
-                ny, nx = imgdata.shape
-                XX, YY = np.meshgrid(np.arange(nx), np.arange(ny))
-                imgdata_avg = imgdata.mean()
-                wx, wy = (XX * imgdata).mean() / imgdata_avg, (YY * imgdata).mean() / imgdata_avg
+                wx, wy = cents['xc'][pp, ll], cents['yc'][pp, ll]
                 comp = 'component{}'.format(ll)
                 r = myrg.box(blc=[blc[0], blc[1], ll, pp], trc=[trc[0], trc[1], ll, pp])
                 iachan = myia.subimage(region=r, dropdeg=True)
                 try:
                     result_dict = iachan.maxfit(point=True, negfind=False, width = width)
                     result_dict['component0']['centroid'] = iachan.toworld([wx, wy], 'm')['measure']
+                    result_dict['component0']['moments'] = {k: float(cents[k][pp, ll]) for k in
+                                                             ['xx', 'yy', 'xy', 'npix']}
                     result_dict['component0']['converged'] = True
                     result_dict['component0']['flux']['polarisation'] = itpp
                     result_dict['component0']['spectrum']['frequency']['m0']['value'] = float(freqs[ll])
@@ -65,7 +111,9 @@ def maxfit_iter(imgfiles, box, width, imidx):
                     results[itpp]['converged'].append(True)
                 except:
                     results[itpp]['converged'].append(False)
-        results[itpp]['results']['nelements'] = results[itpp]['results'].keys()
+                finally:
+                    iachan.done()
+        results[itpp]['results']['nelements'] = list(results[itpp]['results'].keys())
         # update timestamp
         timstr = hdr['date-obs']
         return [True, timstr, img, results]
@@ -77,7 +125,7 @@ def maxfit_iter(imgfiles, box, width, imidx):
         myia.done()
 
 
-def pmaxfit(imagefiles, ncpu, box, width):
+def pmaxfit(imagefiles, ncpu, box, width, chunksize=0):
     from functools import partial
     # check if imagefiles is a single file or a list of files
 
@@ -95,39 +143,51 @@ def pmaxfit(imagefiles, ncpu, box, width):
             casalog.post(img + 'does not exist. Skipping this one...')
 
     iterable = range(len(imgfiles))
-    res = []
 
     if not (type(ncpu) is int):
         casalog.post('ncpu should be an integer')
-        ncpu = 8
+        ncpu = 0
+    if ncpu <= 0:
+        ## use all the cores available to this process
+        if hasattr(os, 'sched_getaffinity'):
+            ncpu = len(os.sched_getaffinity(0))
+        else:
+            ncpu = mprocs.cpu_count()
+    ncpu = max(1, min(ncpu, len(imgfiles)))
+    ## images are sent to the workers in chunks, small enough for the results to stream back steadily
+    if not chunksize:
+        chunksize = int(max(1, min(64, np.ceil(len(imgfiles) / (4. * ncpu)))))
 
     # partition
     maxfit_part = partial(maxfit_iter, imgfiles, box, width)
 
     # parallelization
-    para = 1
+    para = ncpu > 1
     timelapse = 0
     t0 = time()
     if para:
         casalog.post('Perform maxfit in parallel ...')
-        pool = mprocs.Pool(ncpu)
-        # res = pool.map_async(maxfit_part, iterable)
-        res = pool.map(maxfit_part, iterable)
-        pool.close()
-        pool.join()
+        pool = mprocs.Pool(ncpu, initializer=init_worker)
+        resiter = pool.imap(maxfit_part, iterable, chunksize)
     else:
-        for i in iterable:
-            res.append(maxfit_part(i))
+        resiter = (maxfit_part(i) for i in iterable)
 
-    t1 = time()
-    timelapse = t1 - t0
-    print('It took %f secs to complete' % timelapse)
     # repackage this into a single dictionary
     results = {'succeeded': [], 'timestamps': [], 'imagenames': [], 'outputs': []}
-    for r in res:
-        results['succeeded'].append(r[0])
-        results['timestamps'].append(r[1])
-        results['imagenames'].append(r[2])
-        results['outputs'].append(r[3])
+    try:
+        for r in resiter:
+            results['succeeded'].append(r[0])
+            results['timestamps'].append(r[1])
+            results['imagenames'].append(r[2])
+            results['outputs'].append(r[3])
+        if para:
+            pool.close()
+    finally:
+        if para:
+            pool.terminate()
+            pool.join()
 
+    t1 = time()
+    timelapse = t1 - t0
+    print('It took %f secs to complete' % timelapse)
     return results
@@ -6,6 +6,8 @@ from time import time
 from astropy.time import Time
 import glob
 import sys
+import json
+import tempfile
 from ...utils import helioimage2fits as hf
 from ...casa_compat import import_casatools, import_casatasks
 
@@ -14,37 +16,70 @@ split = tasks.get('split')
 tclean = tasks.get('tclean')
 casalog = tasks.get('casalog')
 
-tools = import_casatools(['tbtool', 'mstool', 'qatool'])
+tools = import_casatools(['tbtool', 'mstool', 'qatool', 'msmdtool'])
 tbtool = tools['tbtool']
 mstool = tools['mstool']
 qatool = tools['qatool']
+msmdtool = tools['msmdtool']
 tb = tbtool()
 ms = mstool()
 qa = qatool()
+msmd = msmdtool()
 
 c_external = False
 
 
-def clean_iter(tim, vis, imageprefix, imagesuffix,
-               twidth, doreg, docompress, usephacenter, reftime, ephem, msinfo, toTb, sclfactor, subregion, overwrite,
-               selectdata, field, spw, timerange, uvrange, antenna, scan, observation, intent, datacolumn,
-               imagename, imsize, cell, phasecenter, stokes, projection, startmodel, specmode, reffreq, nchan,
-               start,
-               width, outframe, veltype, restfreq, interpolation, perchanweightdensity, gridder, facets,
-               psfphasecenter,
-               wprojplanes, vptable, mosweight, aterm, psterm, wbawp, conjbeams, cfcache, usepointing,
-               computepastep,
-               rotatepastep, pointingoffsetsigdev, pblimit, normtype, deconvolver, scales, nterms,
-               smallscalebias,
-               restoration, restoringbeam, pbcor, outlierfile, weighting, robust, noise, npixels, uvtaper, niter,
-               gain,
-               threshold, nsigma, cycleniter, cyclefactor, minpsffraction, maxpsffraction, interactive, usemask,
-               mask,
-               pbmask, sidelobethreshold, noisethreshold, lownoisethreshold, negativethreshold, smoothfactor,
-               minbeamfrac,
-               cutthreshold, growiterations, dogrowprune, minpercentchange, verbose, fastnoise, restart,
-               savemodel,
-               calcres, calcpsf, psfcutoff, parallel, btidx):
+def ms_mtime(vis):
+    """
+    Returns the latest modification time of the files of the main table of vis.
+    """
+    return max([os.path.getmtime(f) for f in glob.glob(os.path.join(vis, 'table.*'))], default=0.)
+
+
+def get_times(vis, cache=True):
+    """
+    Returns the unique integration times (in MJD seconds) of vis from the metadata of the MS, without reading
+    the visibilities.
+
+    As with ms.selectinit(), only the first data description is used. The times are taken from msmetadata, or from
+    a unique scan of the TIME column if msmetadata fails. If cache is True, they are saved next to the MS as
+    <vis>.times.npz and reused until the MS is modified.
+    """
+    vis = vis.rstrip('/')
+    cachefile = vis + '.times.npz'
+    if cache and os.path.exists(cachefile):
+        try:
+            with np.load(cachefile) as f:
+                if float(f['mtime']) == ms_mtime(vis):
+                    return f['tim']
+        except (IOError, OSError, ValueError, KeyError):
+            pass
+    try:
+        msmd.open(vis)
+        tim = np.unique(msmd.timesforspws(msmd.spwfordatadesc(0)))
+        msmd.done()
+    except Exception:
+        msmd.done()
+        tb.open(vis)
+        subtb = tb.query('DATA_DESC_ID==0', columns='TIME')
+        tim = np.unique(subtb.getcol('TIME'))
+        subtb.close()
+        tb.close()
+    if cache:
+        try:
+            tmpfile = '{}.{}.tmp.npz'.format(vis + '.times', os.getpid())
+            np.savez(tmpfile, tim=tim, mtime=ms_mtime(vis))
+            os.replace(tmpfile, cachefile)
+        except (IOError, OSError):
+            casalog.post('can not write the time cache {}'.format(cachefile))
+    return tim
+
+
+def slice_times(tim, twidth, btidx):
+    """
+    Returns the timerange (in CASA format) and the begin and end times (in FITS format) of the time slice that
+    starts at the time pixel btidx and spans twidth time pixels.
+    """
     bt = btidx  # 0
     if bt + twidth < len(tim) - 1:
         et = btidx + twidth - 1
@@ -64,48 +99,288 @@ def clean_iter(tim, vis, imageprefix, imagesuffix,
                 qa.time(qa.quantity(et_d, 's'), prec=9, form='ymd')[0]
     btstr = qa.time(qa.quantity(bt_d, 's'), prec=9, form='fits')[0]
     etstr = qa.time(qa.quantity(et_d, 's'), prec=9, form='fits')[0]
+    return timerange, btstr, etstr
+
+
+def slice_imname(imageprefix, imagesuffix, btstr):
+    """
+    Returns the image name of the time slice that begins at btstr.
+    """
+    return imageprefix + btstr.replace(':', '').replace('-', '') + imagesuffix
+
+
+def uv_sampling(vis, timerange, spw='', field='', uvrange='', antenna='', scan='', observation='', intent='',
+                phasecenter=''):
+    """
+    Returns the uv sampling of a time slice: the antennas, uvw coordinates (m), flags, and weights of the selected
+    rows, and the phase direction of the image, or None if they can not be read (e.g., the selected spectral
+    windows have different shapes).
+
+    The phase direction is phasecenter if it is a direction. Otherwise (phasecenter is empty or a field id) it is
+    the PHASE_DIR of the field(s) at the mid time of the slice, as [ra, dec] (rad), which follows the ephemeris
+    attached to the field, if any.
+    """
+    staql = {'time': timerange, 'spw': spw, 'field': field, 'uvdist': uvrange, 'baseline': antenna, 'scan': scan,
+             'observation': observation, 'scanintent': intent}
+    try:
+        ms.open(vis)
+        ms.msselect({k: v for k, v in staql.items() if v})
+        uvsamp = ms.getdata(['antenna1', 'antenna2', 'uvw', 'flag', 'weight', 'field_id', 'time'])
+        if isinstance(phasecenter, int) or str(phasecenter).strip().isdigit():
+            fieldids = [int(phasecenter)]
+        elif phasecenter:
+            fieldids = []
+            uvsamp['phasedir'] = str(phasecenter).strip()
+        else:
+            fieldids = np.unique(uvsamp['field_id'])
+        if len(fieldids) > 0:
+            tmid = (np.min(uvsamp['time']) + np.max(uvsamp['time'])) / 2.
+            phasedir = []
+            for fieldid in fieldids:
+                dir = ms.getfielddirmeas('PHASE_DIR', int(fieldid), tmid)
+                phasedir.append([dir['m0']['value'], dir['m1']['value']])
+            uvsamp['phasedir'] = np.array(phasedir)
+        del uvsamp['field_id'], uvsamp['time']
+        ms.close()
+    except Exception:
+        ms.close()
+        return None
+    if 'phasedir' not in uvsamp:
+        return None
+    return uvsamp
+
+
+def uv_tolerance(vis, imsize, cell, psftol=0.1):
+    """
+    Returns the largest change of the uvw coordinates (m) for which two time slices are considered to have the
+    same uv sampling: psftol of a uv cell (1 / field of view) at the highest frequency of vis.
+    """
+    tb.open(vis + '/SPECTRAL_WINDOW')
+    fmax = max([np.max(f) for f in tb.getvarcol('CHAN_FREQ').values()])
+    tb.close()
+    imsize = list(np.atleast_1d(imsize))
+    cell = cell if isinstance(cell, (list, tuple)) else [cell]
+    if len(cell) == 1:
+        cell = cell * len(imsize)
+    fov = max([n * qa.convert(qa.quantity(c), 'rad')['value'] for n, c in zip(imsize, cell)])
+    return psftol * 2.99792458e8 / fmax / fov
+
+
+def dir_tolerance(cell, psftol=0.1):
+    """
+    Returns the largest change of the phase direction (rad) for which two time slices are considered to have the
+    same image coordinates: psftol of the image cell.
+    """
+    cell = cell if isinstance(cell, (list, tuple)) else [cell]
+    return psftol * min([qa.convert(qa.quantity(c), 'rad')['value'] for c in cell])
+
+
+def same_uv_sampling(uvsamp0, uvsamp, tol, dirtol=0.):
+    """
+    Returns True if the uv sampling uvsamp matches uvsamp0 within the uvw tolerance tol (m), with the same rows,
+    flags, and weights, and the same phase direction within dirtol (rad).
+    """
+    if uvsamp0 is None or uvsamp is None:
+        return False
+    phasedir0, phasedir = uvsamp0['phasedir'], uvsamp['phasedir']
+    if isinstance(phasedir0, str) or isinstance(phasedir, str):
+        if not (isinstance(phasedir0, str) and isinstance(phasedir, str) and phasedir0 == phasedir):
+            return False
+    else:
+        if phasedir0.shape != phasedir.shape:
+            return False
+        dra = np.angle(np.exp(1j * (phasedir0[:, 0] - phasedir[:, 0]))) * np.cos(phasedir[:, 1])
+        ddec = phasedir0[:, 1] - phasedir[:, 1]
+        if np.max(np.hypot(dra, ddec), initial=0.) > dirtol:
+            return False
+    for k in ['antenna1', 'antenna2', 'flag']:
+        if uvsamp0[k].shape != uvsamp[k].shape or not np.array_equal(uvsamp0[k], uvsamp[k]):
+            return False
+    if uvsamp0['weight'].shape != uvsamp['weight'].shape or \
+            not np.allclose(uvsamp0['weight'], uvsamp['weight'], rtol=1e-3, atol=0):
+        return False
+    return np.max(np.abs(uvsamp0['uvw'] - uvsamp['uvw']), initial=0.) <= tol
+
+
+def remove_products(imname):
+    """
+    Removes the images and files whose names start with imname.
+    """
+    for f in glob.glob(imname + '*'):
+        if os.path.isdir(f):
+            shutil.rmtree(f)
+        else:
+            os.remove(f)
+
+
+def read_manifest(manifest):
+    """
+    Returns the job manifest of a previous ptclean6 run, or None if it does not exist or is unreadable.
+    """
+    try:
+        with open(manifest) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def write_manifest(manifest, state):
+    """
+    Writes the job manifest. The file is replaced atomically, so an interrupted run always leaves a readable one.
+    """
+    tmpfile = '{}.{}.tmp'.format(manifest, os.getpid())
+    with open(tmpfile, 'w') as f:
+        json.dump(state, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmpfile, manifest)
+
+
+## state of a worker process, set once by init_worker when the process starts
+_worker = {}
+
+
+def init_worker(clnpart, scratchdir='', uvtol=None, dirtol=0.):
+    _worker['clnpart'] = clnpart
+    ## each worker has its own scratch directory, reused by all the time slices it cleans
+    if scratchdir:
+        _worker['scratchdir'] = os.path.join(scratchdir, 'worker{}'.format(os.getpid()))
+        if not os.path.exists(_worker['scratchdir']):
+            os.makedirs(_worker['scratchdir'])
+    else:
+        _worker['scratchdir'] = ''
+    ## the PSF products of the last slice for which the worker computed a PSF, with the uv sampling and phase
+    ## direction of that slice
+    if uvtol is not None:
+        _worker['psfcache'] = {'dir': os.path.join(_worker['scratchdir'], 'psfcache'), 'uvtol': uvtol,
+                               'dirtol': dirtol, 'uvsamp': None, 'rejected': False}
+    else:
+        _worker['psfcache'] = None
+
+
+def run_job(btidx):
+    """
+    Cleans the time slice btidx in a worker. Returns btidx, the clean_iter result, the elapsed time, and the
+    process id of the worker.
+    """
+    t0 = time()
+    try:
+        res = _worker['clnpart'](btidx, scratchdir=_worker['scratchdir'], psfcache=_worker['psfcache'])
+    except Exception as e:
+        print(e)
+        print('error in cleaning time slice {}'.format(btidx))
+        res = [False, '', '', '']
+    return btidx, res, time() - t0, os.getpid()
+
+
+def clean_iter(tim, vis, imageprefix, imagesuffix,
+               twidth, doreg, docompress, usephacenter, reftime, ephem, msinfo, toTb, sclfactor, subregion, overwrite,
+               selectdata, field, spw, timerange, uvrange, antenna, scan, observation, intent, datacolumn,
+               imagename, imsize, cell, phasecenter, stokes, projection, startmodel, specmode, reffreq, nchan,
+               start,
+               width, outframe, veltype, restfreq, interpolation, perchanweightdensity, gridder, facets,
+               psfphasecenter,
+               wprojplanes, vptable, mosweight, aterm, psterm, wbawp, conjbeams, cfcache, usepointing,
+               computepastep,
+               rotatepastep, pointingoffsetsigdev, pblimit, normtype, deconvolver, scales, nterms,
+               smallscalebias,
+               restoration, restoringbeam, pbcor, outlierfile, weighting, robust, noise, npixels, uvtaper, niter,
+               gain,
+               threshold, nsigma, cycleniter, cyclefactor, minpsffraction, maxpsffraction, interactive, usemask,
+               mask,
+               pbmask, sidelobethreshold, noisethreshold, lownoisethreshold, negativethreshold, smoothfactor,
+               minbeamfrac,
+               cutthreshold, growiterations, dogrowprune, minpercentchange, verbose, fastnoise, restart,
+               savemodel,
+               calcres, calcpsf, psfcutoff, parallel, btidx, scratchdir='', psfcache=None):
+    timerange, btstr, etstr = slice_times(tim, twidth, btidx)
     print('cleaning timerange: ' + timerange)
 
-    image0 = btstr.replace(':', '').replace('-', '')
-    imname = imageprefix + image0 + imagesuffix
+    imname = slice_imname(imageprefix, imagesuffix, btstr)
+    ## with a scratch directory, tclean and imreg work there and only the final product is moved to imname
+    if scratchdir:
+        imwork = os.path.join(scratchdir, os.path.basename(imname))
+    else:
+        imwork = imname
 
     if overwrite or (len(glob.glob(imname + '*')) == 0):
-        os.system('rm -rf {}*'.format(imname))
+        remove_products(imname)
+        if imwork != imname:
+            remove_products(imwork)
+        ## reuse the PSF of a previous slice of the worker if the uv sampling and the phase direction are the same
+        reusepsf = False
+        cachepsf = psfcache is not None and calcpsf and not psfcache['rejected']
+        if cachepsf:
+            uvsamp = uv_sampling(vis, timerange, spw=spw, field=field, uvrange=uvrange, antenna=antenna, scan=scan,
+                                 observation=observation, intent=intent, phasecenter=phasecenter)
+            reusepsf = same_uv_sampling(psfcache['uvsamp'], uvsamp, psfcache['uvtol'], psfcache['dirtol'])
+            if reusepsf:
+                print('reusing the PSF of the previous slice')
+                for f in glob.glob(os.path.join(psfcache['dir'], '*')):
+                    shutil.copytree(f, imwork + '.' + os.path.basename(f))
         # try:
-        tclean(vis=vis, selectdata=selectdata, field=field, spw=spw, timerange=timerange, uvrange=uvrange,
-               antenna=antenna, scan=scan, observation=observation, intent=intent, datacolumn=datacolumn,
-               imagename=imname, imsize=imsize, cell=cell, phasecenter=phasecenter, stokes=stokes,
-               projection=projection, startmodel=startmodel, specmode=specmode, reffreq=reffreq, nchan=nchan,
-               start=start, width=width, outframe=outframe, veltype=veltype, restfreq=restfreq,
-               interpolation=interpolation, perchanweightdensity=perchanweightdensity, gridder=gridder, facets=facets,
-               psfphasecenter=psfphasecenter, wprojplanes=wprojplanes, vptable=vptable, mosweight=mosweight,
-               aterm=aterm, psterm=psterm, wbawp=wbawp, conjbeams=conjbeams, cfcache=cfcache, usepointing=usepointing,
-               computepastep=computepastep, rotatepastep=rotatepastep, pointingoffsetsigdev=pointingoffsetsigdev,
-               pblimit=pblimit, normtype=normtype, deconvolver=deconvolver, scales=scales, nterms=nterms,
-               smallscalebias=smallscalebias, restoration=restoration, restoringbeam=restoringbeam, pbcor=pbcor,
-               outlierfile=outlierfile, weighting=weighting, robust=robust, noise=noise, npixels=npixels,
-               uvtaper=uvtaper, niter=niter, gain=gain, threshold=threshold, nsigma=nsigma, cycleniter=cycleniter,
-               cyclefactor=cyclefactor, minpsffraction=minpsffraction, maxpsffraction=maxpsffraction,
-               interactive=interactive, usemask=usemask, mask=mask, pbmask=pbmask, sidelobethreshold=sidelobethreshold,
-               noisethreshold=noisethreshold, lownoisethreshold=lownoisethreshold, negativethreshold=negativethreshold,
-               smoothfactor=smoothfactor, minbeamfrac=minbeamfrac, cutthreshold=cutthreshold,
-               growiterations=growiterations, dogrowprune=dogrowprune, minpercentchange=minpercentchange,
-               verbose=verbose, fastnoise=fastnoise, restart=restart, savemodel=savemodel, calcres=calcres,
-               calcpsf=calcpsf, psfcutoff=psfcutoff, parallel=parallel)
+        clnargs = dict(vis=vis, selectdata=selectdata, field=field, spw=spw, timerange=timerange, uvrange=uvrange,
+                       antenna=antenna, scan=scan, observation=observation, intent=intent, datacolumn=datacolumn,
+                       imagename=imwork, imsize=imsize, cell=cell, phasecenter=phasecenter, stokes=stokes,
+                       projection=projection, startmodel=startmodel, specmode=specmode, reffreq=reffreq, nchan=nchan,
+                       start=start, width=width, outframe=outframe, veltype=veltype, restfreq=restfreq,
+                       interpolation=interpolation, perchanweightdensity=perchanweightdensity, gridder=gridder,
+                       facets=facets, psfphasecenter=psfphasecenter, wprojplanes=wprojplanes, vptable=vptable,
+                       mosweight=mosweight, aterm=aterm, psterm=psterm, wbawp=wbawp, conjbeams=conjbeams,
+                       cfcache=cfcache, usepointing=usepointing, computepastep=computepastep, rotatepastep=rotatepastep,
+                       pointingoffsetsigdev=pointingoffsetsigdev, pblimit=pblimit, normtype=normtype,
+                       deconvolver=deconvolver, scales=scales, nterms=nterms, smallscalebias=smallscalebias,
+                       restoration=restoration, restoringbeam=restoringbeam, pbcor=pbcor, outlierfile=outlierfile,
+                       weighting=weighting, robust=robust, noise=noise, npixels=npixels, uvtaper=uvtaper, niter=niter,
+                       gain=gain, threshold=threshold, nsigma=nsigma, cycleniter=cycleniter, cyclefactor=cyclefactor,
+                       minpsffraction=minpsffraction, maxpsffraction=maxpsffraction, interactive=interactive,
+                       usemask=usemask, mask=mask, pbmask=pbmask, sidelobethreshold=sidelobethreshold,
+                       noisethreshold=noisethreshold, lownoisethreshold=lownoisethreshold,
+                       negativethreshold=negativethreshold, smoothfactor=smoothfactor, minbeamfrac=minbeamfrac,
+                       cutthreshold=cutthreshold, growiterations=growiterations, dogrowprune=dogrowprune,
+                       minpercentchange=minpercentchange, verbose=verbose, fastnoise=fastnoise, restart=restart,
+                       savemodel=savemodel, calcres=calcres, psfcutoff=psfcutoff, parallel=parallel)
+        try:
+            tclean(calcpsf=calcpsf and not reusepsf, **clnargs)
+        except Exception as e:
+            if not reusepsf:
+                raise
+            ## tclean rejects the cached PSF if its coordinate system does not match the one of this slice (e.g., the
+            ## reference frequency in a frame other than TOPO changes with time). That holds for the next slices too,
+            ## so the worker computes the PSF of every slice from here on
+            print(e)
+            print('the PSF of the previous slice does not apply. The PSF is computed for every slice from now on')
+            remove_products(imwork)
+            shutil.rmtree(psfcache['dir'])
+            psfcache['rejected'] = True
+            cachepsf = reusepsf = False
+            tclean(calcpsf=calcpsf, **clnargs)
+        if cachepsf and not reusepsf:
+            ## keep the products made with the PSF of this slice as the reference for the next slices
+            if os.path.exists(psfcache['dir']):
+                shutil.rmtree(psfcache['dir'])
+            os.makedirs(psfcache['dir'])
+            psfcache['uvsamp'] = None
+            if uvsamp is not None:
+                for psfprod in ['.psf', '.sumwt', '.pb', '.weight']:
+                    for f in glob.glob(imwork + psfprod + '*'):
+                        shutil.move(f, os.path.join(psfcache['dir'], f[len(imwork) + 1:]))
+                psfcache['uvsamp'] = uvsamp
         if pbcor:
             clnjunks = ['.flux', '.mask', '.model', '.psf', '.residual', '.pb', '.sumwt', '.image']
         else:
             clnjunks = ['.flux', '.mask', '.model', '.psf', '.residual', '.pb', '.sumwt', '.image.pbcor']
         for clnjunk in clnjunks:
-            if os.path.exists(imname + clnjunk):
-                shutil.rmtree(imname + clnjunk)
-        if pbcor:
-            os.system('mv {} {}'.format(imname + '.image.pbcor', imname + '.image'))
+            if os.path.exists(imwork + clnjunk):
+                shutil.rmtree(imwork + clnjunk)
+        if pbcor and os.path.exists(imwork + '.image.pbcor'):
+            os.rename(imwork + '.image.pbcor', imwork + '.image')
         # except:
         #     print('error in cleaning image: ' + btstr)
         #     return [False, btstr, etstr, '']
     else:
         print(imname + ' exists. Clean task aborted.')
+        imwork = imname
 
     if doreg:
         # ephem.keys()
@@ -122,11 +397,13 @@ def clean_iter(tim, vis, imageprefix, imagesuffix,
                     print("ms info not provided, generating one on the fly")
                     msinfo = hf.read_msinfo(vis)
                 hf.imreg(vis=vis, ephem=ephem, msinfo=msinfo, timerange=timerange, reftime=reftime,
-                         imagefile=imname + '.image', fitsfile=imname + '.fits', overwrite=True,
+                         imagefile=imwork + '.image', fitsfile=imwork + '.fits', overwrite=True,
                          toTb=toTb, sclfactor=sclfactor, usephacenter=usephacenter, subregion=subregion,
                          docompress=docompress)
-                if os.path.exists(imname + '.fits'):
-                    shutil.rmtree(imname + '.image')
+                if os.path.exists(imwork + '.fits'):
+                    shutil.rmtree(imwork + '.image')
+                    if imwork != imname:
+                        shutil.move(imwork + '.fits', imname + '.fits')
                     return [True, btstr, etstr, imname + '.fits']
                 else:
                     return [False, btstr, etstr, imname + '.fits']
@@ -136,8 +413,12 @@ def clean_iter(tim, vis, imageprefix, imagesuffix,
                 else:
                     print(e)
                 print('error in registering image: ' + btstr)
+                if imwork != imname and os.path.exists(imwork + '.image'):
+                    shutil.move(imwork + '.image', imname + '.image')
                 return [False, btstr, etstr, imname + '.image']
     else:
+        if imwork != imname and os.path.exists(imwork + '.image'):
+            shutil.move(imwork + '.image', imname + '.image')
         if os.path.exists(imname + '.image'):
             return [True, btstr, etstr, imname + '.image']
         else:
@@ -155,7 +436,8 @@ def ptclean6(vis, imageprefix, imagesuffix, ncpu, twidth, doreg, usephacenter, r
              threshold, nsigma, cycleniter, cyclefactor, minpsffraction, maxpsffraction, interactive, usemask, mask,
              pbmask, sidelobethreshold, noisethreshold, lownoisethreshold, negativethreshold, smoothfactor, minbeamfrac,
              cutthreshold, growiterations, dogrowprune, minpercentchange, verbose, fastnoise, restart, savemodel,
-             calcres, calcpsf, psfcutoff, parallel):
+             calcres, calcpsf, psfcutoff, parallel, manifest='', resume=True, scratchdir='', reusepsf=False,
+             psftol=0.1):
     if not (type(ncpu) is int):
         casalog.post('ncpu should be an integer')
         ncpu = 1
@@ -166,11 +448,7 @@ def ptclean6(vis, imageprefix, imagesuffix, ncpu, twidth, doreg, usephacenter, r
     else:
         workdir = './'
     # get number of time pixels
-    ms.open(vis)
-    ms.selectinit()
-    timfreq = ms.getdata(['time', 'axis_info'], ifraxis=True)
-    tim = timfreq['time']
-    ms.close()
+    tim = get_times(vis)
 
     if twidth < 1:
         casalog.post('twidth less than 1. Change to 1')
@@ -245,7 +523,6 @@ def ptclean6(vis, imageprefix, imagesuffix, ncpu, twidth, doreg, usephacenter, r
     print('Last time pixel: ' + etstr)
     print(str(len(iterable)) + ' images to clean...')
 
-    res = []
     # partition
     clnpart = partial(clean_iter, tim, vis, imageprefix, imagesuffix,
                       twidth, doreg, docompress, usephacenter, reftime, ephem, msinfo, toTb, sclfactor, subregion,
@@ -268,29 +545,97 @@ def ptclean6(vis, imageprefix, imagesuffix, ncpu, twidth, doreg, usephacenter, r
                       cutthreshold, growiterations, dogrowprune, minpercentchange, verbose, fastnoise, restart,
                       savemodel,
                       calcres, calcpsf, psfcutoff, parallel)
+    ## the manifest keeps the state of every time slice (job), so that an interrupted run resumes where it stopped
+    if not manifest:
+        manifest = (imageprefix if imageprefix else './') + 'ptclean6_manifest.json'
+    ## with overwrite, every time slice is imaged again
+    resume = resume and not overwrite
+    state = read_manifest(manifest) if resume else None
+    if state is None or state.get('vis') != os.path.abspath(vis) or state.get('twidth') != twidth:
+        state = {'vis': os.path.abspath(vis), 'twidth': twidth, 'jobs': {}}
+    jobs = state['jobs']
+    res = {}
+    todo = []
+    for i in iterable:
+        job = jobs.get(str(i))
+        if job is not None and job['status'] == 'done' and os.path.exists(job['output']):
+            res[i] = [True, job['begintime'], job['endtime'], job['output']]
+            continue
+        timeran_i, btstr_i, etstr_i = slice_times(tim, twidth, i)
+        imname = slice_imname(imageprefix, imagesuffix, btstr_i)
+        if job is not None:
+            # the job did not finish in the previous run, remove what it may have left half-written
+            remove_products(imname)
+        jobs[str(i)] = {'status': 'queued', 'begintime': btstr_i, 'endtime': etstr_i, 'imagename': imname,
+                        'output': '', 'elapsed': None, 'worker': None}
+        todo.append(i)
+    if os.path.dirname(manifest) and not os.path.exists(os.path.dirname(manifest)):
+        os.makedirs(os.path.dirname(manifest))
+    write_manifest(manifest, state)
+    if len(res) > 0:
+        print('{} images already done in {}. Resuming...'.format(len(res), manifest))
+
     timelapse = 0
     t0 = time()
     # parallelization
-    if ncpu > 1:
+    ## jobs are handed one at a time to long-lived workers and their results are recorded as soon as they finish
+    ## slices with the same uv sampling (within psftol of a uv cell) and phase direction (within psftol of an image
+    ## cell) share the PSF computed by the worker
+    uvtol = None
+    dirtol = 0.
+    if reusepsf and calcpsf:
+        try:
+            uvtol = uv_tolerance(vis, imsize, cell, psftol)
+            dirtol = dir_tolerance(cell, psftol)
+        except Exception as e:
+            print(e)
+            print('error in getting the uv cell size. The PSF is computed for every slice.')
+        if uvtol is not None and not scratchdir:
+            scratchdir = workdir if workdir else './'
+    ## scratch products of this run go to a private directory under scratchdir (e.g., a local disk or /dev/shm)
+    if scratchdir:
+        if not os.path.exists(scratchdir):
+            os.makedirs(scratchdir)
+        scratchdir = tempfile.mkdtemp(prefix='ptclean6_', dir=scratchdir)
+    pool = None
+    if ncpu > 1 and len(todo) > 1:
         import multiprocessing as mprocs
         casalog.post('Perform clean in parallel ...')
         print('Perform clean in parallel ...')
-        pool = mprocs.Pool(ncpu)
-        res = pool.map(clnpart, iterable)
-        pool.close()
-        pool.join()
+        pool = mprocs.Pool(min(ncpu, len(todo)), initializer=init_worker,
+                           initargs=(clnpart, scratchdir, uvtol, dirtol))
+        resiter = pool.imap_unordered(run_job, todo)
     else:
         casalog.post('Perform clean in single process ...')
         print('Perform clean in single process ...')
-        for i in iterable:
-            res.append(clnpart(i))
+        init_worker(clnpart, scratchdir, uvtol, dirtol)
+        resiter = (run_job(i) for i in todo)
+    try:
+        for n, (i, r, elapsed, pid) in enumerate(resiter):
+            job = jobs[str(i)]
+            if not r[1]:
+                r = [False, job['begintime'], job['endtime'], r[3]]
+            job.update(status='done' if r[0] else 'failed', output=r[3], elapsed=round(elapsed, 3), worker=pid)
+            write_manifest(manifest, state)
+            res[i] = r
+            print('{}/{} {} {} in {:.1f} secs'.format(n + 1, len(todo), job['begintime'],
+                                                      'done' if r[0] else 'failed', elapsed))
+        if pool is not None:
+            pool.close()
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if scratchdir:
+            shutil.rmtree(scratchdir, ignore_errors=True)
 
     t1 = time()
     timelapse = t1 - t0
     print('It took %f secs to complete' % timelapse)
     # repackage this into a single dictionary
     results = {'Succeeded': [], 'BeginTime': [], 'EndTime': [], 'ImageName': []}
-    for r in res:
+    for i in iterable:
+        r = res[i]
         results['Succeeded'].append(r[0])
         results['BeginTime'].append(r[1])
         results['EndTime'].append(r[2])
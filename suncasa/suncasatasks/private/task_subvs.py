@@ -1,6 +1,7 @@
 import os
 import shutil
 import numpy as np
+from functools import partial
 from ...utils import signal_utils as su
 import sys
 
@@ -18,10 +19,70 @@ ms_in = mstool()
 datamsmd = msmdtool()
 qa = qatool()
 
+def smooth_cube(data, smoothwidth, smoothtype, axis=3, highpass=False, maxmemmb=1024, ncpu=1):
+    """Smooth (lowpass) or subtract the smoothed data (highpass) of a visibility cube in place.
+    data -- visibility cube in the shape of (npol, nchan, nbl, ntime)
+    axis -- axis of smooth. 3 for time, 1 for frequency
+    maxmemmb -- upper limit (in MB) of the baseline chunk processed at once. The cube is split
+                into chunks of baselines if it exceeds this limit
+    ncpu -- number of processes used to smooth the baseline chunks
+    """
+    nbl = data.shape[2]
+    ## the padded copy and the smoothed output take about three times the size of the input chunk
+    blbytes = 3 * data[:, :, 0, :].nbytes
+    nblchunk = int(max(1, min(nbl, maxmemmb * 1024 ** 2 // blbytes)))
+    blchunks = [(b, min(b + nblchunk, nbl)) for b in range(0, nbl, nblchunk)]
+    smoothfunc = partial(su.smooth_axis, window_len=int(smoothwidth), window=smoothtype, axis=axis)
+    if ncpu > 1 and len(blchunks) > 1:
+        import multiprocessing as mprocs
+        pool = mprocs.Pool(ncpu)
+        smoothed = pool.imap(smoothfunc, (data[:, :, b0:b1, :] for b0, b1 in blchunks))
+    else:
+        pool = None
+        smoothed = (smoothfunc(data[:, :, b0:b1, :]) for b0, b1 in blchunks)
+    for (b0, b1), datasm in zip(blchunks, smoothed):
+        if highpass:
+            data[:, :, b0:b1, :] -= datasm
+        else:
+            data[:, :, b0:b1, :] = datasm
+    if pool:
+        pool.close()
+        pool.join()
+    return data
+
+
+def baseline_chunks(msmd, spwid, maxmemmb=1024):
+    """Split the baselines of a spectral window into chunks, each of which has a visibility cube
+    (all polarizations, channels, and times of the spw) smaller than maxmemmb.
+    msmd -- an opened msmetadata tool
+    spwid -- spectral window id
+    Returns a list of baseline selection strings for msselect, one for each chunk.
+    """
+    ant1, ant2 = np.where(np.triu(msmd.baselines()))
+    antnames = msmd.antennanames()
+    nchan = msmd.nchan(spwid)
+    ddid = msmd.datadescids(spw=spwid)[0]
+    npol = msmd.ncorrforpol(msmd.polidfordatadesc(ddid))
+    ntim = len(msmd.timesforspws(spwid))
+    blbytes = npol * nchan * ntim * np.dtype(np.complex128).itemsize
+    nbl = len(ant1)
+    nblchunk = int(max(1, min(nbl, maxmemmb * 1024 ** 2 // blbytes)))
+    blsels = []
+    for b in range(0, nbl, nblchunk):
+        bls = []
+        for a1, a2 in zip(ant1[b:b + nblchunk], ant2[b:b + nblchunk]):
+            if a1 == a2:
+                bls.append('{}&&&'.format(antnames[a1]))
+            else:
+                bls.append('{}&{}'.format(antnames[a1], antnames[a2]))
+        blsels.append(';'.join(bls))
+    return blsels
+
+
 def subvs(vis=None, outputvis=None, timerange='', spw='',
            mode='linear', subtime1='', subtime2='',
            smoothaxis='time', smoothtype='flat', smoothwidth='5',
-           splitsel=True, reverse=False, overwrite=False):
+           splitsel=True, reverse=False, overwrite=False, maxmemmb=1024, ncpu=1, streaming=False):
     """Perform vector subtraction for visibilities
     Keyword arguments:
     vis -- Name of input visibility file (MS)
@@ -81,6 +142,13 @@ def subvs(vis=None, outputvis=None, timerange='', spw='',
                 outputvis already exists, the selected subtime and spw in the 
                 output measurment set will be replaced with background subtracted 
                 visibilities
+    maxmemmb -- upper limit (in MB) of the visibility chunk smoothed at once in the
+                lowpass and highpass modes. default = 1024
+    ncpu -- number of processes used to smooth the visibility chunks. default = 1
+    streaming -- True or False. default = False. If streaming = True, the visibilities of each
+                spw are read, background subtracted, and written back in chunks of baselines,
+                each of which holds the entire time series of its baselines and is no larger
+                than maxmemmb. Peak memory is then bounded regardless of the observation length.
 
     """
     # check the visbility ms
@@ -134,7 +202,6 @@ def subvs(vis=None, outputvis=None, timerange='', spw='',
     spwinfol = [spwinfod[k] for k in spwinfok]
     for s, spi in enumerate(spwinfol):
         print('processing spectral window {}'.format(spi['SpectralWindowId']))
-        datams.selectinit(reset=True)
         staql = {'time': '', 'spw': ''}
         if not splitsel:
             # outputvis is identical to input visibility, do the selection
@@ -150,172 +217,159 @@ def subvs(vis=None, outputvis=None, timerange='', spw='',
             # outputvis is splitted, selections have already applied, select all the data
             print('split the selected spws and times')
             staql['spw'] = str(spi['SpectralWindowId'])
-        datams.msselect(staql)
-        orec = datams.getdata(['data', 'time', 'axis_info'], ifraxis=True)
-        npol, nchan, nbl, ntim = orec['data'].shape
-        print('dimension of output data', orec['data'].shape)
-        casalog.post('Number of baselines: ' + str(nbl))
-        casalog.post('Number of spectral channels: ' + str(nchan))
-        casalog.post('Number of time pixels: ' + str(ntim))
+        if streaming:
+            blsels = baseline_chunks(datamsmd, spi['SpectralWindowId'], maxmemmb)
+            casalog.post('Streaming the visibilities in {} chunks of baselines'.format(len(blsels)))
+        else:
+            blsels = ['']
+        for blsel in blsels:
+            datams.selectinit(reset=True)
+            staql['baseline'] = blsel
+            datams.msselect(staql)
+            orec = datams.getdata(['data', 'time', 'axis_info'], ifraxis=True)
+            npol, nchan, nbl, ntim = orec['data'].shape
+            print('dimension of output data', orec['data'].shape)
+            casalog.post('Number of baselines: ' + str(nbl))
+            casalog.post('Number of spectral channels: ' + str(nchan))
+            casalog.post('Number of time pixels: ' + str(ntim))
 
-        try:
-            if mode == 'linear':
-                # define and check the background time ranges
-                if subtime1 and (type(subtime1) == str):
-                    [bsubtime1, esubtime1] = subtime1.split('~')
-                    bsubtime1sec = qa.getvalue(qa.convert(qa.totime(bsubtime1), 's'))
-                    esubtime1sec = qa.getvalue(qa.convert(qa.totime(esubtime1), 's'))
-                    timebin1sec = esubtime1sec - bsubtime1sec
-                    if timebin1sec < 0:
-                        raise Exception('Negative timebin! Please check the "subtime1" parameter.')
-                    casalog.post('Selected timerange 1: ' + subtime1 + ' as background for uv subtraction.')
-                else:
-                    raise Exception('Please enter at least one timerange as the background')
-                if subtime2 and (type(subtime2) == str):
-                    [bsubtime2, esubtime2] = subtime2.split('~')
-                    bsubtime2sec = qa.getvalue(qa.convert(qa.totime(bsubtime2), 's'))
-                    esubtime2sec = qa.getvalue(qa.convert(qa.totime(esubtime2), 's'))
-                    timebin2sec = esubtime2sec - bsubtime2sec
-                    if timebin2sec < 0:
-                        raise Exception('Negative timebin! Please check the "subtime2" parameter.')
-                    timebin2 = str(timebin2sec) + 's'
-                    casalog.post('Selected timerange 2: ' + subtime2 + ' as background for uv subtraction.')
-                    # plus 1s is to ensure averaging over the entire timerange
-                else:
-                    casalog.post('Timerange 2 not selected, using only timerange 1 as background')
+            try:
+                if mode == 'linear':
+                    # define and check the background time ranges
+                    if subtime1 and (type(subtime1) == str):
+                        [bsubtime1, esubtime1] = subtime1.split('~')
+                        bsubtime1sec = qa.getvalue(qa.convert(qa.totime(bsubtime1), 's'))
+                        esubtime1sec = qa.getvalue(qa.convert(qa.totime(esubtime1), 's'))
+                        timebin1sec = esubtime1sec - bsubtime1sec
+                        if timebin1sec < 0:
+                            raise Exception('Negative timebin! Please check the "subtime1" parameter.')
+                        casalog.post('Selected timerange 1: ' + subtime1 + ' as background for uv subtraction.')
+                    else:
+                        raise Exception('Please enter at least one timerange as the background')
+                    if subtime2 and (type(subtime2) == str):
+                        [bsubtime2, esubtime2] = subtime2.split('~')
+                        bsubtime2sec = qa.getvalue(qa.convert(qa.totime(bsubtime2), 's'))
+                        esubtime2sec = qa.getvalue(qa.convert(qa.totime(esubtime2), 's'))
+                        timebin2sec = esubtime2sec - bsubtime2sec
+                        if timebin2sec < 0:
+                            raise Exception('Negative timebin! Please check the "subtime2" parameter.')
+                        timebin2 = str(timebin2sec) + 's'
+                        casalog.post('Selected timerange 2: ' + subtime2 + ' as background for uv subtraction.')
+                        # plus 1s is to ensure averaging over the entire timerange
+                    else:
+                        casalog.post('Timerange 2 not selected, using only timerange 1 as background')
 
-                # Select the background indicated by subtime1
-                ms_in.open(vis, nomodify=True)
-                # Select the spw id
-                # ms_in.msselect({'time': subtime1})
-                staql0 = {'time': subtime1, 'spw': ''}
-                if spw and (type(spw) == str):
-                    staql0['spw'] = spwlist[s]
-                else:
-                    staql0['spw'] = staql['spw']
-                ms_in.msselect(staql0)
-                rec1 = ms_in.getdata(['data', 'time', 'axis_info'], ifraxis=True)
-                # print('shape of the frequency matrix ',rec1['axis_info']['freq_axis']['chan_freq'].shape)
-                sz1 = rec1['data'].shape
-                print('dimension of selected background 1', rec1['data'].shape)
-                # the data shape is (n_pol,n_channel,n_baseline,n_time), no need to reshape
-                # rec1['data']=rec1['data'].reshape(sz1[0],sz1[1],sz1[2],nspw,sz1[3]/nspw,order='F')
-                # print('reshaped rec1 ', rec1['data'].shape)
-                rec1avg = np.average(rec1['data'], axis=3)
-                casalog.post('Averaging the visibilities in subtime1: ' + subtime1)
-                ms_in.close()
-                if subtime2 and (type(subtime2) == str):
+                    # Select the background indicated by subtime1
                     ms_in.open(vis, nomodify=True)
                     # Select the spw id
-                    staql0 = {'time': subtime2, 'spw': ''}
+                    # ms_in.msselect({'time': subtime1})
+                    staql0 = {'time': subtime1, 'spw': '', 'baseline': blsel}
                     if spw and (type(spw) == str):
                         staql0['spw'] = spwlist[s]
                     else:
                         staql0['spw'] = staql['spw']
                     ms_in.msselect(staql0)
-                    rec2 = ms_in.getdata(['data', 'time', 'axis_info'], ifraxis=True)
-                    sz2 = rec2['data'].shape
-                    print('dimension of selected background 2', rec2['data'].shape)
-                    # rec2['data']=rec2['data'].reshape(sz2[0],sz2[1],sz2[2],nspw,sz2[3]/nspw,order='F')
-                    # print('reshaped rec1 ', rec2['data'].shape)
-                    rec2avg = np.average(rec2['data'], axis=3)
+                    rec1 = ms_in.getdata(['data', 'time', 'axis_info'], ifraxis=True)
+                    # print('shape of the frequency matrix ',rec1['axis_info']['freq_axis']['chan_freq'].shape)
+                    sz1 = rec1['data'].shape
+                    print('dimension of selected background 1', rec1['data'].shape)
+                    # the data shape is (n_pol,n_channel,n_baseline,n_time), no need to reshape
+                    # rec1['data']=rec1['data'].reshape(sz1[0],sz1[1],sz1[2],nspw,sz1[3]/nspw,order='F')
+                    # print('reshaped rec1 ', rec1['data'].shape)
+                    rec1avg = np.average(rec1['data'], axis=3)
+                    casalog.post('Averaging the visibilities in subtime1: ' + subtime1)
                     ms_in.close()
-                    casalog.post('Averaged the visibilities in subtime2: ' + subtime2)
-                if subtime1 and (not subtime2):
-                    casalog.post('Only "subtime1" is defined, subtracting background defined in subtime1: ' + subtime1)
-                    t1 = (np.amax(rec1['time']) + np.amin(rec1['time'])) / 2.
-                    print('t1: ', qa.time(qa.quantity(t1, 's'), form='ymd', prec=10))
-                    for i in range(ntim):
-                        orec['data'][:, :, :, i] -= rec1avg
+                    if subtime2 and (type(subtime2) == str):
+                        ms_in.open(vis, nomodify=True)
+                        # Select the spw id
+                        staql0 = {'time': subtime2, 'spw': '', 'baseline': blsel}
+                        if spw and (type(spw) == str):
+                            staql0['spw'] = spwlist[s]
+                        else:
+                            staql0['spw'] = staql['spw']
+                        ms_in.msselect(staql0)
+                        rec2 = ms_in.getdata(['data', 'time', 'axis_info'], ifraxis=True)
+                        sz2 = rec2['data'].shape
+                        print('dimension of selected background 2', rec2['data'].shape)
+                        # rec2['data']=rec2['data'].reshape(sz2[0],sz2[1],sz2[2],nspw,sz2[3]/nspw,order='F')
+                        # print('reshaped rec1 ', rec2['data'].shape)
+                        rec2avg = np.average(rec2['data'], axis=3)
+                        ms_in.close()
+                        casalog.post('Averaged the visibilities in subtime2: ' + subtime2)
+                    if subtime1 and (not subtime2):
+                        casalog.post('Only "subtime1" is defined, subtracting background defined in subtime1: ' + subtime1)
+                        t1 = (np.amax(rec1['time']) + np.amin(rec1['time'])) / 2.
+                        print('t1: ', qa.time(qa.quantity(t1, 's'), form='ymd', prec=10))
+                        orec['data'] -= rec1avg[:, :, :, np.newaxis]
                         if reverse:
-                            orec['data'][:, :, :, i] = -orec['data'][:, :, :, i]
-                if subtime1 and subtime2 and (type(subtime2) == str):
-                    casalog.post(
-                        'Both subtime1 and subtime2 are specified, doing linear interpolation between "subtime1" and "subtime2"')
-                    t1 = (np.amax(rec1['time']) + np.amin(rec1['time'])) / 2.
-                    t2 = (np.amax(rec2['time']) + np.amin(rec2['time'])) / 2.
-                    touts = orec['time']
-                    print('t1: ', qa.time(qa.quantity(t1, 's'), form='ymd', prec=10))
-                    print('t2: ', qa.time(qa.quantity(t2, 's'), form='ymd', prec=10))
-                    for i in range(ntim):
-                        tout = touts[i]
-                        if tout > np.amax([t1, t2]):
-                            tout = np.amax([t1, t2])
-                        elif tout < np.amin([t1, t2]):
-                            tout = np.amin([t1, t2])
-                        orec['data'][:, :, :, i] -= (rec2avg - rec1avg) * (tout - t1) / (t2 - t1) + rec1avg
+                            np.negative(orec['data'], out=orec['data'])
+                    if subtime1 and subtime2 and (type(subtime2) == str):
+                        casalog.post(
+                            'Both subtime1 and subtime2 are specified, doing linear interpolation between "subtime1" and "subtime2"')
+                        t1 = (np.amax(rec1['time']) + np.amin(rec1['time'])) / 2.
+                        t2 = (np.amax(rec2['time']) + np.amin(rec2['time'])) / 2.
+                        touts = orec['time']
+                        print('t1: ', qa.time(qa.quantity(t1, 's'), form='ymd', prec=10))
+                        print('t2: ', qa.time(qa.quantity(t2, 's'), form='ymd', prec=10))
+                        touts = np.clip(touts, np.amin([t1, t2]), np.amax([t1, t2]))
+                        wt = (touts - t1) / (t2 - t1)
+                        orec['data'] -= (rec2avg - rec1avg)[:, :, :, np.newaxis] * wt + rec1avg[:, :, :, np.newaxis]
                         if reverse:
-                            orec['data'][:, :, :, i] = -orec['data'][:, :, :, i]
-            elif mode == 'highpass':
-                if smoothtype != 'flat' and smoothtype != 'hanning' and smoothtype != 'hamming' and smoothtype != 'bartlett' and smoothtype != 'blackman':
-                    raise Exception('Unknown smoothtype ' + str(smoothtype))
-                if smoothaxis == 'time':
-                    if smoothwidth <= 0 or smoothwidth >= ntim:
-                        raise Exception('Specified smooth width is <=0 or >= the total number of ' + smoothaxis)
-                    else:
-                        for i in range(orec['data'].shape[0]):
-                            for j in range(nchan):
-                                for k in range(nbl):
-                                    orec['data'][i, j, k, :] -= su.smooth(orec['data'][i, j, k, :],
-                                                                          smoothwidth,
-                                                                          smoothtype)
-                if smoothaxis == 'freq':
-                    if smoothwidth <= 0 or smoothwidth >= nchan:
-                        raise Exception('Specified smooth width is <=0 or >= the total number of ' + smoothaxis)
-                    else:
-                        for i in range(orec['data'].shape[0]):
-                            for j in range(nbl):
-                                for k in range(ntim):
-                                    orec['data'][i, :, j, k] -= su.smooth(orec['data'][i, :, j, k],
-                                                                          smoothwidth,
-                                                                          smoothtype)
-            elif mode == 'lowpass':
-                if smoothtype != 'flat' and smoothtype != 'hanning' and smoothtype != 'hamming' and smoothtype != 'bartlett' and smoothtype != 'blackman':
-                    raise Exception('Unknown smoothtype ' + str(smoothtype))
-                if smoothaxis == 'time':
-                    if smoothwidth <= 0 or smoothwidth >= ntim:
-                        raise Exception('Specified smooth width is <=0 or >= the total number of ' + smoothaxis)
-                    else:
-                        for i in range(orec['data'].shape[0]):
-                            for j in range(nchan):
-                                for k in range(nbl):
-                                    orec['data'][i, j, k, :] = su.smooth(orec['data'][i, j, k, :],
-                                                                         smoothwidth,
-                                                                         smoothtype)
-                if smoothaxis == 'freq':
-                    if smoothwidth <= 0 or smoothwidth >= nchan:
-                        raise Exception('Specified smooth width is <=0 or >= the total number of ' + smoothaxis)
-                    else:
-                        for i in range(orec['data'].shape[0]):
-                            for j in range(nbl):
-                                for k in range(ntim):
-                                    orec['data'][i, :, j, k] = su.smooth(orec['data'][i, :, j, k],
-                                                                         smoothwidth,
-                                                                         smoothtype)
-            else:
-                raise Exception('Unknown mode' + str(mode))
-        except Exception as instance:
-            print('*** Error ***', instance)
+                            np.negative(orec['data'], out=orec['data'])
+                elif mode == 'highpass':
+                    if smoothtype != 'flat' and smoothtype != 'hanning' and smoothtype != 'hamming' and smoothtype != 'bartlett' and smoothtype != 'blackman':
+                        raise Exception('Unknown smoothtype ' + str(smoothtype))
+                    if smoothaxis == 'time':
+                        if smoothwidth <= 0 or smoothwidth >= ntim:
+                            raise Exception('Specified smooth width is <=0 or >= the total number of ' + smoothaxis)
+                        else:
+                            smooth_cube(orec['data'], smoothwidth, smoothtype, axis=3, highpass=True,
+                                        maxmemmb=maxmemmb, ncpu=ncpu)
+                    if smoothaxis == 'freq':
+                        if smoothwidth <= 0 or smoothwidth >= nchan:
+                            raise Exception('Specified smooth width is <=0 or >= the total number of ' + smoothaxis)
+                        else:
+                            smooth_cube(orec['data'], smoothwidth, smoothtype, axis=1, highpass=True,
+                                        maxmemmb=maxmemmb, ncpu=ncpu)
+                elif mode == 'lowpass':
+                    if smoothtype != 'flat' and smoothtype != 'hanning' and smoothtype != 'hamming' and smoothtype != 'bartlett' and smoothtype != 'blackman':
+                        raise Exception('Unknown smoothtype ' + str(smoothtype))
+                    if smoothaxis == 'time':
+                        if smoothwidth <= 0 or smoothwidth >= ntim:
+                            raise Exception('Specified smooth width is <=0 or >= the total number of ' + smoothaxis)
+                        else:
+                            smooth_cube(orec['data'], smoothwidth, smoothtype, axis=3, highpass=False,
+                                        maxmemmb=maxmemmb, ncpu=ncpu)
+                    if smoothaxis == 'freq':
+                        if smoothwidth <= 0 or smoothwidth >= nchan:
+                            raise Exception('Specified smooth width is <=0 or >= the total number of ' + smoothaxis)
+                        else:
+                            smooth_cube(orec['data'], smoothwidth, smoothtype, axis=1, highpass=False,
+                                        maxmemmb=maxmemmb, ncpu=ncpu)
+                else:
+                    raise Exception('Unknown mode' + str(mode))
+            except Exception as instance:
+                print('*** Error ***', instance)
 
-        # orec['data']=orec['data'].reshape(szo[0],szo[1],szo[2],szo[3],order='F')
-        # put the modified data back into the output visibility set
-        del orec['time']
-        del orec['axis_info']
-        # ms_in.open(outputvis,nomodify=False)
-        # if not splitsel:
-        # outputvis is identical to input visibility, do the selection
-        #    if timerange and (type(timerange==str)):
-        #        datams.msselect({'time':timerange})
-        #    if spw and (type(spw)==str):
-        #        datams.selectinit(datadescid=int(spwid))
-        #        nchan=int(echan)-int(bchan)+1
-        #        datams.selectchannel(nchan,int(bchan),1,1)
-        #    if not spw and not timerange:
-        # data selection is not made
-        #        datams.selectinit(datadescid=0)
-        # else:
-        # outputvis is splitted, selections have already applied, select all the data
-        #    datams.selectinit(datadescid=0)
-        datams.putdata(orec)
+            # orec['data']=orec['data'].reshape(szo[0],szo[1],szo[2],szo[3],order='F')
+            # put the modified data back into the output visibility set
+            del orec['time']
+            del orec['axis_info']
+            # ms_in.open(outputvis,nomodify=False)
+            # if not splitsel:
+            # outputvis is identical to input visibility, do the selection
+            #    if timerange and (type(timerange==str)):
+            #        datams.msselect({'time':timerange})
+            #    if spw and (type(spw)==str):
+            #        datams.selectinit(datadescid=int(spwid))
+            #        nchan=int(echan)-int(bchan)+1
+            #        datams.selectchannel(nchan,int(bchan),1,1)
+            #    if not spw and not timerange:
+            # data selection is not made
+            #        datams.selectinit(datadescid=0)
+            # else:
+            # outputvis is splitted, selections have already applied, select all the data
+            #    datams.selectinit(datadescid=0)
+            datams.putdata(orec)
     datams.close()
     datamsmd.done()
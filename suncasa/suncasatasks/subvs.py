@@ -1,5 +1,5 @@
 ##################### generated by xml-casa (v2) from subvs.xml #####################
-##################### 359882fd4602fc4cb310cc193180fe92 ##############################
+##################### ab77c318863acc4669c87ff43ec06d3d ##############################
 from __future__ import absolute_import
 import numpy
 from casatools.typecheck import CasaValidator as _val_ctor
@@ -42,6 +42,9 @@ class _subvs:
     splitsel    Split the selected timerange and spectral channels as outputvis
     reverse     Reverse the sign of the background-subtracted data (for absorptive structure)
     overwrite   Overwrite the already existing output measurement set
+    maxmemmb    Upper limit (in MB) of the visibility chunk smoothed or subtracted at once
+    ncpu        Number of processes used to smooth the visibility chunks
+    streaming   Read, subtract, and write the visibilities of each spw in chunks of baselines no larger than maxmemmb
 
     --------- examples -----------------------------------------------------------
 
@@ -110,6 +113,13 @@ class _subvs:
     outputvis already exists, the selected subtime and spw in the
     output measurment set will be replaced with background subtracted
     visibilities
+    maxmemmb -- upper limit (in MB) of the visibility chunk smoothed at once in the
+    lowpass and highpass modes. default = 1024
+    ncpu -- number of processes used to smooth the visibility chunks. default = 1
+    streaming -- True or False. default = False. If streaming = True, the visibilities of each
+    spw are read, background subtracted, and written back in chunks of baselines,
+    each of which holds the entire time series of its baselines and is no larger
+    than maxmemmb. Peak memory is then bounded regardless of the observation length.
 
 
     """
@@ -117,12 +127,12 @@ class _subvs:
     _info_group_ = """misc"""
     _info_desc_ = """Vector-subtraction in UV using selected time ranges and spectral channels as background"""
 
-    def __call__( self, vis='', outputvis='', timerange='', spw='', mode='linear', subtime1='', subtime2='', smoothaxis='time', smoothtype='flat', smoothwidth=int(5), splitsel=True, reverse=False, overwrite=False ):
-        schema = {'vis': {'type': 'cReqPath', 'coerce': _coerce.expand_path}, 'outputvis': {'type': 'cPath', 'coerce': _coerce.expand_path}, 'timerange': {'type': 'cStr', 'coerce': _coerce.to_str}, 'spw': {'type': 'cStr', 'coerce': _coerce.to_str}, 'mode': {'type': 'cStr', 'coerce': _coerce.to_str, 'allowed': [ 'linear', 'lowpass', 'highpass' ]}, 'subtime1': {'type': 'cStr', 'coerce': _coerce.to_str}, 'subtime2': {'type': 'cStr', 'coerce': _coerce.to_str}, 'smoothaxis': {'type': 'cStr', 'coerce': _coerce.to_str}, 'smoothtype': {'type': 'cStr', 'coerce': _coerce.to_str}, 'smoothwidth': {'type': 'cInt'}, 'splitsel': {'type': 'cBool'}, 'reverse': {'type': 'cBool'}, 'overwrite': {'type': 'cBool'}}
-        doc = {'vis': vis, 'outputvis': outputvis, 'timerange': timerange, 'spw': spw, 'mode': mode, 'subtime1': subtime1, 'subtime2': subtime2, 'smoothaxis': smoothaxis, 'smoothtype': smoothtype, 'smoothwidth': smoothwidth, 'splitsel': splitsel, 'reverse': reverse, 'overwrite': overwrite}
+    def __call__( self, vis='', outputvis='', timerange='', spw='', mode='linear', subtime1='', subtime2='', smoothaxis='time', smoothtype='flat', smoothwidth=int(5), splitsel=True, reverse=False, overwrite=False, maxmemmb=int(1024), ncpu=int(1), streaming=False ):
+        schema = {'vis': {'type': 'cReqPath', 'coerce': _coerce.expand_path}, 'outputvis': {'type': 'cPath', 'coerce': _coerce.expand_path}, 'timerange': {'type': 'cStr', 'coerce': _coerce.to_str}, 'spw': {'type': 'cStr', 'coerce': _coerce.to_str}, 'mode': {'type': 'cStr', 'coerce': _coerce.to_str, 'allowed': [ 'linear', 'lowpass', 'highpass' ]}, 'subtime1': {'type': 'cStr', 'coerce': _coerce.to_str}, 'subtime2': {'type': 'cStr', 'coerce': _coerce.to_str}, 'smoothaxis': {'type': 'cStr', 'coerce': _coerce.to_str}, 'smoothtype': {'type': 'cStr', 'coerce': _coerce.to_str}, 'smoothwidth': {'type': 'cInt'}, 'splitsel': {'type': 'cBool'}, 'reverse': {'type': 'cBool'}, 'overwrite': {'type': 'cBool'}, 'maxmemmb': {'type': 'cInt'}, 'ncpu': {'type': 'cInt'}, 'streaming': {'type': 'cBool'}}
+        doc = {'vis': vis, 'outputvis': outputvis, 'timerange': timerange, 'spw': spw, 'mode': mode, 'subtime1': subtime1, 'subtime2': subtime2, 'smoothaxis': smoothaxis, 'smoothtype': smoothtype, 'smoothwidth': smoothwidth, 'splitsel': splitsel, 'reverse': reverse, 'overwrite': overwrite, 'maxmemmb': maxmemmb, 'ncpu': ncpu, 'streaming': streaming}
         assert _pc.validate(doc,schema), str(_pc.errors)
-        _logging_state_ = _start_log( 'subvs', [ 'vis=' + repr(_pc.document['vis']), 'outputvis=' + repr(_pc.document['outputvis']), 'timerange=' + repr(_pc.document['timerange']), 'spw=' + repr(_pc.document['spw']), 'mode=' + repr(_pc.document['mode']), 'subtime1=' + repr(_pc.document['subtime1']), 'subtime2=' + repr(_pc.document['subtime2']), 'smoothaxis=' + repr(_pc.document['smoothaxis']), 'smoothtype=' + repr(_pc.document['smoothtype']), 'smoothwidth=' + repr(_pc.document['smoothwidth']), 'splitsel=' + repr(_pc.document['splitsel']), 'reverse=' + repr(_pc.document['reverse']), 'overwrite=' + repr(_pc.document['overwrite']) ] )
-        return _end_log( _logging_state_, 'subvs', _subvs_t( _pc.document['vis'], _pc.document['outputvis'], _pc.document['timerange'], _pc.document['spw'], _pc.document['mode'], _pc.document['subtime1'], _pc.document['subtime2'], _pc.document['smoothaxis'], _pc.document['smoothtype'], _pc.document['smoothwidth'], _pc.document['splitsel'], _pc.document['reverse'], _pc.document['overwrite'] ) )
+        _logging_state_ = _start_log( 'subvs', [ 'vis=' + repr(_pc.document['vis']), 'outputvis=' + repr(_pc.document['outputvis']), 'timerange=' + repr(_pc.document['timerange']), 'spw=' + repr(_pc.document['spw']), 'mode=' + repr(_pc.document['mode']), 'subtime1=' + repr(_pc.document['subtime1']), 'subtime2=' + repr(_pc.document['subtime2']), 'smoothaxis=' + repr(_pc.document['smoothaxis']), 'smoothtype=' + repr(_pc.document['smoothtype']), 'smoothwidth=' + repr(_pc.document['smoothwidth']), 'splitsel=' + repr(_pc.document['splitsel']), 'reverse=' + repr(_pc.document['reverse']), 'overwrite=' + repr(_pc.document['overwrite']), 'maxmemmb=' + repr(_pc.document['maxmemmb']), 'ncpu=' + repr(_pc.document['ncpu']), 'streaming=' + repr(_pc.document['streaming']) ] )
+        return _end_log( _logging_state_, 'subvs', _subvs_t( _pc.document['vis'], _pc.document['outputvis'], _pc.document['timerange'], _pc.document['spw'], _pc.document['mode'], _pc.document['subtime1'], _pc.document['subtime2'], _pc.document['smoothaxis'], _pc.document['smoothtype'], _pc.document['smoothwidth'], _pc.document['splitsel'], _pc.document['reverse'], _pc.document['overwrite'], _pc.document['maxmemmb'], _pc.document['ncpu'], _pc.document['streaming'] ) )
 
 subvs = _subvs( )
 
@@ -9,6 +9,7 @@ import warnings
 from suncasa.io import ndfits
 import ssl
 from scipy.interpolate import interp1d
+from functools import lru_cache
 
 py3 = sys.version_info.major >= 3
 if py3:
@@ -110,11 +111,269 @@ def observatory_to_coord(observatory):
         site_coord = '241.718406,37.240115,1.18835'
     return site_coord
 
+def query_horizons(btime, etime, site_coord, verbose=False, timeout=10):
+    """
+    Queries JPL Horizons for the J2000 topocentric RA and DEC, P angle, and distance of the solar disk center
+    at a 1-minute step between btime and etime (astropy.Time).
+    site_coord: site coordinates in the format of observatory_to_coord()
+    timeout: timeout (in seconds) of each HTTP request
+    Returns a dictionary of arrays with keys 'time' (mjd), 'ra' (rad), 'dec' (rad), 'p0' (deg), 'delta' (AU)
+    """
+    try:
+        cmdstr = "https://ssd.jpl.nasa.gov/api/horizons.api?format=text&TABLE_TYPE='OBSERVER'&QUANTITIES='1,17,20'&CSV_FORMAT='YES'&ANG_FORMAT='DEG'&CAL_FORMAT='BOTH'&SOLAR_ELONG='0,180'&CENTER='coord@399'&COORD_TYPE='GEODETIC'&SITE_COORD='{}'&COMMAND='sun'&START_TIME='".format(
+            site_coord) + btime.iso.replace(' ', ',') + "'&STOP_TIME='" + etime.iso[:-4].replace(' ',
+                                                                                            ',') + "'&STEP_SIZE='1m'&SKIP_DAYLT='NO'&EXTRA_PREC='YES'&APPARENT='REFRACTED'"
+        cmdstr = cmdstr.replace("'", "%27")
+        if verbose:
+            print('Query Horizons using the following url')
+            print(cmdstr)
+
+        try:
+            context = ssl._create_unverified_context()
+            f = urlopen(cmdstr, context=context, timeout=timeout)
+        except:
+            f = urlopen(cmdstr, timeout=timeout)
+        lines = f.readlines()
+        f.close()
+    except Exception as error:
+        # todo use geocentric coordinate for the new VLA data
+        print(error)
+        print ("Use an alternative method to query")
+        import requests, collections
+        params = collections.OrderedDict()
+        params['EPHEM_TYPE'] = "'OBSERVER'"
+        params['QUANTITIES'] = "'1,17,20'"
+        params['CSV_FORMAT'] = "'YES'"
+        params['ANG_FORMAT'] = "'DEG'"
+        params['CAL_FORMAT'] = "'BOTH'"
+        params['SOLAR_ELONG'] = "'0,180'"
+        params['CENTER'] = "coord@399"
+        params['COORD_TYPE'] = "GEODETIC"
+        params['SITE_COORD'] = "'{}'".format(site_coord)
+        params['COMMAND'] = "'sun'"
+        params['START_TIME'] = "'{}'".format(btime.iso[:-4].replace(' ', ','))
+        params['STOP_TIME'] = "'{}'".format(etime.iso[:-4].replace(' ', ','))
+        params['STEP_SIZE'] = "'1m'"
+        params['SKIP_DAYLT'] = "'NO'"
+        params['EXTRA_PREC'] = "'YES'"
+        params['APPARENT'] = "'REFRACTED'"
+        results = requests.get("https://ssd.jpl.nasa.gov/api/horizons.api?format=text", params=params,
+                               timeout=timeout)
+        lines = [ll for ll in results.iter_lines()]
+
+    # add a check for python 3
+    if py3:
+        lines = [l.decode('utf-8', 'backslashreplace') for l in lines]
+
+    nline = len(lines)
+    istart = 0
+    for i in range(nline):
+        if lines[i][0:5] == '$$SOE':  # start recording
+            istart = i + 1
+        if lines[i][0:5] == '$$EOE':  # end recording
+            iend = i
+    newlines = lines[istart:iend]
+    t = []
+    ra = []
+    dec = []
+    p0 = []
+    delta = []
+    for line in newlines:
+        items = line.split(',')
+        t.append(Time(float(items[1]), format='jd').mjd)
+        ra.append(np.radians(float(items[4])))
+        dec.append(np.radians(float(items[5])))
+        p0.append(float(items[6]))
+        delta.append(float(items[8]))
+    return {'time': np.array(t), 'ra': np.array(ra), 'dec': np.array(dec), 'p0': np.array(p0),
+            'delta': np.array(delta)}
+
+
+_site_locations = {}
+
+
+def observatory_location(observatory):
+    """
+    Returns the astropy EarthLocation of the observatory, resolved once per observatory.
+    Uses the astropy site registry, or the coordinates in observatory_to_coord() if the observatory
+    is not in the registry (or the registry can not be downloaded).
+    """
+    from astropy.coordinates import EarthLocation
+
+    if observatory not in _site_locations:
+        try:
+            _site_locations[observatory] = EarthLocation.of_site(observatory)
+        except Exception:
+            lon, lat, height = [float(x) for x in observatory_to_coord(observatory).split(',')]
+            _site_locations[observatory] = EarthLocation.from_geodetic(lon=lon * u.deg, lat=lat * u.deg,
+                                                                       height=height * u.km)
+    return _site_locations[observatory]
+
+
+def astropy_ephem(times, observatory='OVRO'):
+    """
+    Computes the J2000 topocentric RA and DEC and the P angle of the solar disk center with astropy and sunpy
+    at times (astropy.Time array) for the observatory, in a single vectorized call for all the times.
+    Returns a dictionary of arrays in the same format as query_horizons(). The distance is set to 0.
+    """
+    from astropy.coordinates import get_body
+
+    times = Time(np.atleast_1d(times.mjd), format='mjd')
+    location = observatory_location(observatory)
+    phasecentre = get_body('sun', times, location)
+    return {'time': times.mjd, 'ra': phasecentre.ra.to(u.rad).value, 'dec': phasecentre.dec.to(u.rad).value,
+            'p0': np.atleast_1d(sun.P(times).to(u.deg).value), 'delta': np.zeros(len(times))}
+
+
+def ephem_cache_dir():
+    """
+    Directory of the local ephemeris cache. Set by the environment variable SUNCASA_EPHEM_CACHE,
+    default to ~/.suncasa/ephem. Falls back to a directory in the system temporary directory if that
+    one can not be created, and returns None if neither can (the ephemeris is then not cached).
+    """
+    import tempfile
+    cachedir = os.environ.get('SUNCASA_EPHEM_CACHE', os.path.join(os.path.expanduser('~'), '.suncasa', 'ephem'))
+    for d in [cachedir, os.path.join(tempfile.gettempdir(), 'suncasa_ephem')]:
+        try:
+            os.makedirs(d, exist_ok=True)
+            if os.access(d, os.W_OK):
+                return d
+        except OSError as error:
+            warnings.warn('Can not create the ephemeris cache directory {}: {}'.format(d, error))
+    warnings.warn('No writable ephemeris cache directory. The ephemeris will not be cached.')
+    return None
+
+
+## time (unix) of the last failed Horizons query, by marker file. Used in addition to the marker files
+## so that the failure is remembered even without a writable cache directory
+_horizons_failures = {}
+
+
+def horizons_retry_after():
+    """
+    Seconds to wait after a failed JPL Horizons query before Horizons is queried again. Set by the environment
+    variable SUNCASA_EPHEM_RETRY, default to 3600.
+    """
+    try:
+        return float(os.environ.get('SUNCASA_EPHEM_RETRY', 3600))
+    except ValueError:
+        return 3600.
+
+
+def horizons_offline():
+    """
+    True if JPL Horizons should not be queried at all, i.e., the environment variable SUNCASA_EPHEM_OFFLINE
+    is set to 1, true or yes (e.g., on air-gapped nodes). The ephemeris is then computed with astropy.
+    """
+    return os.environ.get('SUNCASA_EPHEM_OFFLINE', '').strip().lower() in ['1', 'true', 'yes']
+
+
+def ephem_day(mjd_day, observatory, use_astropy=False, verbose=False):
+    """
+    Returns the ephemeris of the solar disk center at a 1-minute step over the (UTC) day mjd_day (integer mjd)
+    for the observatory, from the local ephemeris cache. A day not in the cache yet is queried from JPL Horizons
+    (or computed with astropy if use_astropy is True) and saved to the cache. Horizons and astropy ephemerides are
+    cached separately: unless use_astropy is True, only a cached Horizons ephemeris is used, and the astropy one
+    is only a fallback when Horizons can not be reached.
+    A failed Horizons query leaves a failure marker in the cache directory: a network error marks Horizons as
+    unreachable for all the days, and an empty result marks the day alone. Horizons is not queried again until
+    the marker is older than horizons_retry_after(), nor at all if horizons_offline() is True.
+    """
+    import re
+    import time
+    obskey = re.sub('[^0-9A-Za-z]+', '_', observatory.upper())
+    day = Time(mjd_day, format='mjd').strftime('%Y%m%d')
+    cachedir = ephem_cache_dir()
+    cachefiles = {m: os.path.join(cachedir or '', 'ephem_{}_{}_{}.npz'.format(m, obskey, day)) for m in
+                  ['horizons', 'astropy']}
+    markers = {'network': os.path.join(cachedir or '', 'horizons_unreachable.failed'),
+               'day': os.path.join(cachedir or '', 'ephem_horizons_{}_{}.failed'.format(obskey, day))}
+
+    def read_cache(method):
+        if cachedir and os.path.exists(cachefiles[method]):
+            try:
+                with np.load(cachefiles[method]) as f:
+                    return {k: f[k] for k in ['time', 'ra', 'dec', 'p0', 'delta']}
+            except Exception as error:
+                print('Error in reading the ephemeris cache {}: {}'.format(cachefiles[method], error))
+        return None
+
+    def write_cache(method, ephem):
+        if not cachedir:
+            return
+        ## write to a temporary file first so that concurrent processes never read a partial file
+        tmpfile = cachefiles[method] + '.{}.tmp.npz'.format(os.getpid())
+        try:
+            np.savez(tmpfile, **ephem)
+            os.replace(tmpfile, cachefiles[method])
+        except OSError as error:
+            warnings.warn('Can not write the ephemeris cache {}: {}'.format(cachefiles[method], error))
+            try:
+                os.remove(tmpfile)
+            except OSError:
+                pass
+
+    def failed_recently(marker):
+        tfail = _horizons_failures.get(markers[marker], 0.)
+        if cachedir:
+            try:
+                tfail = max(tfail, os.path.getmtime(markers[marker]))
+            except OSError:
+                pass
+        return time.time() - tfail < horizons_retry_after()
+
+    def mark_failed(marker):
+        _horizons_failures[markers[marker]] = time.time()
+        if cachedir:
+            try:
+                open(markers[marker], 'w').close()
+                os.utime(markers[marker], None)
+            except OSError as error:
+                warnings.warn('Can not write the failure marker {}: {}'.format(markers[marker], error))
+
+    # the cached day runs one minute into the next day so that the days join up in interpolation
+    btime = Time(mjd_day, format='mjd')
+    etime = Time(mjd_day + 1. + 1. / 24. / 60., format='mjd')
+    if not use_astropy:
+        ## only a Horizons ephemeris satisfies the cache here. The astropy cache is a fallback for a failed query,
+        ## so that Horizons is tried again once the failure marker expires
+        ephem = read_cache('horizons')
+        if ephem is not None:
+            return ephem
+        if horizons_offline() or failed_recently('network') or failed_recently('day'):
+            if verbose:
+                print('JPL Horizons is offline or failed recently. Use astropy to compute the ephemeris.')
+        else:
+            try:
+                if verbose:
+                    print('Using observatory {} to generate emphemeris'.format(observatory))
+                ephem = query_horizons(btime, etime, observatory_to_coord(observatory), verbose=verbose)
+                if len(ephem['time']) > 0:
+                    write_cache('horizons', ephem)
+                    return ephem
+                mark_failed('day')
+            except Exception as error:
+                print(error)
+                mark_failed('network')
+            print('Failed to query JPL Horizons. Use astropy to compute the ephemeris.')
+    ephem = read_cache('astropy')
+    if ephem is None:
+        times = Time(np.linspace(btime.mjd, etime.mjd, 24 * 60 + 2), format='mjd')
+        ephem = astropy_ephem(times, observatory)
+        write_cache('astropy', ephem)
+    return ephem
+
+
 def read_horizons(t0=None, dur=None, vis=None, observatory=None, verbose=False, use_astropy=False):
     """
     This function visits JPL Horizons to retrieve J2000 topocentric RA and DEC of the solar disk center
     as a function of time.
 
+    The ephemeris is kept in a local cache (see ephem_cache_dir()) by observatory and day, at a 1-minute step,
+    and is interpolated to the requested times. A day is only queried (or computed) once; if JPL Horizons can not
+    be reached, the ephemeris is computed with astropy instead, and Horizons is not queried again for
+    SUNCASA_EPHEM_RETRY seconds (see ephem_day()). Set SUNCASA_EPHEM_OFFLINE=1 to never query Horizons.
+
     Keyword arguments:
     t0: Referece time in astropy.Time format
     dur: duration of the returned coordinates in days. Default to 1 minute
@@ -164,158 +423,34 @@ def read_horizons(t0=None, dur=None, vis=None, observatory=None, verbose=False,
             print('error in reading ms file: ' + vis + ' to obtain the ephemeris!')
             return -1
 
-    if use_astropy:
-        from sunpy.coordinates import sun
-        from astropy.coordinates import get_body, EarthLocation
-
-        if observatory is None:
-            observatory = 'OVRO'
-
-        if not t0 and not vis:
-            t0 = Time.now()
-        if not dur:
-            dur = 1. / 60. / 24.  # default to 1 minute
-        if t0:
-            try:
-                btime = Time(t0)
-            except Exception as error:
-                print('input time ' + str(t0) + ' not recognized')
-                print(error)
-                return -1
-
-        JPL_AU = 149597870700.0  # meters
-        JPL_RSUN = 696000000.0   # meters
-
-        obstime = btime
-
-
-        if dur<=1e-6/3600/24: # robust for wild input of dur<=0
-            dur = 1e-6/3600/24
-
-        etime = Time(btime.mjd + dur, format='mjd')
-        times = Time(np.linspace(btime.mjd, etime.mjd, int(np.ceil(dur*24*60))), format='mjd')
-
-        time_set = []
-        ra_set = []
-        dec_set = []
-        p0_set = []
-        delta_set = []
-        for time in times:
-            # Get coordinates using astropy
-            location = EarthLocation.of_site(observatory)
-            phasecentre = get_body('sun', time, location)
-            ra = phasecentre.ra.to(u.rad).value
-            dec = phasecentre.dec.to(u.rad).value
-
-            # Get solar angles from sunpy
-            P = sun.P(time).to(u.deg).value
-            B0 = sun.B0(time).to(u.deg).value
-            L0 = sun.L0(time).to(u.deg).value
-            time_set.append(time)
-            ra_set.append(ra)
-            dec_set.append(dec)
-            p0_set.append(P)
-            delta_set.append(0)
-
-        ephem = {'time': time_set, 'ra': ra_set, 'dec': dec_set, 'p0': p0_set, 'delta': delta_set}
-
-    else:
-        if not t0 and not vis:
-            t0 = Time.now()
-        if not dur:
-            dur = 1. / 60. / 24.  # default to 1 minute
-        if t0:
-            try:
-                btime = Time(t0)
-            except Exception as error:
-                print('input time ' + str(t0) + ' not recognized')
-                print(error)
-                return -1
-
-        if observatory is None:
-            site_coord = observatory_to_coord('OVRO')
-        else:
-            # If "observatory" is provided, it takes precedence
-            if verbose:
-                print('Using observatory {} to generate emphemeris'.format(observatory))
-            site_coord = observatory_to_coord(observatory)
-
-        # default the observatory to geocentric, if none provided
-        etime = Time(btime.mjd + dur, format='mjd')
-        
+    if not t0 and not vis:
+        t0 = Time.now()
+    if not dur:
+        dur = 1. / 60. / 24.  # default to 1 minute
+    if dur <= 1e-6 / 3600 / 24:  # robust for wild input of dur<=0
+        dur = 1e-6 / 3600 / 24
+    if t0:
         try:
-            cmdstr = "https://ssd.jpl.nasa.gov/api/horizons.api?format=text&TABLE_TYPE='OBSERVER'&QUANTITIES='1,17,20'&CSV_FORMAT='YES'&ANG_FORMAT='DEG'&CAL_FORMAT='BOTH'&SOLAR_ELONG='0,180'&CENTER='coord@399'&COORD_TYPE='GEODETIC'&SITE_COORD='{}'&COMMAND='sun'&START_TIME='".format(
-                site_coord) + btime.iso.replace(' ', ',') + "'&STOP_TIME='" + etime.iso[:-4].replace(' ',
-                                                                                                    ',') + "'&STEP_SIZE='1m'&SKIP_DAYLT='NO'&EXTRA_PREC='YES'&APPARENT='REFRACTED'"
-            cmdstr = cmdstr.replace("'", "%27")
-            if verbose:
-                print('Query Horizons using the following url')
-                print(cmdstr)
-            # print('1################')
-            
-            try:
-                context = ssl._create_unverified_context()
-                f = urlopen(cmdstr, context=context)
-            except:
-                f = urlopen(cmdstr)
-            lines = f.readlines()
-            f.close()
+            btime = Time(t0)
         except Exception as error:
-            # todo use geocentric coordinate for the new VLA data
+            print('input time ' + str(t0) + ' not recognized')
             print(error)
-            print ("Use an alternative method to query")
-            import requests, collections
-            params = collections.OrderedDict()
-            params['EPHEM_TYPE'] = "'OBSERVER'"
-            params['QUANTITIES'] = "'1,17,20'"
-            params['CSV_FORMAT'] = "'YES'"
-            params['ANG_FORMAT'] = "'DEG'"
-            params['CAL_FORMAT'] = "'BOTH'"
-            params['SOLAR_ELONG'] = "'0,180'"
-            params['CENTER'] = "coord@399"
-            params['COORD_TYPE'] = "GEODETIC"
-            params['SITE_COORD'] = "'{}'".format(site_coord)
-            params['COMMAND'] = "'sun'"
-            params['START_TIME'] = "'{}'".format(btime.iso[:-4].replace(' ', ','))
-            params['STOP_TIME'] = "'{}'".format(etime.iso[:-4].replace(' ', ','))
-            params['STEP_SIZE'] = "'1m'"
-            params['SKIP_DAYLT'] = "'NO'"
-            params['EXTRA_PREC'] = "'YES'"
-            params['APPARENT'] = "'REFRACTED'"
-            results = requests.get("https://ssd.jpl.nasa.gov/api/horizons.api?format=text", params=params)
-            # print('2################')
-            # print(results)
-            lines = [ll for ll in results.iter_lines()]
-
-        # add a check for python 3
-        if py3:
-            lines = [l.decode('utf-8', 'backslashreplace') for l in lines]
-
-        #print(lines)
-        nline = len(lines)
-        istart = 0
-        for i in range(nline):
-            if lines[i][0:5] == '$$SOE':  # start recording
-                istart = i + 1
-            if lines[i][0:5] == '$$EOE':  # end recording
-                iend = i
-        newlines = lines[istart:iend]
-        nrec = len(newlines)
-        ephem_ = []
-        t = []
-        ra = []
-        dec = []
-        p0 = []
-        delta = []
-        for line in newlines:
-            items = line.split(',')
-            t.append(Time(float(items[1]), format='jd').mjd)
-            ra.append(np.radians(float(items[4])))
-            dec.append(np.radians(float(items[5])))
-            p0.append(float(items[6]))
-            delta.append(float(items[8]))
-        # convert list of dictionary to a dictionary of arrays
-        ephem = {'time': t, 'ra': ra, 'dec': dec, 'p0': p0, 'delta': delta}
+            return -1
+    if observatory is None:
+        observatory = 'OVRO'
+    etime = Time(btime.mjd + dur, format='mjd')
+
+    # 1-minute steps over the requested time span
+    times = np.linspace(btime.mjd, etime.mjd, max(2, int(np.ceil(dur * 24 * 60)) + 1))
+    days = range(int(np.floor(times[0])), int(np.floor(times[-1])) + 1)
+    tabs = [ephem_day(d, observatory, use_astropy=use_astropy, verbose=verbose) for d in days]
+    tab = {k: np.hstack([t[k] for t in tabs]) for k in tabs[0].keys()}
+    tab_t, idx = np.unique(tab['time'], return_index=True)
+    # unwrap the RA to interpolate across 0/2pi
+    ra = np.interp(times, tab_t, np.unwrap(tab['ra'][idx])) % (2. * np.pi)
+    ephem = {'time': times.tolist(), 'ra': ra.tolist()}
+    for k in ['dec', 'p0', 'delta']:
+        ephem[k] = np.interp(times, tab_t, tab[k][idx]).tolist()
     return ephem
 
 
@@ -868,6 +1003,112 @@ def getbeam(imagefile=None, beamfile=None):
     return bmaj, bmin, bpa, beamunit, bpaunit
 
 
+def image_to_fits(imr):
+    """
+    Returns the FITS header and data of an opened CASA image tool, in memory and in the same layout as
+    ``ia.tofits`` (Stokes axis last and the spectral axis in frequency), so that they can be written in one pass.
+    Masked pixels are set to NaN.
+
+    Raises ValueError if the axes of the header do not match the axes of the data.
+    """
+    import re
+    cs = imr.coordsys()
+    names = list(cs.names())
+    ndim = len(names)
+    ## the Stokes axis is moved last, as in tofits(stokeslast=True)
+    order = [i for i in range(ndim) if names[i] != 'Stokes'] + [i for i in range(ndim) if names[i] == 'Stokes']
+    newax = {order[j] + 1: j + 1 for j in range(ndim)}
+
+    fitshdr = imr.fitsheader(exclude='history')
+    cards = {}
+    for k, v in fitshdr.items():
+        k = k.upper()
+        if k in ['SIMPLE', 'BITPIX', 'END', 'HISTORY', 'IMAGENME', 'BSCALE', 'BZERO', 'DATE', 'ORIGIN']:
+            continue
+        if k in ['CTYPE', 'CRVAL', 'CDELT', 'CRPIX', 'CUNIT', 'CROTA']:
+            for i, v_ in enumerate(np.atleast_1d(v)):
+                cards['{}{}'.format(k, i + 1)] = v_
+        elif k == 'NAXIS':
+            for i, v_ in enumerate(np.atleast_1d(v)[1:]):
+                cards['NAXIS{}'.format(i + 1)] = int(v_)
+        else:
+            cards[k] = v
+
+    ## renumber the axis keywords
+    header = {}
+    for k, v in cards.items():
+        m = re.match(r'^(CTYPE|CRVAL|CDELT|CRPIX|CUNIT|CROTA|NAXIS)(\d+)$', k)
+        if m:
+            header['{}{}'.format(m.group(1), newax[int(m.group(2))])] = v
+            continue
+        m = re.match(r'^(PC|PV)0*(\d+)_0*(\d+)$', k)
+        if m:
+            i = newax[int(m.group(2))]
+            j = newax[int(m.group(3))] if m.group(1) == 'PC' else int(m.group(3))
+            header['{}{}_{}'.format(m.group(1), i, j)] = v
+            continue
+        header[k] = v
+
+    ## the spectral axis in frequency, with the velocity kept as the alternate reference, as in tofits
+    if 'Frequency' in names:
+        fax = newax[names.index('Frequency') + 1]
+        if not str(header.get('CTYPE{}'.format(fax), '')).strip().upper().startswith('FREQ'):
+            header['ALTRVAL'] = header['CRVAL{}'.format(fax)]
+            header['ALTRPIX'] = header['CRPIX{}'.format(fax)]
+            iax = names.index('Frequency')
+            header['CTYPE{}'.format(fax)] = 'FREQ'
+            header['CRVAL{}'.format(fax)] = cs.referencevalue(format='n')['numeric'][iax]
+            header['CDELT{}'.format(fax)] = cs.increment(format='n')['numeric'][iax]
+            header['CRPIX{}'.format(fax)] = cs.referencepixel()['numeric'][iax] + 1.
+            header['CUNIT{}'.format(fax)] = cs.units()[iax]
+    cs.done()
+
+    pix = imr.getchunk(dropdeg=False)
+    pixmask = imr.getchunk(dropdeg=False, getmask=True)
+    data = np.array(np.transpose(np.where(pixmask, pix, np.nan), order).T, dtype=np.float32)
+
+    ## check that the axes of the header match the data
+    ctypes = {'Right Ascension': 'RA', 'Declination': 'DEC', 'Stokes': 'STOKES', 'Frequency': 'FREQ'}
+    for j in range(ndim):
+        naxis = header.get('NAXIS{}'.format(j + 1))
+        ctype = str(header.get('CTYPE{}'.format(j + 1), '')).strip().upper()
+        if naxis != data.shape[ndim - 1 - j] or not ctype.startswith(ctypes.get(names[order[j]], '')):
+            raise ValueError('axis {} of the FITS header ({}, {}) does not match the data ({}, {})'.format(
+                j + 1, ctype, naxis, names[order[j]], data.shape[ndim - 1 - j]))
+
+    hdr = pyfits.Header()
+    for k, v in header.items():
+        if k.startswith('NAXIS'):
+            continue
+        if k == 'COMMENT':
+            for v_ in np.atleast_1d(v):
+                hdr.add_comment(str(v_))
+        elif isinstance(v, np.ndarray):
+            hdr[k] = v.item() if v.size == 1 else str(v.tolist())
+        elif isinstance(v, np.generic):
+            hdr[k] = v.item()
+        else:
+            hdr[k] = v
+    return pyfits.PrimaryHDU(data=data, header=hdr).header, data
+
+
+@lru_cache(maxsize=None)
+def solar_geometry(dateobs):
+    """
+    Returns the Sun-Earth distance (m), the solar angular radius (arcsec), and the B0 angle (deg) at dateobs
+    (FITS time string). Cached, so that images sharing the same time only compute them once.
+    """
+    if sunpy1:
+        dsun_obs = sun.earth_distance(Time(dateobs)).to(u.meter).value
+        rsun_obs = sun.angular_radius(Time(dateobs)).value
+        hglt_obs = sun.B0(Time(dateobs)).value
+    else:
+        dsun_obs = sun.sunearth_distance(Time(dateobs)).to(u.meter).value
+        rsun_obs = sun.solar_semidiameter_angular_size(Time(dateobs)).value
+        hglt_obs = sun.heliographic_solar_center(Time(dateobs))[1].value
+    return dsun_obs, rsun_obs, hglt_obs
+
+
 def imreg(vis=None, imagefile=None, timerange=None,
           ephem=None, msinfo=None, fitsfile=None,
           usephacenter=True, geocentric=False, dopolyfit=True, reftime=None, offsetfile=None, beamfile=None,
@@ -972,7 +1213,17 @@ def imreg(vis=None, imagefile=None, timerange=None,
     if toTb:
         (bmajs, bmins, bpas, beamunits, bpaunits) = getbeam(imagefile=imagefile, beamfile=beamfile)
 
+    if offsetfile:
+        try:
+            offset = np.load(offsetfile)
+        except:
+            raise ValueError('The specified offsetfile does not exist!')
+        reftimes_d = offset['reftimes_d']
+        xoffs = offset['xoffs']
+        yoffs = offset['yoffs']
+
     for n, img in enumerate(imagefile):
+        inmem = False
         if verbose:
             print('processing image #' + str(n) + ' ' + img)
         if img is None:
@@ -1029,7 +1280,24 @@ def imreg(vis=None, imagefile=None, timerange=None,
                 imr = ia.rotate(pa=str(-p0) + 'deg')
                 if subregion != '':
                     imr = imr.subimage(region=subregion)
-                imr.tofits(fitsf, history=False, overwrite=overwrite)
+                inmem = False
+                if docompress and os.path.isdir(img):
+                    ## keep the rotated image in memory and write the compressed FITS file once at the end,
+                    ## instead of tofits, an update, and a compressed rewrite
+                    inmem = True
+                    try:
+                        imshape = imr.shape()
+                        if len(imshape) - np.count_nonzero(np.array(imshape) == 1) > 3:
+                            inmem = False
+                        else:
+                            header, data = image_to_fits(imr)
+                    except Exception as error:
+                        if verbose:
+                            print('Failed to get the FITS header of the image in memory ({}). '
+                                  'Use tofits instead.'.format(error))
+                        inmem = False
+                if not inmem:
+                    imr.tofits(fitsf, history=False, overwrite=overwrite)
                 imr.close()
                 imsum = ia.summary()
                 ia.close()
@@ -1071,13 +1339,6 @@ def imreg(vis=None, imagefile=None, timerange=None,
             dx_vis = (-dra_vis) * cos(prad) - ddec_vis * sin(prad)
             dy_vis = (-dra_vis) * sin(prad) + ddec_vis * cos(prad)
             if offsetfile:
-                try:
-                    offset = np.load(offsetfile)
-                except:
-                    raise ValueError('The specified offsetfile does not exist!')
-                reftimes_d = offset['reftimes_d']
-                xoffs = offset['xoffs']
-                yoffs = offset['yoffs']
                 timg_d = hel['reftime']
                 ind = bisect.bisect_left(reftimes_d, timg_d)
                 xoff = xoffs[ind - 1]
@@ -1104,11 +1365,13 @@ def imreg(vis=None, imagefile=None, timerange=None,
                 (crval1, crval2) = (xoff + dx_fld, yoff + dy_fld)
             # update the fits header to heliocentric coordinates
 
-            hdu = pyfits.open(fitsf, mode='update')
-            hdu[0].verify('fix')
-            header = hdu[0].header
-            dshape = hdu[0].data.shape
-            ndim = hdu[0].data.ndim
+            if not inmem:
+                hdu = pyfits.open(fitsf, mode='update')
+                hdu[0].verify('fix')
+                header = hdu[0].header
+                data = hdu[0].data
+            dshape = data.shape
+            ndim = data.ndim
             (cdelt1, cdelt2) = (
                 -header['cdelt1'] * 3600., header['cdelt2'] * 3600.)  # Original CDELT1, 2 are for RA and DEC in degrees
             header['cdelt1'] = cdelt1
@@ -1127,14 +1390,7 @@ def imreg(vis=None, imagefile=None, timerange=None,
             p_angle = hel['p0']
             hgln_obs = 0.
             rsun_ref = sun.constants.radius.value
-            if sunpy1:
-                dsun_obs = sun.earth_distance(Time(dateobs)).to(u.meter).value
-                rsun_obs = sun.angular_radius(Time(dateobs)).value
-                hglt_obs = sun.B0(Time(dateobs)).value
-            else:
-                dsun_obs = sun.sunearth_distance(Time(dateobs)).to(u.meter).value
-                rsun_obs = sun.solar_semidiameter_angular_size(Time(dateobs)).value
-                hglt_obs = sun.heliographic_solar_center(Time(dateobs))[1].value
+            dsun_obs, rsun_obs, hglt_obs = solar_geometry(dateobs)
             try:
                 # this works for pyfits version of CASA 4.7.0 but not CASA 4.6.0
                 header.set('exptime', exptime)
@@ -1189,7 +1445,8 @@ def imreg(vis=None, imagefile=None, timerange=None,
             header['DLTFRQ'] = header['CDELT' + faxis]
             header['FQUNIT'] = header['CUNIT' + faxis]
 
-            data = hdu[0].data  # remember the data order is reversed due to the FITS convension
+            # remember the data order is reversed due to the FITS convension
+            scaled = False
             # intensity units to brightness temperature
             if toTb:
                 # get restoring beam info
@@ -1198,50 +1455,17 @@ def imreg(vis=None, imagefile=None, timerange=None,
                 beamunit = beamunits[n]
                 bpa = bpas[n]
                 bpaunit = bpaunits[n]
-                # find out the polarization of this image
-                k_b = qa.constants('k')['value']
-                c_l = qa.constants('c')['value']
-                # Always use 2*kb for all polarizations
-                const = 2. * k_b / c_l ** 2
                 bpatmp = qa.quantity(bpa, bpaunit)['value'] - qa.convert(qa.quantity(p0, 'deg'), bpaunit)['value']
                 header['BPA'] = bpatmp[0]
                 if header['BUNIT'].lower() == 'jy/beam':
                     header['BUNIT'] = 'K'
                     header['BTYPE'] = 'Brightness Temperature'
-                    for i in range(dshape[faxis_ind]):
-                        nu = header['CRVAL' + faxis] + header['CDELT' + faxis] * (i + 1 - header['CRPIX' + faxis])
-                        if header['CUNIT' + faxis] == 'KHz':
-                            nu *= 1e3
-                        if header['CUNIT' + faxis] == 'MHz':
-                            nu *= 1e6
-                        if header['CUNIT' + faxis] == 'GHz':
-                            nu *= 1e9
-                        if len(bmaj) > 1:  # multiple (per-plane) beams
-                            bmajtmp = bmaj[i]
-                            bmintmp = bmin[i]
-                        else:  # one single beam
-                            bmajtmp = bmaj[0]
-                            bmintmp = bmin[0]
-                        if beamunit == 'arcsec':
-                            bmaj0 = np.radians(bmajtmp / 3600.)
-                            bmin0 = np.radians(bmintmp / 3600.)
-                        if beamunit == 'arcmin':
-                            bmaj0 = np.radians(bmajtmp / 60.)
-                            bmin0 = np.radians(bmintmp / 60.)
-                        if beamunit == 'deg':
-                            bmaj0 = np.radians(bmajtmp)
-                            bmin0 = np.radians(bmintmp)
-                        if beamunit == 'rad':
-                            bmaj0 = bmajtmp
-                            bmin0 = bmintmp
-                        beam_area = bmaj0 * bmin0 * np.pi / (4. * log(2.))
-                        factor = const * nu ** 2  # SI unit
-                        jy_to_si = 1e-26
-                        # print(nu/1e9, beam_area, factor)
-                        if faxis == '3':
-                            data[:, i, :, :] *= jy_to_si / beam_area / factor
-                        if faxis == '4':
-                            data[i, :, :, :] *= jy_to_si / beam_area / factor
+                    nfreq = dshape[faxis_ind]
+                    nus = header['CRVAL' + faxis] + header['CDELT' + faxis] * (np.arange(nfreq) + 1 - header['CRPIX' + faxis])
+                    nus = nus * {'KHz': 1e3, 'MHz': 1e6, 'GHz': 1e9}.get(header['CUNIT' + faxis], 1.)
+                    ## one single beam or per-plane beams. sclfactor is applied in the same pass over the data
+                    ndfits.jy2tb(data, nus, bmaj, bmin, beamunit=beamunit, faxis=faxis_ind, sclfactor=sclfactor)
+                    scaled = True
 
             try:
                 header.append(('hel_reg', True))
@@ -1250,8 +1474,12 @@ def imreg(vis=None, imagefile=None, timerange=None,
                 header.set('hel_reg', True)
                 header.set('history', 'Converted by helioimage2fits.py')
 
-            data *= sclfactor
+            if not scaled:
+                data *= sclfactor
             header = ndfits.headerfix(header)
+            if inmem:
+                ndfits.write(fitsf, data, header, compression_type='RICE_1', quantize_level=4.0)
+                continue
             hdu.flush()
             hdu.close()
 
@@ -107,6 +107,58 @@ def smooth(x, window_len=11, window='hanning', mode='same'):
         return y[np.int_(window_len / 2 - 1):-np.int_(window_len / 2)]
 
 
+def smooth_axis(x, window_len=11, window='hanning', axis=-1):
+    """smooth an N-dimensional array along one axis using a window with requested size.
+
+    This is the N-dimensional counterpart of smooth (with mode='same'). All the 1-D vectors along
+    the given axis are smoothed at once: the array is padded with reflected copies of the signal
+    at both ends along axis, and the scaled window is applied as a weighted sum of shifted views.
+
+    input:
+        x: the input array, real or complex
+        window_len: the dimension of the smoothing window
+        window: the type of window from 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'
+        axis: the axis along which to smooth
+
+    output:
+        the smoothed array with the same shape as x
+
+    see also:
+
+    smooth
+    """
+    window_len = int(window_len)
+    axis = axis % x.ndim
+    if x.shape[axis] < window_len:
+        raise ValueError("Input vector needs to be bigger than window size.")
+
+    if window_len < 3:
+        return x
+
+    if not window in ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']:
+        raise ValueError("Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'")
+
+    if window == 'flat':  # moving average
+        w = np.ones(window_len, 'd')
+    else:
+        w = getattr(np, window)(window_len)
+    w = w / w.sum()
+
+    npad = window_len - 1
+    pad_width = [(0, 0)] * x.ndim
+    pad_width[axis] = (npad, npad)
+    s = np.pad(x, pad_width, mode='reflect')
+    n = x.shape[axis]
+    ## same offsets as numpy.convolve(w, s, mode='same') followed by the trimming in smooth
+    offset = npad + (window_len - 1) // 2
+    y = np.zeros(x.shape, dtype=np.result_type(x, w))
+    sl = [slice(None)] * x.ndim
+    for k in range(window_len):
+        sl[axis] = slice(offset - k, offset - k + n)
+        y += w[k] * s[tuple(sl)]
+    return y
+
+
 def butter_lowpass(cutoff, fs, order=5):
     nyq = 0.5 * fs
     normal_cutoff = cutoff / nyq